@@ -4,6 +4,16 @@ This exercise focuses on implementing the BIP143 digest algorithm for SegWit tra
 """
 
 # These functions from Exercise 1 are provided for you
+def varint(value: int) -> bytes:
+    """Encode an integer as a Bitcoin varint (provided from Exercise 1)."""
+    if value < 0xfd:
+        return value.to_bytes(1, 'little')
+    if value <= 0xffff:
+        return b'\xfd' + value.to_bytes(2, 'little')
+    if value <= 0xffffffff:
+        return b'\xfe' + value.to_bytes(4, 'little')
+    return b'\xff' + value.to_bytes(8, 'little')
+
 def create_input(txid: str, vout: int, script_sig: bytes = b'', sequence: bytes = b'\xff\xff\xff\xff') -> bytes:
     """Create a transaction input (provided from Exercise 1)."""
     # Convert txid from hex string to bytes and reverse it (little-endian)
@@ -12,8 +22,8 @@ def create_input(txid: str, vout: int, script_sig: bytes = b'', sequence: bytes
     # Convert vout to 4 bytes in little-endian
     vout_bytes = vout.to_bytes(4, 'little')
     
-    # Add script length as varint
-    script_len = len(script_sig).to_bytes(1, 'little')
+    # Add script length as varint (scripts longer than 252 bytes need a wider prefix)
+    script_len = varint(len(script_sig))
     
     # Return serialized input
     return txid_bytes + vout_bytes + script_len + script_sig + sequence
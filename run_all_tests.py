@@ -1,73 +1,147 @@
 #!/usr/bin/env python3
+"""
+Run every exercise's test suite and print a summary.
+
+Suites run in parallel in a pool of worker processes. Each worker imports
+pytest (and `ecdsa`, which Exercises 3 and 4 need) once and then runs suites
+in-process with `pytest.main`, so the interpreter startup and those imports
+are paid once per worker instead of once per suite.
+
+Every exercise has its own `template.py`, imported as `template`. Before a
+suite runs, the worker drops any `template` and test module left over from
+the previous suite and puts the exercise directory first on `sys.path`, so
+each suite only ever sees its own template.
+"""
+import argparse
+import contextlib
+import io
 import os
-import subprocess
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 
+
+def _warm_up():
+    """Import what every suite needs once per worker process."""
+    import pytest  # noqa: F401
+    try:
+        import ecdsa  # noqa: F401
+    except ImportError:
+        pass
+
+
+def _forget_modules(names):
+    for name in names:
+        sys.modules.pop(name, None)
+
+
 def run_test_for_exercise(exercise_dir):
-    """Run pytest for a specific exercise directory and return the result"""
-    print(f"\n{'='*80}")
-    print(f"Running tests for: {exercise_dir}")
-    print(f"{'='*80}")
-    
-    # Get the test file name
-    test_files = list(exercise_dir.glob('test_*.py'))
+    """
+    Run pytest for a specific exercise directory.
+
+    Parameters:
+        exercise_dir (str): Path of the exercise directory
+
+    Returns:
+        tuple: (passed, output, seconds) where output is pytest's report
+    """
+    import pytest
+
+    start = time.perf_counter()
+    exercise_dir = Path(exercise_dir)
+    test_files = sorted(exercise_dir.glob('test_*.py'))
     if not test_files:
-        print(f"No test files found in {exercise_dir}")
-        return False
-    
-    test_file = test_files[0].name
-    
-    # Run pytest and capture the output
-    result = subprocess.run(
-        ["python", "-m", "pytest", str(exercise_dir / test_file), "-v"],
-        capture_output=True,
-        text=True
+        return False, f"No test files found in {exercise_dir}\n", time.perf_counter() - start
+
+    # Isolate this suite's `template` from whatever the worker ran before
+    module_names = ['template'] + [path.stem for path in test_files]
+    _forget_modules(module_names)
+    sys.path.insert(0, str(exercise_dir))
+
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            # No cache provider: parallel suites would race on .pytest_cache
+            exit_code = pytest.main([str(path) for path in test_files] + ["-v", "-p", "no:cacheprovider"])
+    finally:
+        sys.path.remove(str(exercise_dir))
+        _forget_modules(module_names)
+
+    return exit_code == 0, output.getvalue(), time.perf_counter() - start
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Run all exercise test suites in parallel.")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None,
+        help="number of worker processes (default: one per suite, at most one per CPU)",
     )
-    
-    # Print the output
-    print(result.stdout)
-    if result.stderr:
-        print("Errors:")
-        print(result.stderr)
-    
-    return result.returncode == 0  # True if tests passed
-
-def main():
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
     # Get the root directory of the project
     root_dir = Path(__file__).parent.absolute()
-    
+
     # List of exercise directories
     exercises_dir = root_dir / "exercises"
-    exercises = sorted(list(exercises_dir.glob("exercise*")))
-    
+    exercises = sorted(exercises_dir.glob("exercise*"))
+
     if not exercises:
         print("No exercise directories found!")
         return 1
-    
+
+    jobs = args.jobs if args.jobs is not None else min(len(exercises), os.cpu_count() or 1)
+    if jobs < 1:
+        print("--jobs must be at least 1")
+        return 1
+
     # Store results for summary
     results = {}
-    
-    # Run tests for each exercise
-    for exercise in exercises:
-        results[exercise.name] = run_test_for_exercise(exercise)
-    
+    durations = {}
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_warm_up) as pool:
+        futures = [pool.submit(run_test_for_exercise, str(exercise)) for exercise in exercises]
+        # Print reports in exercise order, each as soon as it and all before it are done
+        for exercise, future in zip(exercises, futures):
+            try:
+                passed_tests, output, seconds = future.result()
+            except BrokenProcessPool as error:
+                # A worker died (crash, os._exit, out of memory); the pool
+                # fails this and every later suite, so report them as failed
+                passed_tests, output, seconds = False, f"Worker process died: {error}", 0.0
+            results[exercise.name] = passed_tests
+            durations[exercise.name] = seconds
+
+            print(f"\n{'='*80}")
+            print(f"Running tests for: {exercise}")
+            print(f"{'='*80}")
+            print(output)
+    elapsed = time.perf_counter() - start
+
     # Print summary
     print("\n" + "="*80)
     print("SUMMARY")
     print("="*80)
-    
+
     passed = 0
     for exercise, passed_tests in results.items():
         status = "PASSED" if passed_tests else "FAILED"
         if passed_tests:
             passed += 1
-        print(f"{exercise}: {status}")
-    
+        print(f"{exercise}: {status} ({durations[exercise]:.2f}s)")
+
     print(f"\nPassed {passed}/{len(exercises)} exercise test suites")
-    
+    print(f"Total wall time {elapsed:.2f}s with {jobs} worker(s)")
+
     # Return non-zero exit code if any tests failed
     return 0 if all(results.values()) else 1
 
+
 if __name__ == "__main__":
-    sys.exit(main()) 
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Reusable Bitcoin transaction building blocks that back the exercises.
+"""
+
+from .hashing import dsha256, hash160, hash160_many, ripemd160, sha256
+from .sighash import (
+    SIGHASH_ALL,
+    SIGHASH_ANYONECANPAY,
+    SIGHASH_NONE,
+    SIGHASH_SINGLE,
+    LegacySighashContext,
+    SighashContext,
+)
+from .keycache import KeyCache, KeyMaterial
+from .signing import clear_key_cache, get_p2wpkh_witness, get_pub_from_priv, sign
+from .batch import BatchResult, BatchStats, sign_batch
+from .serialize import (
+    TransactionSerializer,
+    assemble_transaction,
+    create_basic_tx,
+    create_input,
+    create_output,
+    int_to_little_endian,
+    pack_transactions,
+)
+from .compactsize import decode_varints, encode_varints, read_varint, varint, varint_size
+from .decode import TransactionView, decode_transaction, iter_transactions
+from .blockfile import BlockFile, BlockView, ScanStats, scan_block_files
+from .transaction import Transaction, TxIn, TxOut, Witness
+from .weight import TxWeight, transaction_weight
+from .sigcache import SignatureCache, signature_cache
+from .verify import (
+    parse_signature,
+    verify,
+    verify_batch,
+    verify_cached,
+    verify_chunk,
+    verify_p2wpkh_witness,
+)
+from .interpreter import ScriptError, TransactionValidator, ValidationResult, eval_script, validate_transaction
+from .script import (
+    P2PKH,
+    P2SH,
+    P2TR,
+    P2WPKH,
+    P2WSH,
+    build_outputs,
+    classify_script,
+    outputs_from_pubkeys,
+    p2pkh_script_pubkey,
+    p2wpkh_script_pubkey,
+    script_pubkeys,
+)
+from .address import (
+    MAINNET,
+    REGTEST,
+    SIGNET,
+    TESTNET,
+    Network,
+    address_to_script,
+    address_to_script_pubkey,
+    addresses_to_scripts,
+    b58check_decode,
+    b58check_encode,
+    decode_segwit_address,
+    encode_segwit_address,
+    script_to_address,
+    scripts_to_addresses,
+)
+from .outputindex import OutputIndex
+from .utxo import UtxoEntry, UtxoStore
+from .stream import StreamResult, TransactionStreamWriter, stream_transaction
+from .backend import available_backends, get_backend, set_backend, startup_benchmark
+from .instrument import Instrumentation, instrumentation, profile
+from .merkle import (
+    MerkleTree,
+    block_merkle_tree,
+    merkle_root,
+    verify_proof,
+    witness_commitment,
+    witness_commitment_script_pubkey,
+)
+from .mempool import Mempool, MempoolEntry, MempoolStats
+from .coinselect import CoinSelector, Selection, select_coins
@@ -0,0 +1,430 @@
+"""
+Coin selection: choosing which unspent outputs fund a transaction.
+
+`CoinSelector` turns a wallet's UTXOs into candidate arrays once per
+feerate: each candidate's input weight comes from its script template (no
+input is serialized), its effective value is its amount minus the fee for
+spending it, and candidates are stored sorted by effective value, largest
+first, in `array`s with a prefix-sum array alongside. Unspendable
+candidates (effective value of zero or less) are dropped, and so are UTXOs
+whose input size cannot be known from their script alone (P2SH, P2WSH and
+non-standard scripts); `CoinSelector.skipped` counts the latter.
+
+`select` then tries, within a time budget:
+
+1. Branch and bound (as in Bitcoin Core): a depth-first search for an input
+   set whose effective value lands between the target and the target plus
+   the cost of a change output, so no change is needed. Among the matches
+   it keeps the one with the least waste.
+2. Knapsack (also after Bitcoin Core): an exact single match, the smallest
+   candidate that covers the target with change, or the best of randomized
+   passes over the smaller candidates. With very large wallets the passes
+   only look at the largest smaller candidates (a few times as many as are
+   needed to reach the target), which keeps each pass short.
+
+Fees and sizes are computed with `TxWeight` from component lengths. The
+time budget bounds the search; building the result afterwards takes time
+proportional to the number of inputs chosen.
+"""
+
+import itertools
+import math
+import random
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import NamedTuple
+
+from .compactsize import varint_size
+from .script import P2PKH, P2TR, P2WPKH, classify_script
+from .weight import WITNESS_SCALE_FACTOR, TxWeight
+
+# Serialized input size and witness stack size per spendable template.
+# P2PKH: outpoint (36) + script length (1) + scriptSig (1 + 72 + 1 + 33) +
+# sequence (4), with an empty witness stack in SegWit transactions.
+# P2WPKH: outpoint + empty scriptSig + sequence, and a witness of an item
+# count, a signature of at most 72 bytes (low S) and a compressed key.
+# P2TR (key path): the same base and a witness of an item count and a
+# 64-byte Schnorr signature (SIGHASH_DEFAULT), 57.5 vbytes in all.
+INPUT_SIZES = {
+    P2PKH: (148, 1),
+    P2WPKH: (41, 108),
+    P2TR: (41, 66),
+}
+
+# Serialized output size per template: amount (8) + length (1) + script
+OUTPUT_SIZES = {
+    P2PKH: 34,
+    P2WPKH: 31,
+    P2TR: 43,
+}
+
+# Smallest economical change output (Bitcoin Core's dust limits)
+DUST = {
+    P2PKH: 546,
+    P2WPKH: 294,
+    P2TR: 330,
+}
+
+BNB_MAX_TRIES = 100000
+KNAPSACK_ITERATIONS = 1000
+KNAPSACK_WINDOW = 256
+DEFAULT_TIME_BUDGET = 0.5
+
+# Check the clock every this many search steps
+_CLOCK_INTERVAL = 1024
+
+
+def input_weight(template: str) -> int:
+    """
+    Weight of an input spending a script template, witness included.
+
+    Parameters:
+        template (str): `P2PKH`, `P2WPKH` or `P2TR`
+
+    Returns:
+        int: Input weight in weight units
+    """
+    try:
+        base, witness = INPUT_SIZES[template]
+    except KeyError:
+        raise ValueError(f"cannot estimate the size of a {template} input") from None
+    return base * WITNESS_SCALE_FACTOR + witness
+
+
+def output_weight(template: str) -> int:
+    """
+    Weight of an output paying to a script template.
+
+    Parameters:
+        template (str): `P2PKH`, `P2WPKH` or `P2TR`
+
+    Returns:
+        int: Output weight in weight units
+    """
+    try:
+        return OUTPUT_SIZES[template] * WITNESS_SCALE_FACTOR
+    except KeyError:
+        raise ValueError(f"unknown script template {template!r}") from None
+
+
+def _fee(feerate: float, weight: int) -> int:
+    """Fee in satoshis for `weight` at `feerate` sat/vB, rounded up."""
+    return math.ceil(feerate * weight / WITNESS_SCALE_FACTOR)
+
+
+class Selection(NamedTuple):
+    """The outcome of a coin selection."""
+    algorithm: str
+    inputs: list
+    input_value: int
+    fee: int
+    change: int
+    weight: TxWeight
+
+    @property
+    def feerate(self) -> float:
+        """Fee actually paid, in satoshis per vbyte."""
+        return self.fee / self.weight.vsize
+
+
+class CoinSelector:
+    """
+    Sorted, array-backed candidate set for selections at one feerate.
+    """
+
+    def __init__(self, utxos, feerate: float, long_term_feerate: float = None,
+                 change_template: str = P2WPKH):
+        """
+        Parameters:
+            utxos: Iterable of (outpoint, entry) pairs, where entry has
+                `amount` and a bare `script` (such as `UtxoEntry`); UTXOs
+                of templates without an `INPUT_SIZES` entry are skipped
+            feerate (float): Target feerate in satoshis per vbyte
+            long_term_feerate (float): Feerate expected when coins are spent
+                later, used to weigh waste (default: `feerate`)
+            change_template (str): Template of the change output
+        """
+        if feerate < 0:
+            raise ValueError("feerate must not be negative")
+        self.feerate = feerate
+        self.long_term_feerate = feerate if long_term_feerate is None else long_term_feerate
+        self.change_template = change_template
+
+        change_weight = output_weight(change_template)
+        self.change_fee = _fee(feerate, change_weight)
+        # Creating change now and spending it later
+        self.cost_of_change = self.change_fee + _fee(self.long_term_feerate, input_weight(change_template))
+        self.min_change = DUST[change_template]
+
+        utxos = list(utxos)
+        weights = {template: input_weight(template) for template in INPUT_SIZES}
+        fees = {template: _fee(feerate, weight) for template, weight in weights.items()}
+        long_term_fees = {
+            template: _fee(self.long_term_feerate, weight) for template, weight in weights.items()
+        }
+
+        values = []
+        positions = []
+        templates = []
+        skipped = 0
+        for position, (_, entry) in enumerate(utxos):
+            template, _ = classify_script(entry.script)
+            if template not in weights:
+                skipped += 1
+                continue
+            value = entry.amount - fees[template]
+            if value > 0:
+                values.append(value)
+                positions.append(position)
+                templates.append(template)
+        # Largest first; the sort is stable, so equal values keep wallet order
+        order = sorted(range(len(values)), key=values.__getitem__, reverse=True)
+
+        self.utxos = utxos
+        self.skipped = skipped
+        self.values = array('q', [values[i] for i in order])
+        self.positions = array('q', [positions[i] for i in order])
+        templates = [templates[i] for i in order]
+        self.waste = array('q', [fees[t] - long_term_fees[t] for t in templates])
+        self.input_sizes = array('l', [INPUT_SIZES[t][0] for t in templates])
+        self.witness_sizes = array('l', [INPUT_SIZES[t][1] for t in templates])
+        self.cumulative = array('q', [0])
+        self.cumulative.extend(itertools.accumulate(self.values))
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def total(self) -> int:
+        """Sum of all effective values."""
+        return self.cumulative[-1]
+
+    def _count_at_least(self, value: int) -> int:
+        """Number of candidates with an effective value of at least `value`."""
+        # Values are descending, so their negations are ascending
+        return bisect_right(self.values, -value, key=lambda v: -v)
+
+    def _branch_and_bound(self, target: int, deadline: float) -> list:
+        """Search for a changeless selection; returns indices or None."""
+        values = self.values
+        waste = self.waste
+        upper = target + self.cost_of_change
+        high_feerate = self.feerate > self.long_term_feerate
+        clock = time.perf_counter
+
+        selection = []
+        best = None
+        best_waste = math.inf
+        current_value = 0
+        current_waste = 0
+        available = self.total
+        index = 0
+        for tries in range(BNB_MAX_TRIES):
+            if tries % _CLOCK_INTERVAL == 0 and clock() > deadline:
+                break
+            backtrack = False
+            if (current_value + available < target or current_value > upper or
+                    (current_waste > best_waste and high_feerate)):
+                backtrack = True
+            elif current_value >= target:
+                candidate_waste = current_waste + current_value - target
+                if candidate_waste <= best_waste:
+                    best = list(selection)
+                    best_waste = candidate_waste
+                backtrack = True
+
+            if backtrack:
+                if not selection:
+                    break
+                # Return the skipped candidates to the lookahead, then try
+                # the branch without the last included one
+                index -= 1
+                while index > selection[-1]:
+                    available += values[index]
+                    index -= 1
+                current_value -= values[index]
+                current_waste -= waste[index]
+                selection.pop()
+            else:
+                available -= values[index]
+                # Skip a candidate equal to an excluded predecessor: that
+                # branch was already explored
+                if (not selection or index - 1 == selection[-1] or
+                        values[index] != values[index - 1] or waste[index] != waste[index - 1]):
+                    selection.append(index)
+                    current_value += values[index]
+                    current_waste += waste[index]
+            index += 1
+        return best
+
+    def _best_subset(self, start: int, end: int, target: int, rng: random.Random,
+                     deadline: float) -> tuple:
+        """Randomized passes over candidates [start, end); returns (value, indices)."""
+        values = self.values[start:end]
+        count = len(values)
+        cumulative = self.cumulative
+        # Start from the largest candidates that reach the target, which is
+        # also the answer when the time budget is already spent
+        greedy = bisect_left(cumulative, cumulative[start] + target, start, end + 1) - start
+        best_value = cumulative[start + greedy] - cumulative[start]
+        best = list(range(greedy))
+        clock = time.perf_counter
+        expired = False
+        for iteration in range(KNAPSACK_ITERATIONS):
+            if expired or best_value == target or clock() > deadline:
+                break
+            included = [False] * count
+            # Candidates kept in this pass, in the order they were added. A
+            # candidate that reaches the target is removed again at once, so
+            # the set at any point is a prefix of `chosen` plus that
+            # candidate: an improvement is recorded as (prefix length, index)
+            # and the list is only built at the end of the pass.
+            chosen = []
+            improved = None
+            total = 0
+            reached = False
+            for second_pass in (False, True):
+                if reached or expired:
+                    break
+                for i in range(count):
+                    if i % _CLOCK_INTERVAL == 0 and clock() > deadline:
+                        expired = True
+                        break
+                    if (not included[i]) if second_pass else rng.random() < 0.5:
+                        total += values[i]
+                        if total >= target:
+                            reached = True
+                            if total < best_value:
+                                best_value = total
+                                improved = (len(chosen), i)
+                            total -= values[i]
+                        else:
+                            included[i] = True
+                            chosen.append(i)
+            if improved is not None:
+                length, last = improved
+                best = sorted(chosen[:length] + [last])
+        return best_value, [start + i for i in best]
+
+    def _knapsack(self, target: int, deadline: float, rng: random.Random) -> list:
+        """Approximate selection allowing change; returns indices or None."""
+        values = self.values
+        cumulative = self.cumulative
+        with_change = target + self.change_fee + self.min_change
+
+        # Exact match with a single candidate
+        at_least = self._count_at_least(target)
+        if at_least and values[at_least - 1] == target:
+            return [at_least - 1]
+
+        # Candidates below `with_change` and the smallest one above it
+        larger = self._count_at_least(with_change)
+        lowest_larger = larger - 1 if larger else None
+        lower_total = cumulative[-1] - cumulative[larger]
+        if lower_total == target:
+            return list(range(larger, len(values)))
+        if lower_total < target:
+            return None if lowest_larger is None else [lowest_larger]
+
+        # Only the largest of the smaller candidates take part in the passes
+        goal = cumulative[larger] + (with_change if lower_total >= with_change else target)
+        needed = bisect_left(cumulative, goal) - larger
+        end = min(len(values), larger + max(KNAPSACK_WINDOW, 4 * needed))
+
+        best_value, best = self._best_subset(larger, end, target, rng, deadline)
+        if best_value != target and best_value < with_change and lower_total >= with_change:
+            best_value, best = self._best_subset(larger, end, with_change, rng, deadline)
+
+        if lowest_larger is not None and (
+                (best_value != target and best_value < with_change) or
+                values[lowest_larger] <= best_value):
+            return [lowest_larger]
+        return best
+
+    def select(self, outputs, time_budget: float = DEFAULT_TIME_BUDGET, seed: int = None) -> Selection:
+        """
+        Choose inputs paying for a set of outputs at the selector's feerate.
+
+        Parameters:
+            outputs (list): Serialized outputs to pay, as from `create_output`
+            time_budget (float): Seconds to spend searching, shared by the
+                strategies; the best selection found so far is used when
+                it runs out
+            seed (int): Seed for the knapsack's random passes
+
+        Returns:
+            Selection: The chosen inputs (the given (outpoint, entry)
+                pairs), fee, change amount (0 for no change output) and
+                the transaction's size figures
+
+        Raises:
+            ValueError: If the candidates cannot pay for the outputs
+        """
+        deadline = time.perf_counter() + time_budget
+        outputs = list(outputs)
+        payment = sum(int.from_bytes(output[:8], 'little') for output in outputs)
+        # Fixed part of the transaction. The input and output counts are
+        # charged at the widest they may get (change included), which
+        # overpays by at most a few vbytes, and 3 weight units cover
+        # rounding the whole transaction up to vbytes.
+        base = TxWeight(outputs=outputs, segwit=True)
+        fixed_weight = (
+            base.weight + WITNESS_SCALE_FACTOR - 1 +
+            WITNESS_SCALE_FACTOR * (varint_size(len(self.values)) - 1) +
+            WITNESS_SCALE_FACTOR * (varint_size(len(outputs) + 1) - varint_size(len(outputs)))
+        )
+        target = payment + _fee(self.feerate, fixed_weight)
+        if target > self.total:
+            raise ValueError("insufficient funds")
+
+        algorithm = 'bnb'
+        chosen = self._branch_and_bound(target, deadline)
+        if chosen is None:
+            algorithm = 'knapsack'
+            chosen = self._knapsack(target, deadline, random.Random(seed))
+        if chosen is None:
+            raise ValueError("insufficient funds")
+
+        effective = sum(self.values[i] for i in chosen)
+        excess = effective - target
+        change = 0
+        output_sizes = [len(output) for output in outputs]
+        if algorithm == 'knapsack' and excess >= self.change_fee + self.min_change:
+            change = excess - self.change_fee
+            output_sizes.append(OUTPUT_SIZES[self.change_template])
+
+        weight = TxWeight(
+            inputs=[self.input_sizes[i] for i in chosen],
+            outputs=output_sizes,
+            witnesses=[self.witness_sizes[i] for i in chosen],
+        )
+        inputs = [self.utxos[self.positions[i]] for i in chosen]
+        input_value = sum(entry.amount for _, entry in inputs)
+        return Selection(algorithm, inputs, input_value, input_value - payment - change, change, weight)
+
+
+def select_coins(utxos, outputs, feerate: float, long_term_feerate: float = None,
+                 change_template: str = P2WPKH, time_budget: float = DEFAULT_TIME_BUDGET,
+                 seed: int = None) -> Selection:
+    """
+    Choose inputs from a wallet's UTXOs to pay for outputs.
+
+    Build a `CoinSelector` instead when selecting repeatedly from the same
+    UTXOs at the same feerate.
+
+    Parameters:
+        utxos: Iterable of (outpoint, entry) pairs, entry having `amount`
+            and a bare `script`
+        outputs (list): Serialized outputs to pay
+        feerate (float): Target feerate in satoshis per vbyte
+        long_term_feerate (float): Feerate expected for spending change later
+        change_template (str): Template of the change output
+        time_budget (float): Seconds to spend searching
+        seed (int): Seed for the knapsack's random passes
+
+    Returns:
+        Selection: The chosen inputs, fee and change
+    """
+    selector = CoinSelector(utxos, feerate, long_term_feerate, change_template)
+    return selector.select(outputs, time_budget, seed)
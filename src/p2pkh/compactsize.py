@@ -0,0 +1,161 @@
+"""
+Shared varint (CompactSize) codec used for every length prefix.
+
+Values below 0xfd take one byte; larger values take a 0xfd, 0xfe or 0xff
+marker followed by 2, 4 or 8 little-endian bytes. Almost every prefix in a
+real transaction is a single byte, so that case is served from a table of
+preallocated byte strings. The bulk functions encode or decode a whole
+sequence of integers, such as all script lengths in a block, in one call.
+"""
+
+import struct
+
+_SINGLE = [bytes([value]) for value in range(0xfd)]
+
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_U64 = struct.Struct('<Q')
+
+MAX_VARINT = 0xffffffffffffffff
+
+
+def varint(value: int) -> bytes:
+    """
+    Convert an integer to a variable-length integer.
+
+    Parameters:
+        value (int): The integer value to encode
+
+    Returns:
+        bytes: The varint encoded bytes
+    """
+    if 0 <= value < 0xfd:
+        return _SINGLE[value]
+    if value < 0:
+        raise ValueError("varint cannot encode negative values")
+    if value <= 0xffff:
+        return b'\xfd' + _U16.pack(value)
+    if value <= 0xffffffff:
+        return b'\xfe' + _U32.pack(value)
+    if value <= MAX_VARINT:
+        return b'\xff' + _U64.pack(value)
+    raise ValueError("varint value out of range")
+
+
+def varint_size(value: int) -> int:
+    """
+    Return the number of bytes `varint(value)` takes.
+
+    Parameters:
+        value (int): The integer value to encode
+
+    Returns:
+        int: Encoded size in bytes
+    """
+    if value < 0xfd:
+        return 1
+    if value <= 0xffff:
+        return 3
+    if value <= 0xffffffff:
+        return 5
+    return 9
+
+
+def read_varint(buffer, offset: int = 0) -> tuple:
+    """
+    Decode a variable-length integer from a buffer.
+
+    Parameters:
+        buffer: bytes, bytearray or memoryview to read from
+        offset (int): Position of the varint in the buffer
+
+    Returns:
+        tuple: (value, offset just past the varint)
+    """
+    try:
+        prefix = buffer[offset]
+        if prefix < 0xfd:
+            return prefix, offset + 1
+        if prefix == 0xfd:
+            return _U16.unpack_from(buffer, offset + 1)[0], offset + 3
+        if prefix == 0xfe:
+            return _U32.unpack_from(buffer, offset + 1)[0], offset + 5
+        return _U64.unpack_from(buffer, offset + 1)[0], offset + 9
+    except (IndexError, struct.error):
+        raise ValueError("truncated varint") from None
+
+
+def encode_varints(values) -> bytes:
+    """
+    Encode a sequence of integers as back-to-back varints.
+
+    Parameters:
+        values: Iterable of non-negative integers
+
+    Returns:
+        bytes: The concatenated encodings
+    """
+    single = _SINGLE
+    return b''.join([
+        single[value] if 0 <= value < 0xfd else varint(value)
+        for value in values
+    ])
+
+
+def encode_varints_into(values, buffer, offset: int = 0) -> int:
+    """
+    Write a sequence of integers as varints into a writable buffer.
+
+    Parameters:
+        values: Iterable of non-negative integers
+        buffer: bytearray or writable memoryview with enough room
+        offset (int): Position to start writing at
+
+    Returns:
+        int: Offset just past the last varint
+    """
+    size = len(buffer)
+    for value in values:
+        if 0 <= value < 0xfd and offset < size:
+            buffer[offset] = value
+            offset += 1
+            continue
+        encoded = varint(value)
+        end = offset + len(encoded)
+        if end > size:
+            raise ValueError("buffer too small for varints")
+        buffer[offset:end] = encoded
+        offset = end
+    return offset
+
+
+def decode_varints(buffer, count: int, offset: int = 0) -> tuple:
+    """
+    Decode `count` back-to-back varints.
+
+    Parameters:
+        buffer: bytes, bytearray or memoryview to read from
+        count (int): Number of varints to decode
+        offset (int): Position of the first varint
+
+    Returns:
+        tuple: (list of values, list of the offset each varint starts at,
+            offset just past the last varint)
+    """
+    values = []
+    offsets = []
+    append_value = values.append
+    append_offset = offsets.append
+    size = len(buffer)
+    for _ in range(count):
+        if offset >= size:
+            raise ValueError("truncated varint")
+        append_offset(offset)
+        prefix = buffer[offset]
+        if prefix < 0xfd:
+            append_value(prefix)
+            offset += 1
+        else:
+            value, offset = read_varint(buffer, offset)
+            append_value(value)
+    return values, offsets, offset
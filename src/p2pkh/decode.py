@@ -0,0 +1,307 @@
+"""
+Zero-copy transaction decoder, the inverse of `assemble_transaction`.
+
+Decoding walks the serialized transaction once and records only offsets into
+the original buffer. Fields such as amounts, scripts and witness items are
+materialized when they are accessed, and byte fields are returned as
+`memoryview` slices of the source buffer rather than copies.
+"""
+
+import hashlib
+
+from .address import MAINNET, Network, script_to_address
+from .compactsize import read_varint
+from .weight import WITNESS_SCALE_FACTOR
+
+
+def _require(buffer, end: int, what: str) -> None:
+    """Raise ValueError if the buffer ends before `end`."""
+    if end > len(buffer):
+        raise ValueError(f"truncated transaction: {what}")
+
+
+class TxInView:
+    """
+    Lazily decoded view of one serialized input.
+    """
+    __slots__ = ('_buf', '_start', '_script_start', '_end')
+
+    def __init__(self, buf: memoryview, start: int, script_start: int, end: int):
+        self._buf = buf
+        self._start = start
+        self._script_start = script_start
+        self._end = end
+
+    @property
+    def raw(self) -> memoryview:
+        """The serialized input, as returned by `create_input`."""
+        return self._buf[self._start:self._end]
+
+    @property
+    def outpoint(self) -> memoryview:
+        """The 36-byte outpoint (txid in little-endian + vout)."""
+        return self._buf[self._start:self._start + 36]
+
+    @property
+    def txid(self) -> str:
+        """The spent transaction ID as a hex string."""
+        return bytes(self._buf[self._start:self._start + 32])[::-1].hex()
+
+    @property
+    def vout(self) -> int:
+        """The spent output index."""
+        return int.from_bytes(self._buf[self._start + 32:self._start + 36], 'little')
+
+    @property
+    def script_sig(self) -> memoryview:
+        """The unlocking script, without its length prefix."""
+        return self._buf[self._script_start:self._end - 4]
+
+    @property
+    def sequence(self) -> memoryview:
+        """The 4-byte sequence number."""
+        return self._buf[self._end - 4:self._end]
+
+
+class TxOutView:
+    """
+    Lazily decoded view of one serialized output.
+    """
+    __slots__ = ('_buf', '_start', '_script_start', '_end')
+
+    def __init__(self, buf: memoryview, start: int, script_start: int, end: int):
+        self._buf = buf
+        self._start = start
+        self._script_start = script_start
+        self._end = end
+
+    @property
+    def raw(self) -> memoryview:
+        """The serialized output, as returned by `create_output`."""
+        return self._buf[self._start:self._end]
+
+    @property
+    def amount(self) -> int:
+        """The output amount in satoshis."""
+        return int.from_bytes(self._buf[self._start:self._start + 8], 'little')
+
+    @property
+    def script_pubkey(self) -> memoryview:
+        """The locking script including its length prefix, as in `create_output`."""
+        return self._buf[self._start + 8:self._end]
+
+    @property
+    def script(self) -> memoryview:
+        """The locking script without its length prefix."""
+        return self._buf[self._script_start:self._end]
+
+    def address(self, network: Network = MAINNET) -> str:
+        """The address the output pays to, or None for non-standard scripts."""
+        return script_to_address(self.script, network)
+
+
+class TransactionView:
+    """
+    Offsets into a serialized transaction with lazily decoded fields.
+    """
+    __slots__ = ('_buf', '_start', '_end', 'segwit', '_body_start', '_outputs_end',
+                 '_inputs', '_outputs', '_witnesses', '_txid', '_wtxid')
+
+    def __init__(self, buf: memoryview, start: int, end: int, segwit: bool,
+                 body_start: int, outputs_end: int,
+                 inputs: list, outputs: list, witnesses: list):
+        self._buf = buf
+        self._start = start
+        self._end = end
+        self.segwit = segwit
+        self._body_start = body_start
+        self._outputs_end = outputs_end
+        self._inputs = inputs
+        self._outputs = outputs
+        self._witnesses = witnesses
+        self._txid = None
+        self._wtxid = None
+
+    @property
+    def raw(self) -> memoryview:
+        """The complete serialized transaction."""
+        return self._buf[self._start:self._end]
+
+    @property
+    def size(self) -> int:
+        """Serialized size in bytes, including witness data."""
+        return self._end - self._start
+
+    @property
+    def base_size(self) -> int:
+        """Size without marker, flag and witness data."""
+        return 8 + self._outputs_end - self._body_start
+
+    @property
+    def weight(self) -> int:
+        """Transaction weight (BIP141)."""
+        return self.base_size * (WITNESS_SCALE_FACTOR - 1) + self.size
+
+    @property
+    def vsize(self) -> int:
+        """Virtual size in vbytes, rounded up."""
+        return -(-self.weight // WITNESS_SCALE_FACTOR)
+
+    @property
+    def version(self) -> int:
+        """Transaction version."""
+        return int.from_bytes(self._buf[self._start:self._start + 4], 'little')
+
+    @property
+    def locktime(self) -> int:
+        """Transaction locktime."""
+        return int.from_bytes(self._buf[self._end - 4:self._end], 'little')
+
+    @property
+    def inputs(self) -> list:
+        """List of `TxInView` objects."""
+        return [TxInView(self._buf, *offsets) for offsets in self._inputs]
+
+    @property
+    def outputs(self) -> list:
+        """List of `TxOutView` objects."""
+        return [TxOutView(self._buf, *offsets) for offsets in self._outputs]
+
+    def witness_raw(self, index: int) -> memoryview:
+        """
+        Return the serialized witness stack of one input.
+
+        Parameters:
+            index (int): Input index
+
+        Returns:
+            memoryview: The stack as passed to `assemble_transaction`
+        """
+        if not self.segwit:
+            return memoryview(b'\x00')
+        start, end = self._witnesses[index]
+        return self._buf[start:end]
+
+    def witness(self, index: int) -> list:
+        """
+        Return the witness items of one input.
+
+        Parameters:
+            index (int): Input index
+
+        Returns:
+            list: memoryview of each witness item, without length prefixes
+        """
+        stack = self.witness_raw(index)
+        count, offset = read_varint(stack, 0)
+        items = []
+        for _ in range(count):
+            length, offset = read_varint(stack, offset)
+            _require(stack, offset + length, "witness item")
+            items.append(stack[offset:offset + length])
+            offset += length
+        return items
+
+    @property
+    def witnesses(self) -> list:
+        """Serialized witness stack of every input."""
+        return [self.witness_raw(i) for i in range(len(self._inputs))]
+
+    @property
+    def txid(self) -> str:
+        """Transaction ID (hash of the non-witness serialization) as hex."""
+        if self._txid is None:
+            buf = self._buf
+            state = hashlib.sha256(buf[self._start:self._start + 4])
+            state.update(buf[self._body_start:self._outputs_end])
+            state.update(buf[self._end - 4:self._end])
+            self._txid = hashlib.sha256(state.digest()).digest()[::-1].hex()
+        return self._txid
+
+    @property
+    def wtxid(self) -> str:
+        """Witness transaction ID (hash of the full serialization) as hex."""
+        if self._wtxid is None:
+            first = hashlib.sha256(self.raw).digest()
+            self._wtxid = hashlib.sha256(first).digest()[::-1].hex()
+        return self._wtxid
+
+
+def decode_transaction(buffer, offset: int = 0) -> tuple:
+    """
+    Decode one transaction starting at `offset`.
+
+    Parameters:
+        buffer: bytes, bytearray, mmap or memoryview holding the transaction
+        offset (int): Position of the transaction in the buffer
+
+    Returns:
+        tuple: (TransactionView, offset just past the transaction)
+    """
+    buf = buffer if isinstance(buffer, memoryview) else memoryview(buffer)
+    start = offset
+    _require(buf, offset + 5, "version")
+    offset += 4
+
+    segwit = buf[offset] == 0 and offset + 1 < len(buf) and buf[offset + 1] == 1
+    if segwit:
+        offset += 2
+    body_start = offset
+
+    input_count, offset = read_varint(buf, offset)
+    inputs = []
+    for _ in range(input_count):
+        input_start = offset
+        _require(buf, offset + 36, "input outpoint")
+        script_len, script_start = read_varint(buf, offset + 36)
+        offset = script_start + script_len + 4
+        _require(buf, offset, "input script")
+        inputs.append((input_start, script_start, offset))
+
+    output_count, offset = read_varint(buf, offset)
+    outputs = []
+    for _ in range(output_count):
+        output_start = offset
+        _require(buf, offset + 8, "output amount")
+        script_len, script_start = read_varint(buf, offset + 8)
+        offset = script_start + script_len
+        _require(buf, offset, "output script")
+        outputs.append((output_start, script_start, offset))
+    outputs_end = offset
+
+    witnesses = []
+    if segwit:
+        for _ in range(input_count):
+            witness_start = offset
+            item_count, offset = read_varint(buf, offset)
+            for _ in range(item_count):
+                item_len, offset = read_varint(buf, offset)
+                offset += item_len
+                _require(buf, offset, "witness item")
+            witnesses.append((witness_start, offset))
+
+    offset += 4
+    _require(buf, offset, "locktime")
+    tx = TransactionView(buf, start, offset, segwit, body_start, outputs_end,
+                         inputs, outputs, witnesses)
+    return tx, offset
+
+
+def iter_transactions(buffer, count: int = None, offset: int = 0):
+    """
+    Yield transactions serialized back to back in a buffer.
+
+    Parameters:
+        buffer: bytes, bytearray, mmap or memoryview to read from
+        count (int): Number of transactions to read (default: until the end)
+        offset (int): Position of the first transaction
+
+    Yields:
+        TransactionView: One view per transaction
+    """
+    buf = buffer if isinstance(buffer, memoryview) else memoryview(buffer)
+    decoded = 0
+    while (count is None and offset < len(buf)) or (count is not None and decoded < count):
+        tx, offset = decode_transaction(buf, offset)
+        decoded += 1
+        yield tx
@@ -0,0 +1,167 @@
+"""
+Hash helpers shared by the transaction, digest and signature modules.
+
+RIPEMD160 comes from hashlib when the underlying OpenSSL provides it; some
+builds (OpenSSL 3 without the legacy provider) do not, in which case the
+pure Python `ripemd160` below is used instead.
+"""
+
+import hashlib
+import struct
+
+# Message word order, rotation amounts and constants for the left and right lines
+_R_LEFT = (
+    0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15,
+    7, 4, 13, 1, 10, 6, 15, 3, 12, 0, 9, 5, 2, 14, 11, 8,
+    3, 10, 14, 4, 9, 15, 8, 1, 2, 7, 0, 6, 13, 11, 5, 12,
+    1, 9, 11, 10, 0, 8, 12, 4, 13, 3, 7, 15, 14, 5, 6, 2,
+    4, 0, 5, 9, 7, 12, 2, 10, 14, 1, 3, 8, 11, 6, 15, 13,
+)
+_R_RIGHT = (
+    5, 14, 7, 0, 9, 2, 11, 4, 13, 6, 15, 8, 1, 10, 3, 12,
+    6, 11, 3, 7, 0, 13, 5, 10, 14, 15, 8, 12, 4, 9, 1, 2,
+    15, 5, 1, 3, 7, 14, 6, 9, 11, 8, 12, 2, 10, 0, 4, 13,
+    8, 6, 4, 1, 3, 11, 15, 0, 5, 12, 2, 13, 9, 7, 10, 14,
+    12, 15, 10, 4, 1, 5, 8, 7, 6, 2, 13, 14, 0, 3, 9, 11,
+)
+_S_LEFT = (
+    11, 14, 15, 12, 5, 8, 7, 9, 11, 13, 14, 15, 6, 7, 9, 8,
+    7, 6, 8, 13, 11, 9, 7, 15, 7, 12, 15, 9, 11, 7, 13, 12,
+    11, 13, 6, 7, 14, 9, 13, 15, 14, 8, 13, 6, 5, 12, 7, 5,
+    11, 12, 14, 15, 14, 15, 9, 8, 9, 14, 5, 6, 8, 6, 5, 12,
+    9, 15, 5, 11, 6, 8, 13, 12, 5, 12, 13, 14, 11, 8, 5, 6,
+)
+_S_RIGHT = (
+    8, 9, 9, 11, 13, 15, 15, 5, 7, 7, 8, 11, 14, 14, 12, 6,
+    9, 13, 15, 7, 12, 8, 9, 11, 7, 7, 12, 7, 6, 15, 13, 11,
+    9, 7, 15, 11, 8, 6, 6, 14, 12, 13, 5, 14, 13, 13, 7, 5,
+    15, 5, 8, 11, 14, 14, 6, 14, 6, 9, 12, 9, 12, 5, 15, 8,
+    8, 5, 12, 9, 12, 5, 14, 6, 8, 13, 6, 5, 15, 13, 11, 11,
+)
+_K_LEFT = (0x00000000, 0x5a827999, 0x6ed9eba1, 0x8f1bbcdc, 0xa953fd4e)
+_K_RIGHT = (0x50a28be6, 0x5c4dd124, 0x6d703ef3, 0x7a6d76e9, 0x00000000)
+_MASK = 0xffffffff
+
+
+def _f(round_index: int, x: int, y: int, z: int) -> int:
+    """The RIPEMD160 boolean function for one group of 16 steps."""
+    if round_index == 0:
+        return x ^ y ^ z
+    if round_index == 1:
+        return (x & y) | (~x & z)
+    if round_index == 2:
+        return ((x | ~y) & _MASK) ^ z
+    if round_index == 3:
+        return (x & z) | (y & ~z)
+    return x ^ ((y | ~z) & _MASK)
+
+
+def _rotl(x: int, n: int) -> int:
+    return ((x << n) | (x >> (32 - n))) & _MASK
+
+
+def ripemd160(data: bytes) -> bytes:
+    """
+    Pure Python RIPEMD160, used when hashlib does not provide it.
+
+    Parameters:
+        data (bytes): Data to hash
+
+    Returns:
+        bytes: The 20-byte hash
+    """
+    data = bytes(data)
+    padded = data + b'\x80' + b'\x00' * ((55 - len(data)) % 64) + struct.pack('<Q', len(data) * 8)
+    h = [0x67452301, 0xefcdab89, 0x98badcfe, 0x10325476, 0xc3d2e1f0]
+    for block in range(0, len(padded), 64):
+        x = struct.unpack_from('<16I', padded, block)
+        al, bl, cl, dl, el = h
+        ar, br, cr, dr, er = h
+        for j in range(80):
+            group = j >> 4
+            t = _rotl((al + _f(group, bl, cl, dl) + x[_R_LEFT[j]] + _K_LEFT[group]) & _MASK,
+                      _S_LEFT[j])
+            al, bl, cl, dl, el = el, (t + el) & _MASK, bl, _rotl(cl, 10), dl
+            t = _rotl((ar + _f(4 - group, br, cr, dr) + x[_R_RIGHT[j]] + _K_RIGHT[group]) & _MASK,
+                      _S_RIGHT[j])
+            ar, br, cr, dr, er = er, (t + er) & _MASK, br, _rotl(cr, 10), dr
+        h = [
+            (h[1] + cl + dr) & _MASK,
+            (h[2] + dl + er) & _MASK,
+            (h[3] + el + ar) & _MASK,
+            (h[4] + al + br) & _MASK,
+            (h[0] + bl + cr) & _MASK,
+        ]
+    return struct.pack('<5I', *h)
+
+
+try:
+    _RIPEMD160 = hashlib.new('ripemd160')
+except ValueError:
+    _RIPEMD160 = None
+
+
+def sha256(data: bytes) -> bytes:
+    """
+    Perform a single SHA256 hash.
+
+    Parameters:
+        data (bytes): Data to hash
+
+    Returns:
+        bytes: The SHA256 hash
+    """
+    return hashlib.sha256(data).digest()
+
+
+def dsha256(data: bytes) -> bytes:
+    """
+    Perform double SHA256 hashing.
+
+    Parameters:
+        data (bytes): Data to hash
+
+    Returns:
+        bytes: The double SHA256 hash
+    """
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+
+def hash160(data: bytes) -> bytes:
+    """
+    Perform RIPEMD160(SHA256(data)), as used for public key hashes.
+
+    Parameters:
+        data (bytes): Data to hash
+
+    Returns:
+        bytes: The 20-byte hash
+    """
+    if _RIPEMD160 is None:
+        return ripemd160(hashlib.sha256(data).digest())
+    state = _RIPEMD160.copy()
+    state.update(hashlib.sha256(data).digest())
+    return state.digest()
+
+
+def hash160_many(items) -> list:
+    """
+    Compute hash160 of many items.
+
+    Parameters:
+        items: Iterable of byte strings, e.g. public keys
+
+    Returns:
+        list: The 20-byte hash of each item
+    """
+    sha = hashlib.sha256
+    if _RIPEMD160 is None:
+        return [ripemd160(sha(item).digest()) for item in items]
+    copy = _RIPEMD160.copy
+    hashes = []
+    append = hashes.append
+    for item in items:
+        state = copy()
+        state.update(sha(item).digest())
+        append(state.digest())
+    return hashes
@@ -0,0 +1,292 @@
+"""
+Opt-in instrumentation of the hot paths: hashing, digests, signing and
+serialization.
+
+`Instrumentation.enable()` replaces the instrumented functions, wherever a
+`p2pkh` module refers to them, with wrappers that record per function:
+
+- call count;
+- bytes processed (see `TARGETS`);
+- cumulative latency and latency percentiles, from a bounded reservoir of
+  samples;
+- allocated memory blocks, as the change of `sys.getallocatedblocks()`
+  across the call. This counts blocks still allocated when the call returns
+  (its result and anything it cached), not temporaries freed inside it.
+
+`disable()` puts the original functions back, so instrumentation that is
+not enabled costs nothing. Wrappers captured while enabled (say by
+`from p2pkh import dsha256` in another module) pass calls straight
+through once disabled. Only the current process is instrumented; work sent
+to process pools by `sign_batch` or `TransactionValidator` is not counted.
+Calls from several threads of the process are all recorded.
+
+`profile()` scopes a fresh `Instrumentation` to one block:
+
+    with profile() as stats:
+        run_batch_job()
+    print(stats.to_json(indent=2))
+"""
+
+import functools
+import importlib
+import json
+import random
+import sys
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+
+MAX_SAMPLES = 10000
+PERCENTILES = (50, 90, 99)
+
+
+def _argument_size(position: int, name: str):
+    """Sizer measuring one bytes argument of the call."""
+    def size(args, kwargs, result):
+        return len(args[position] if len(args) > position else kwargs[name])
+    return size
+
+
+def _result_size(args, kwargs, result):
+    return len(result)
+
+
+def _digest_preimage_size(args, kwargs, result):
+    # BIP143 preimage: 156 fixed bytes plus the script code
+    script_code = args[2] if len(args) > 2 else kwargs['script_code']
+    return 156 + len(script_code)
+
+
+# name: (module, attribute path or paths, sizer); sizer gives the bytes
+# processed. 'sign' covers `sign` and the cached-key path of
+# `get_p2wpkh_witness`.
+TARGETS = {
+    'dsha256': ('p2pkh.hashing', 'dsha256', _argument_size(0, 'data')),
+    'get_transaction_digest': ('p2pkh.sighash', 'SighashContext.digest', _digest_preimage_size),
+    'sign': ('p2pkh.signing', ('sign', '_sign_with_key'), _argument_size(1, 'digest')),
+    'get_pub_from_priv': ('p2pkh.signing', 'get_pub_from_priv', None),
+    'assemble_transaction': ('p2pkh.serialize', 'assemble_transaction', _result_size),
+}
+
+_active = None
+_active_lock = threading.Lock()
+
+
+class CallStats:
+    """Counters and latency samples of one instrumented function."""
+    __slots__ = ('calls', 'bytes', 'total_time', 'allocated_blocks', 'samples',
+                 '_max_samples', '_random', '_lock')
+
+    def __init__(self, max_samples: int = MAX_SAMPLES):
+        self.calls = 0
+        self.bytes = 0
+        self.total_time = 0.0
+        self.allocated_blocks = 0
+        self.samples = array('d')
+        self._max_samples = max_samples
+        self._random = random.Random(0)
+        self._lock = threading.Lock()
+
+    def record(self, elapsed: float, size: int, blocks: int) -> None:
+        """Add one call; safe to call from several threads."""
+        with self._lock:
+            self.calls += 1
+            self.bytes += size
+            self.total_time += elapsed
+            self.allocated_blocks += blocks
+            if len(self.samples) < self._max_samples:
+                self.samples.append(elapsed)
+            else:
+                # Reservoir sampling keeps a uniform sample of all calls
+                slot = self._random.randrange(self.calls)
+                if slot < self._max_samples:
+                    self.samples[slot] = elapsed
+
+    def percentile(self, percent: float, ordered=None) -> float:
+        """Latency percentile in seconds (nearest rank), 0.0 without calls."""
+        if ordered is None:
+            ordered = sorted(self.samples)
+        if not ordered:
+            return 0.0
+        rank = max(1, -(-len(ordered) * percent // 100))
+        return ordered[int(rank) - 1]
+
+    def as_dict(self) -> dict:
+        """Snapshot of the counters as plain numbers."""
+        ordered = sorted(self.samples)
+        snapshot = {
+            'calls': self.calls,
+            'bytes': self.bytes,
+            'total_seconds': self.total_time,
+            'mean_seconds': self.total_time / self.calls if self.calls else 0.0,
+            'max_seconds': ordered[-1] if ordered else 0.0,
+            'allocated_blocks': self.allocated_blocks,
+        }
+        for percent in PERCENTILES:
+            snapshot[f'p{percent}_seconds'] = self.percentile(percent, ordered)
+        return snapshot
+
+
+def _resolve(module_name: str, path: str):
+    """Return (owner, attribute name, current value) for a dotted attribute path."""
+    owner = importlib.import_module(module_name)
+    *parents, attribute = path.split('.')
+    for parent in parents:
+        owner = getattr(owner, parent)
+    return owner, attribute, owner.__dict__[attribute]
+
+
+class Instrumentation:
+    """
+    Records calls to the functions in `TARGETS` while enabled.
+
+    Only one instance can be enabled at a time. Instances are context
+    managers that enable on entry and disable on exit.
+    """
+
+    def __init__(self, targets=None, max_samples: int = MAX_SAMPLES, allocations: bool = True):
+        """
+        Parameters:
+            targets: Names from `TARGETS` to instrument (default: all)
+            max_samples (int): Latency samples kept per function
+            allocations (bool): Whether to count allocated memory blocks
+        """
+        names = list(TARGETS) if targets is None else list(targets)
+        unknown = [name for name in names if name not in TARGETS]
+        if unknown:
+            raise ValueError(f"unknown instrumentation targets {unknown}")
+        if max_samples < 1:
+            raise ValueError("max_samples must be at least 1")
+        self.targets = names
+        self.max_samples = max_samples
+        self.allocations = allocations
+        self.stats = {name: CallStats(max_samples) for name in names}
+        self._patches = []
+        self._recording = False
+
+    @property
+    def enabled(self) -> bool:
+        return self._recording
+
+    def _wrap(self, function, stats: CallStats, sizer):
+        perf_counter = time.perf_counter
+        blocks = sys.getallocatedblocks if self.allocations else None
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not self._recording:
+                return function(*args, **kwargs)
+            before = blocks() if blocks else 0
+            start = perf_counter()
+            result = function(*args, **kwargs)
+            elapsed = perf_counter() - start
+            allocated = blocks() - before if blocks else 0
+            stats.record(elapsed, sizer(args, kwargs, result) if sizer else 0, allocated)
+            return result
+
+        return wrapper
+
+    def enable(self) -> None:
+        """Install the wrappers and start recording."""
+        global _active
+        with _active_lock:
+            if _active is self:
+                return
+            if _active is not None:
+                raise ValueError("another Instrumentation is already enabled")
+
+            replacements = {}
+            for name in self.targets:
+                module_name, paths, sizer = TARGETS[name]
+                for path in (paths,) if isinstance(paths, str) else paths:
+                    owner, attribute, original = _resolve(module_name, path)
+                    wrapper = self._wrap(original, self.stats[name], sizer)
+                    replacements[id(original)] = (original, wrapper)
+                    self._patch(owner, attribute, original, wrapper)
+
+            # Rebind the names other p2pkh modules imported with `from ... import`
+            for module_name, module in list(sys.modules.items()):
+                if module is None or not (module_name == 'p2pkh' or module_name.startswith('p2pkh.')):
+                    continue
+                for attribute, value in list(vars(module).items()):
+                    replacement = replacements.get(id(value))
+                    if replacement is not None and replacement[0] is value:
+                        self._patch(module, attribute, value, replacement[1])
+
+            self._recording = True
+            _active = self
+
+    def _patch(self, owner, attribute: str, original, wrapper) -> None:
+        setattr(owner, attribute, wrapper)
+        self._patches.append((owner, attribute, original))
+
+    def disable(self) -> None:
+        """Stop recording and restore the original functions."""
+        global _active
+        with _active_lock:
+            self._recording = False
+            for owner, attribute, original in reversed(self._patches):
+                setattr(owner, attribute, original)
+            self._patches = []
+            if _active is self:
+                _active = None
+
+    def reset(self) -> None:
+        """Clear all recorded calls."""
+        self.stats = {name: CallStats(self.max_samples) for name in self.targets}
+        if self._recording:
+            # Wrappers hold their CallStats; reinstall them on the new ones
+            self.disable()
+            self.enable()
+
+    def snapshot(self) -> dict:
+        """
+        Return the recorded statistics.
+
+        Returns:
+            dict: {'enabled': bool, 'functions': {name: counters}} with the
+                counters of `CallStats.as_dict`
+        """
+        return {
+            'enabled': self._recording,
+            'functions': {name: stats.as_dict() for name, stats in self.stats.items()},
+        }
+
+    def to_json(self, indent: int = None) -> str:
+        """Return `snapshot()` as a JSON string."""
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def dump(self, fp, indent: int = None) -> None:
+        """Write `snapshot()` as JSON to a text file object."""
+        fp.write(self.to_json(indent))
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disable()
+        return False
+
+
+instrumentation = Instrumentation()
+
+
+@contextmanager
+def profile(targets=None, max_samples: int = MAX_SAMPLES, allocations: bool = True):
+    """
+    Instrument one block of code with a fresh `Instrumentation`.
+
+    Parameters:
+        targets: Names from `TARGETS` to instrument (default: all)
+        max_samples (int): Latency samples kept per function
+        allocations (bool): Whether to count allocated memory blocks
+
+    Yields:
+        Instrumentation: The enabled instance; its statistics remain
+            readable after the block
+    """
+    session = Instrumentation(targets, max_samples, allocations)
+    with session:
+        yield session
@@ -0,0 +1,384 @@
+"""
+Script interpreter and transaction validator for P2PKH and P2WPKH spends.
+
+`eval_script` runs the small opcode subset needed for P2PKH-style scripts
+(pushes, OP_DUP, OP_HASH160, OP_EQUAL[VERIFY], OP_VERIFY, OP_CHECKSIG[VERIFY]
+and a few stack operations). `TransactionValidator` checks every input of a
+transaction built by `assemble_transaction`:
+
+- legacy inputs run their scriptSig and then the spent scriptPubKey, with
+  signatures checked against `LegacySighashContext` digests;
+- P2WPKH inputs run the implied `OP_DUP OP_HASH160 <h> OP_EQUALVERIFY
+  OP_CHECKSIG` script on the witness stack, with `SighashContext` digests;
+- P2SH outputs and every other witness program (P2WSH, P2TR, future
+  versions) are rejected: their BIP16/BIP141/BIP341 rules are not
+  implemented, and running their scriptPubKey as a bare script would accept
+  spends those rules forbid.
+
+Both digest contexts are built once per transaction. Script evaluation is
+cheap and runs in the calling process; when an OP_CHECKSIG is the last
+opcode of a script its result is the script's result, so the signature
+check is deferred and all deferred checks of a transaction are verified
+together, optionally across a process pool, stopping at the first failure.
+Checks whose result feeds further opcodes are verified inline.
+"""
+
+import hashlib
+from typing import NamedTuple
+
+from .batch import chunked
+from .compactsize import read_varint, varint
+from .decode import decode_transaction
+from .hashing import hash160
+from .script import P2SH, P2WPKH, classify_script, p2pkh_script_pubkey
+from .sighash import LegacySighashContext, SighashContext
+from .sigcache import SignatureCache, signature_cache
+from .verify import verify, verify_chunk
+
+OP_0 = 0x00
+OP_PUSHDATA1 = 0x4c
+OP_PUSHDATA2 = 0x4d
+OP_PUSHDATA4 = 0x4e
+OP_1NEGATE = 0x4f
+OP_1 = 0x51
+OP_16 = 0x60
+OP_NOP = 0x61
+OP_VERIFY = 0x69
+OP_DROP = 0x75
+OP_DUP = 0x76
+OP_EQUAL = 0x87
+OP_EQUALVERIFY = 0x88
+OP_SHA256 = 0xa8
+OP_HASH160 = 0xa9
+OP_CHECKSIG = 0xac
+OP_CHECKSIGVERIFY = 0xad
+
+MAX_SCRIPT_ELEMENT_SIZE = 520
+
+# Below this many deferred signature checks a process pool costs more than it saves
+PARALLEL_THRESHOLD = 8
+
+
+class ScriptError(ValueError):
+    """Raised when a script fails or cannot be evaluated."""
+
+
+class ValidationResult(NamedTuple):
+    """Outcome of validating a transaction."""
+    valid: bool
+    failed_input: int
+    error: str
+
+
+def iter_ops(script: bytes):
+    """
+    Yield (opcode, pushed data or None) for each operation in a script.
+
+    Parameters:
+        script (bytes): Script without length prefix
+
+    Yields:
+        tuple: (opcode, data) where data is None for non-push opcodes
+    """
+    offset = 0
+    size = len(script)
+    while offset < size:
+        opcode = script[offset]
+        offset += 1
+        if opcode > OP_PUSHDATA4:
+            yield opcode, None
+            continue
+        if opcode < OP_PUSHDATA1:
+            length = opcode
+        else:
+            width = {OP_PUSHDATA1: 1, OP_PUSHDATA2: 2, OP_PUSHDATA4: 4}[opcode]
+            if offset + width > size:
+                raise ScriptError("truncated push length")
+            length = int.from_bytes(script[offset:offset + width], 'little')
+            offset += width
+        if offset + length > size:
+            raise ScriptError("push past end of script")
+        yield opcode, bytes(script[offset:offset + length])
+        offset += length
+
+
+def cast_to_bool(value: bytes) -> bool:
+    """Interpret a stack element as a boolean (negative zero is false)."""
+    for i, byte in enumerate(value):
+        if byte:
+            return not (i == len(value) - 1 and byte == 0x80)
+    return False
+
+
+def is_witness_program(script) -> bool:
+    """Whether a scriptPubKey is a witness program of any version (BIP141)."""
+    size = len(script)
+    return (4 <= size <= 42 and (script[0] == OP_0 or OP_1 <= script[0] <= OP_16) and
+            script[1] + 2 == size)
+
+
+def is_push_only(script: bytes) -> bool:
+    """Whether a script contains only push operations."""
+    return all(opcode <= OP_16 for opcode, _ in iter_ops(script))
+
+
+def eval_script(stack: list, script: bytes, checker) -> list:
+    """
+    Execute a script on a stack.
+
+    Parameters:
+        stack (list): Initial stack of byte strings (modified in place)
+        script (bytes): Script without length prefix
+        checker: Function (sig, pubkey, script, final) -> bool performing
+            OP_CHECKSIG; `final` is True when the result is the last thing
+            the script computes
+
+    Returns:
+        list: The resulting stack
+    """
+    ops = list(iter_ops(script))
+    last = len(ops) - 1
+
+    def pop():
+        if not stack:
+            raise ScriptError("stack underflow")
+        return stack.pop()
+
+    for position, (opcode, data) in enumerate(ops):
+        if data is not None:
+            if len(data) > MAX_SCRIPT_ELEMENT_SIZE:
+                raise ScriptError("push exceeds maximum element size")
+            stack.append(data)
+        elif opcode == OP_0:
+            stack.append(b'')
+        elif opcode == OP_1NEGATE:
+            stack.append(b'\x81')
+        elif OP_1 <= opcode <= OP_16:
+            stack.append(bytes([opcode - OP_1 + 1]))
+        elif opcode == OP_NOP:
+            pass
+        elif opcode == OP_DUP:
+            if not stack:
+                raise ScriptError("stack underflow")
+            stack.append(stack[-1])
+        elif opcode == OP_DROP:
+            pop()
+        elif opcode == OP_VERIFY:
+            if not cast_to_bool(pop()):
+                raise ScriptError("OP_VERIFY failed")
+        elif opcode in (OP_EQUAL, OP_EQUALVERIFY):
+            equal = pop() == pop()
+            if opcode == OP_EQUALVERIFY:
+                if not equal:
+                    raise ScriptError("OP_EQUALVERIFY failed")
+            else:
+                stack.append(b'\x01' if equal else b'')
+        elif opcode == OP_SHA256:
+            stack.append(hashlib.sha256(pop()).digest())
+        elif opcode == OP_HASH160:
+            stack.append(hash160(pop()))
+        elif opcode in (OP_CHECKSIG, OP_CHECKSIGVERIFY):
+            pubkey = pop()
+            sig = pop()
+            final = opcode == OP_CHECKSIG and position == last
+            result = checker(sig, pubkey, script, final)
+            if opcode == OP_CHECKSIGVERIFY:
+                if not result:
+                    raise ScriptError("OP_CHECKSIGVERIFY failed")
+            else:
+                stack.append(b'\x01' if result else b'')
+        else:
+            raise ScriptError(f"unsupported opcode 0x{opcode:02x}")
+    return stack
+
+
+def _parse_output(output: bytes) -> tuple:
+    """Split a serialized output into its amount and bare scriptPubKey."""
+    length, start = read_varint(output, 8)
+    if start + length != len(output):
+        raise ValueError("malformed spent output")
+    return int.from_bytes(output[:8], 'little'), output[start:]
+
+
+class DeferredCheck(NamedTuple):
+    """A signature check whose result decides an input's validity."""
+    index: int
+    pubkey: bytes
+    digest: bytes
+    signature: bytes
+
+
+class TransactionValidator:
+    """
+    Validates the inputs of one transaction against the outputs they spend.
+    """
+
+    def __init__(self, tx, spent_outputs: list, cache: SignatureCache = None):
+        """
+        Parameters:
+            tx: Serialized transaction (bytes) or a `TransactionView`
+            spent_outputs (list): Serialized output (as from `create_output`)
+                spent by each input, in input order
+            cache (SignatureCache): Signature cache (default: the shared one)
+        """
+        if isinstance(tx, (bytes, bytearray, memoryview)):
+            tx, _ = decode_transaction(tx)
+        self.tx = tx
+        self.inputs = tx.inputs
+        if len(spent_outputs) != len(self.inputs):
+            raise ValueError("need one spent output per input")
+        self.spent = [_parse_output(bytes(output)) for output in spent_outputs]
+        self.cache = signature_cache if cache is None else cache
+
+        inputs_raw = [bytes(tx_in.raw) for tx_in in self.inputs]
+        outputs_raw = [bytes(tx_out.raw) for tx_out in tx.outputs]
+        self.segwit_context = SighashContext(tx.version, inputs_raw, outputs_raw, tx.locktime)
+        self.legacy_context = LegacySighashContext(tx.version, inputs_raw, outputs_raw, tx.locktime)
+
+    def _checker(self, index: int, digest_for, deferred: list):
+        """Build the OP_CHECKSIG callback for one input."""
+        def check(sig, pubkey, script, final):
+            if not sig:
+                return False
+            digest = digest_for(script, sig[-1])
+            if final:
+                deferred.append(DeferredCheck(index, pubkey, digest, sig))
+                return True
+            return verify(pubkey, digest, sig)
+        return check
+
+    def check_scripts(self, index: int, deferred: list) -> None:
+        """
+        Evaluate the scripts of one input, deferring final signature checks.
+
+        Parameters:
+            index (int): Input index
+            deferred (list): Receives `DeferredCheck` entries
+
+        Raises:
+            ScriptError: If the input's scripts fail
+        """
+        amount, script_pubkey = self.spent[index]
+        script_sig = bytes(self.inputs[index].script_sig)
+        witness = [bytes(item) for item in self.tx.witness(index)] if self.tx.segwit else []
+
+        template, pubkey_hash = classify_script(script_pubkey)
+        if template == P2WPKH:
+            if script_sig:
+                raise ScriptError("P2WPKH input must have an empty scriptSig")
+            if len(witness) != 2:
+                raise ScriptError("P2WPKH witness must have exactly 2 items")
+            # The script code is the P2PKH scriptPubKey for the key hash
+            script_code = p2pkh_script_pubkey(pubkey_hash)
+            script = script_code[1:]
+
+            def digest_for(_, sighash):
+                return self.segwit_context.digest(index, script_code, amount, sighash)
+
+            stack = eval_script(witness, script, self._checker(index, digest_for, deferred))
+            if len(stack) != 1:
+                raise ScriptError("witness script must leave exactly one stack item")
+        elif template == P2SH or is_witness_program(script_pubkey):
+            raise ScriptError(f"{template or 'witness program'} inputs are not supported")
+        else:
+            if witness:
+                raise ScriptError("unexpected witness for a legacy input")
+            if not is_push_only(script_sig):
+                raise ScriptError("scriptSig must be push-only")
+
+            def digest_for(script, sighash):
+                return self.legacy_context.digest(index, varint(len(script)) + script, sighash)
+
+            checker = self._checker(index, digest_for, deferred)
+            stack = eval_script([], script_sig, checker)
+            stack = eval_script(stack, script_pubkey, checker)
+
+        if not stack or not cast_to_bool(stack[-1]):
+            raise ScriptError("script evaluated to false")
+
+    def collect(self) -> list:
+        """
+        Evaluate every input's scripts.
+
+        Returns:
+            list: Deferred signature checks not already in the cache
+
+        Raises:
+            ScriptError: With the failing input index in `args[1]`
+        """
+        deferred = []
+        for index in range(len(self.inputs)):
+            try:
+                self.check_scripts(index, deferred)
+            except ScriptError as error:
+                raise ScriptError(str(error), index) from None
+
+        pending = []
+        for check in deferred:
+            entry = self.cache.entry(check.pubkey, check.digest, check.signature)
+            if not self.cache.contains(entry):
+                pending.append((check, entry))
+        return pending
+
+    def validate(self, processes: int = 1, chunk_size: int = 16) -> ValidationResult:
+        """
+        Validate every input.
+
+        Parameters:
+            processes (int): Worker processes for signature checks
+            chunk_size (int): Signature checks handed to a worker at a time
+
+        Returns:
+            ValidationResult: Whether the transaction is valid, and if not,
+                the first failing input found and why
+        """
+        try:
+            pending = self.collect()
+        except ScriptError as error:
+            return ValidationResult(False, error.args[1], error.args[0])
+
+        if processes == 1 or len(pending) < PARALLEL_THRESHOLD:
+            for check, entry in pending:
+                if not verify(check.pubkey, check.digest, check.signature):
+                    return ValidationResult(False, check.index, "signature check failed")
+                self.cache.add(entry)
+            return ValidationResult(True, None, None)
+
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+        chunks = chunked(pending, chunk_size)
+        pool = ProcessPoolExecutor(max_workers=processes)
+        try:
+            futures = {
+                pool.submit(verify_chunk, [check[1:] for check, _ in chunk]): chunk
+                for chunk in chunks
+            }
+            remaining = set(futures)
+            while remaining:
+                done, remaining = wait(remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = futures[future]
+                    for (check, entry), ok in zip(chunk, future.result()):
+                        if not ok:
+                            return ValidationResult(False, check.index, "signature check failed")
+                        self.cache.add(entry)
+        finally:
+            # Stop at the first failure: queued chunks are dropped
+            pool.shutdown(wait=True, cancel_futures=True)
+        return ValidationResult(True, None, None)
+
+
+def validate_transaction(tx, spent_outputs: list, processes: int = 1,
+                         cache: SignatureCache = None) -> ValidationResult:
+    """
+    Validate the P2PKH and P2WPKH inputs of a transaction.
+
+    Parameters:
+        tx: Serialized transaction or a `TransactionView`
+        spent_outputs (list): Serialized output spent by each input
+        processes (int): Worker processes for signature checks
+        cache (SignatureCache): Signature cache (default: the shared one)
+
+    Returns:
+        ValidationResult: The validation outcome
+    """
+    return TransactionValidator(tx, spent_outputs, cache).validate(processes)
@@ -0,0 +1,112 @@
+"""
+Bounded LRU cache of derived key material.
+
+Signing many inputs with the same key would otherwise re-derive the public
+key, its hash160 and the signing key object for every input. `KeyCache`
+keeps that material for recently used private keys within a memory budget.
+
+The cache holds secrets: call `clear()` once a signing job is done. Python
+cannot overwrite immutable bytes in place, so clearing drops every reference
+to the cached material and leaves reclamation to the garbage collector.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+# Approximate heap cost of one entry with the default pure Python backend:
+# the KeyMaterial tuple, the pubkey and hash160 byte strings, the secret
+# integer used as the signing key and the dictionary item (~340 bytes
+# measured with tracemalloc). An ecdsa SigningKey with its public point
+# makes an entry about 1.1 KiB, so scale max_bytes up with that backend.
+ENTRY_COST = 384
+
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024
+
+
+class KeyMaterial(NamedTuple):
+    """Everything derived from one private key."""
+    pubkey: bytes
+    pubkey_hash: bytes
+    signing_key: object
+
+
+class KeyCacheStats(NamedTuple):
+    """Counters describing cache effectiveness."""
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class KeyCache:
+    """
+    Thread-safe LRU mapping from private key to `KeyMaterial`.
+    """
+
+    def __init__(self, derive, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Parameters:
+            derive: Function mapping a private key to its `KeyMaterial`
+            max_bytes (int): Memory budget for cached entries
+        """
+        if max_bytes < ENTRY_COST:
+            raise ValueError(f"max_bytes must be at least {ENTRY_COST}")
+        self.derive = derive
+        self.max_entries = max_bytes // ENTRY_COST
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, private_key: bytes) -> KeyMaterial:
+        """
+        Return the key material for a private key, deriving it on a miss.
+
+        Parameters:
+            private_key (bytes): The private key
+
+        Returns:
+            KeyMaterial: Cached or freshly derived material
+        """
+        with self._lock:
+            material = self._entries.get(private_key)
+            if material is not None:
+                self._entries.move_to_end(private_key)
+                self.hits += 1
+                return material
+            self.misses += 1
+
+        # Derive outside the lock so other threads are not blocked on it
+        material = self.derive(private_key)
+
+        with self._lock:
+            self._entries[private_key] = material
+            self._entries.move_to_end(private_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return material
+
+    def stats(self) -> KeyCacheStats:
+        """Return a snapshot of the cache counters."""
+        with self._lock:
+            return KeyCacheStats(self.hits, self.misses, self.evictions, len(self._entries))
+
+    def clear(self) -> None:
+        """Drop all cached key material and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
@@ -0,0 +1,327 @@
+"""
+Block Merkle roots, inclusion proofs and the BIP141 witness commitment.
+
+A Merkle level is one contiguous buffer of 32-byte hashes in internal byte
+order. The next level is computed in a single pass over that buffer: each
+64-byte pair is sliced straight out of it and hashed, and the digests are
+joined into the next buffer in one go, instead of concatenating a new
+string per node from a list of hashes. An odd level is padded by repeating
+its last hash, as Bitcoin does.
+
+`MerkleTree` keeps every level, so any number of proofs from the same
+block only cost the lookups of their sibling hashes. `block_merkle_tree`
+additionally keeps the trees of recently used blocks.
+
+All hashing goes through `p2pkh.hashing.dsha256`, so `p2pkh.instrument`
+counts it.
+
+Hashes in proofs and on the levels are in internal byte order; txids,
+wtxids and roots given as hex are in the usual display (reversed) order.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+from .blockfile import HEADER_SIZE
+from .hashing import dsha256
+
+HASH_SIZE = 32
+ZERO_HASH = b'\x00' * HASH_SIZE
+
+# scriptPubKey of the coinbase output carrying the witness commitment:
+# OP_RETURN, push 36, 0xaa21a9ed header, commitment
+WITNESS_COMMITMENT_HEADER = bytes.fromhex('6a24aa21a9ed')
+
+BLOCK_TREE_CACHE = 16
+
+
+def pack_hashes(hashes_hex) -> bytes:
+    """
+    Pack display-order hex hashes (txids, wtxids) into one internal-order buffer.
+
+    Parameters:
+        hashes_hex: Sequence of 64-character hex strings
+
+    Returns:
+        bytes: The hashes, 32 bytes each, in internal byte order
+    """
+    hashes_hex = list(hashes_hex)
+    # Reversing the whole buffer reverses each hash and, because the list is
+    # joined back to front, restores their order
+    packed = bytes.fromhex(''.join(reversed(hashes_hex)))[::-1]
+    if len(packed) != HASH_SIZE * len(hashes_hex):
+        raise ValueError("hashes must be 32 bytes each")
+    return packed
+
+
+def _as_buffer(hashes) -> bytes:
+    """Return hashes as one contiguous buffer, joining a sequence if needed."""
+    if isinstance(hashes, (bytes, bytearray, memoryview)):
+        buffer = bytes(hashes)
+    else:
+        buffer = b''.join(hashes)
+    if len(buffer) % HASH_SIZE:
+        raise ValueError("hash buffer length must be a multiple of 32")
+    return buffer
+
+
+def next_level(level: bytes) -> bytes:
+    """
+    Compute the parent level of a Merkle level.
+
+    Parameters:
+        level (bytes): Non-empty buffer of 32-byte hashes
+
+    Returns:
+        bytes: Buffer of the parent hashes
+    """
+    if len(level) % (2 * HASH_SIZE):
+        level += level[-HASH_SIZE:]
+    hash_pair = dsha256
+    return b''.join([
+        hash_pair(level[i:i + 2 * HASH_SIZE])
+        for i in range(0, len(level), 2 * HASH_SIZE)
+    ])
+
+
+def _has_duplicate_pair(level: bytes) -> bool:
+    """Whether two real sibling hashes are equal (CVE-2012-2459)."""
+    count = len(level) // HASH_SIZE
+    for i in range(0, count - 1, 2):
+        start = i * HASH_SIZE
+        if level[start:start + HASH_SIZE] == level[start + HASH_SIZE:start + 2 * HASH_SIZE]:
+            return True
+    return False
+
+
+class MerkleTree:
+    """
+    All levels of a Merkle tree, from the leaves to the root.
+    """
+    __slots__ = ('levels', '_mutated')
+
+    def __init__(self, hashes):
+        """
+        Parameters:
+            hashes: Leaf hashes in internal byte order, as one buffer of
+                32-byte hashes or a sequence of 32-byte strings
+        """
+        level = _as_buffer(hashes)
+        if not level:
+            raise ValueError("a Merkle tree needs at least one leaf")
+        levels = [level]
+        while len(level) > HASH_SIZE:
+            level = next_level(level)
+            levels.append(level)
+        self.levels = levels
+        self._mutated = None
+
+    @classmethod
+    def from_txids(cls, txids) -> 'MerkleTree':
+        """
+        Build the tree of a block's transaction IDs.
+
+        Parameters:
+            txids: Display-order hex txids, coinbase first
+
+        Returns:
+            MerkleTree: The transaction tree
+        """
+        return cls(pack_hashes(txids))
+
+    @classmethod
+    def from_wtxids(cls, wtxids) -> 'MerkleTree':
+        """
+        Build the BIP141 witness tree of a block.
+
+        The coinbase's wtxid is replaced by 32 zero bytes.
+
+        Parameters:
+            wtxids: Display-order hex wtxids, coinbase first
+
+        Returns:
+            MerkleTree: The witness tree
+        """
+        wtxids = list(wtxids)
+        if not wtxids:
+            raise ValueError("a Merkle tree needs at least one leaf")
+        return cls(ZERO_HASH + pack_hashes(wtxids[1:]))
+
+    def __len__(self) -> int:
+        return len(self.levels[0]) // HASH_SIZE
+
+    @property
+    def root(self) -> bytes:
+        """The root in internal byte order."""
+        return self.levels[-1]
+
+    @property
+    def root_hex(self) -> str:
+        """The root in display order, as in block headers shown by `BlockView`."""
+        return self.levels[-1][::-1].hex()
+
+    @property
+    def mutated(self) -> bool:
+        """
+        Whether some level has two equal real siblings.
+
+        Such a tree has the same root as a list with duplicated
+        transactions (CVE-2012-2459), so a block whose tree is mutated
+        must not be treated as valid on the strength of its root.
+        """
+        if self._mutated is None:
+            self._mutated = any(_has_duplicate_pair(level) for level in self.levels[:-1])
+        return self._mutated
+
+    def leaf(self, index: int) -> bytes:
+        """The leaf hash at `index`, in internal byte order."""
+        if not 0 <= index < len(self):
+            raise IndexError(f"leaf index {index} out of range")
+        start = index * HASH_SIZE
+        return self.levels[0][start:start + HASH_SIZE]
+
+    def proof(self, index: int) -> list:
+        """
+        Build the inclusion proof of one leaf.
+
+        Parameters:
+            index (int): Position of the leaf (transaction) in the block
+
+        Returns:
+            list: Sibling hashes from the leaf level up, internal byte order
+        """
+        if not 0 <= index < len(self):
+            raise IndexError(f"leaf index {index} out of range")
+        siblings = []
+        for level in self.levels[:-1]:
+            # An odd level's last node is paired with itself
+            sibling = min(index ^ 1, len(level) // HASH_SIZE - 1)
+            start = sibling * HASH_SIZE
+            siblings.append(level[start:start + HASH_SIZE])
+            index >>= 1
+        return siblings
+
+    def proofs(self, indices) -> list:
+        """
+        Build inclusion proofs for several leaves.
+
+        Parameters:
+            indices: Leaf positions
+
+        Returns:
+            list: One proof per index, as from `proof`
+        """
+        return [self.proof(index) for index in indices]
+
+
+def merkle_root(hashes) -> bytes:
+    """
+    Compute a Merkle root without keeping the levels.
+
+    Parameters:
+        hashes: Leaf hashes in internal byte order, as one buffer or a sequence
+
+    Returns:
+        bytes: The root in internal byte order
+    """
+    level = _as_buffer(hashes)
+    if not level:
+        raise ValueError("a Merkle tree needs at least one leaf")
+    while len(level) > HASH_SIZE:
+        level = next_level(level)
+    return level
+
+
+def verify_proof(leaf: bytes, index: int, siblings: list, root: bytes) -> bool:
+    """
+    Check an inclusion proof.
+
+    Parameters:
+        leaf (bytes): Leaf hash in internal byte order
+        index (int): Position of the leaf
+        siblings (list): Proof from `MerkleTree.proof`
+        root (bytes): Expected root in internal byte order
+
+    Returns:
+        bool: Whether the proof leads from the leaf to the root
+    """
+    node = bytes(leaf)
+    for sibling in siblings:
+        node = dsha256(sibling + node if index & 1 else node + sibling)
+        index >>= 1
+    return index == 0 and node == root
+
+
+def witness_commitment(witness_root: bytes, reserved_value: bytes = ZERO_HASH) -> bytes:
+    """
+    Compute the BIP141 witness commitment.
+
+    Parameters:
+        witness_root (bytes): Root of the witness tree, internal byte order
+        reserved_value (bytes): The coinbase's 32-byte witness reserved value
+
+    Returns:
+        bytes: dsha256(witness root || reserved value)
+    """
+    if len(reserved_value) != HASH_SIZE:
+        raise ValueError("witness reserved value must be 32 bytes")
+    return dsha256(witness_root + reserved_value)
+
+
+def witness_commitment_script_pubkey(commitment: bytes) -> bytes:
+    """
+    Build the coinbase output script carrying a witness commitment.
+
+    Parameters:
+        commitment (bytes): 32-byte commitment from `witness_commitment`
+
+    Returns:
+        bytes: The scriptPubKey, including its length prefix
+    """
+    if len(commitment) != HASH_SIZE:
+        raise ValueError("witness commitment must be 32 bytes")
+    return bytes([len(WITNESS_COMMITMENT_HEADER) + HASH_SIZE]) + WITNESS_COMMITMENT_HEADER + commitment
+
+
+_block_trees = OrderedDict()
+_block_trees_lock = threading.Lock()
+
+
+def block_merkle_tree(block, witness: bool = False) -> MerkleTree:
+    """
+    Return the (witness) Merkle tree of a block, reusing recent ones.
+
+    The last `BLOCK_TREE_CACHE` trees are kept, so proofs for many
+    transactions of the same block hash its transactions only once. Trees
+    are keyed by the block hash and a SHA256 of the block body: the header
+    does not pin the transactions down (a CVE-2012-2459 mutation repeats
+    some and keeps the root), so a different body with the same header gets
+    its own tree. Hashing the body is one pass over the raw bytes, much
+    cheaper than computing every txid.
+
+    Parameters:
+        block (BlockView): The block
+        witness (bool): Build the witness tree from wtxids
+
+    Returns:
+        MerkleTree: The block's tree
+    """
+    raw = block.raw
+    key = (block.hash, hashlib.sha256(raw[HEADER_SIZE:]).digest(), witness)
+    with _block_trees_lock:
+        tree = _block_trees.get(key)
+        if tree is not None:
+            _block_trees.move_to_end(key)
+            return tree
+
+    if witness:
+        tree = MerkleTree.from_wtxids(tx.wtxid for tx in block.transactions())
+    else:
+        tree = MerkleTree.from_txids(tx.txid for tx in block.transactions())
+
+    with _block_trees_lock:
+        _block_trees[key] = tree
+        while len(_block_trees) > BLOCK_TREE_CACHE:
+            _block_trees.popitem(last=False)
+    return tree
@@ -0,0 +1,175 @@
+"""
+In-memory index from script hash to the outputs paying to it.
+
+Entries are fixed-width records in one sorted `bytearray`:
+
+    template (1) | hash padded to 32 bytes | txid (32) | vout (4, big-endian)
+
+so the index holds no per-entry Python objects and a lookup is a binary
+search over the record keys. New entries are staged and merged into the
+sorted array in one pass on the next lookup, which makes bulk inserts of a
+whole block O(n log n) for the new entries plus one linear merge.
+"""
+
+import heapq
+
+from .script import P2PKH, P2SH, P2TR, P2WPKH, P2WSH, classify_script
+
+KEY_SIZE = 33
+RECORD_SIZE = KEY_SIZE + 32 + 4
+
+_TEMPLATE_CODES = {P2PKH: 1, P2WPKH: 2, P2SH: 3, P2WSH: 4, P2TR: 5}
+
+
+def _key(template: str, script_hash) -> bytes:
+    try:
+        code = _TEMPLATE_CODES[template]
+    except KeyError:
+        raise ValueError(f"unknown script template {template!r}") from None
+    if len(script_hash) not in (20, 32):
+        raise ValueError("script hash must be 20 or 32 bytes")
+    return bytes([code]) + bytes(script_hash).ljust(32, b'\x00')
+
+
+class OutputIndex:
+    """
+    Compact multimap from (template, script hash) to (txid, vout).
+    """
+    __slots__ = ('_records', '_pending')
+
+    def __init__(self):
+        self._records = bytearray()
+        self._pending = []
+
+    def __len__(self) -> int:
+        return len(self._records) // RECORD_SIZE + len(self._pending)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the merged records."""
+        return len(self._records)
+
+    def add(self, template: str, script_hash, txid: str, vout: int) -> None:
+        """
+        Add one output.
+
+        Parameters:
+            template (str): Template from `classify_script`
+            script_hash: The script's hash (or P2TR key)
+            txid (str): Transaction ID as hex
+            vout (int): Output index
+        """
+        self._pending.append(_key(template, script_hash) + bytes.fromhex(txid) + vout.to_bytes(4, 'big'))
+
+    def add_many(self, entries) -> None:
+        """
+        Add many outputs.
+
+        Parameters:
+            entries: Iterable of (template, script_hash, txid, vout)
+        """
+        pending = self._pending
+        for template, script_hash, txid, vout in entries:
+            pending.append(_key(template, script_hash) + bytes.fromhex(txid) + vout.to_bytes(4, 'big'))
+
+    def add_transaction(self, tx) -> int:
+        """
+        Index every standard output of a decoded transaction.
+
+        Parameters:
+            tx (TransactionView): Decoded transaction
+
+        Returns:
+            int: Number of outputs indexed
+        """
+        txid = bytes.fromhex(tx.txid)
+        pending = self._pending
+        count = 0
+        for vout, tx_out in enumerate(tx.outputs):
+            template, script_hash = classify_script(tx_out.script)
+            if template is None:
+                continue
+            pending.append(
+                bytes([_TEMPLATE_CODES[template]]) + bytes(script_hash).ljust(32, b'\x00') +
+                txid + vout.to_bytes(4, 'big')
+            )
+            count += 1
+        return count
+
+    def add_transactions(self, txs) -> int:
+        """
+        Index the standard outputs of many decoded transactions.
+
+        Parameters:
+            txs: Iterable of `TransactionView`, e.g. `BlockView.transactions()`
+
+        Returns:
+            int: Number of outputs indexed
+        """
+        return sum(self.add_transaction(tx) for tx in txs)
+
+    def _merge(self) -> None:
+        """Sort staged records into the record array."""
+        if not self._pending:
+            return
+        self._pending.sort()
+        if not self._records:
+            self._records = bytearray(b''.join(self._pending))
+        else:
+            view = memoryview(self._records)
+            existing = (bytes(view[i:i + RECORD_SIZE]) for i in range(0, len(view), RECORD_SIZE))
+            merged = bytearray(b''.join(heapq.merge(existing, self._pending)))
+            view.release()
+            self._records = merged
+        self._pending = []
+
+    def _lower_bound(self, key: bytes) -> int:
+        """Index of the first record whose key is not less than `key`."""
+        records = self._records
+        low, high = 0, len(records) // RECORD_SIZE
+        while low < high:
+            middle = (low + high) // 2
+            start = middle * RECORD_SIZE
+            if records[start:start + KEY_SIZE] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def lookup(self, template: str, script_hash) -> list:
+        """
+        Find the outputs paying to a script hash.
+
+        Parameters:
+            template (str): Template from `classify_script`
+            script_hash: The script's hash (or P2TR key)
+
+        Returns:
+            list: (txid hex, vout) tuples in txid order
+        """
+        self._merge()
+        key = _key(template, script_hash)
+        records = self._records
+        results = []
+        start = self._lower_bound(key) * RECORD_SIZE
+        while start < len(records) and records[start:start + KEY_SIZE] == key:
+            txid = records[start + KEY_SIZE:start + KEY_SIZE + 32].hex()
+            vout = int.from_bytes(records[start + KEY_SIZE + 32:start + RECORD_SIZE], 'big')
+            results.append((txid, vout))
+            start += RECORD_SIZE
+        return results
+
+    def lookup_script(self, script) -> list:
+        """
+        Find the outputs paying to a scriptPubKey.
+
+        Parameters:
+            script: Locking script without length prefix
+
+        Returns:
+            list: (txid hex, vout) tuples; empty for non-standard scripts
+        """
+        template, script_hash = classify_script(script)
+        if template is None:
+            return []
+        return self.lookup(template, script_hash)
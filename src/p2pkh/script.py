@@ -0,0 +1,167 @@
+"""
+scriptPubKey templates: building pay-to-pubkey-hash outputs and classifying
+standard scripts.
+
+`create_output` takes a ready-made, length-prefixed scriptPubKey. The
+builders here produce those scripts for P2PKH (`OP_DUP OP_HASH160 <h>
+OP_EQUALVERIFY OP_CHECKSIG`) and P2WPKH (`OP_0 <h>`) outputs, and the bulk
+variants go straight from arrays of public keys or key hashes to serialized
+outputs, packing each output with one `struct` call.
+
+`classify_script` goes the other way: it recognizes the P2PKH, P2WPKH, P2SH,
+P2WSH and P2TR templates by length and fixed bytes alone and returns the
+embedded hash (or key) as a slice of the caller's buffer.
+"""
+
+import struct
+
+from .hashing import hash160_many
+
+P2PKH = 'p2pkh'
+P2WPKH = 'p2wpkh'
+P2SH = 'p2sh'
+P2WSH = 'p2wsh'
+P2TR = 'p2tr'
+
+# Length prefix and opcodes around the 20-byte hash, per template
+_TEMPLATES = {
+    P2PKH: (b'\x19\x76\xa9\x14', b'\x88\xac'),
+    P2WPKH: (b'\x16\x00\x14', b''),
+}
+
+_OUTPUT_STRUCTS = {
+    kind: struct.Struct(f'<Q{len(prefix)}s20s{len(suffix)}s')
+    for kind, (prefix, suffix) in _TEMPLATES.items()
+}
+
+
+def _template(kind: str) -> tuple:
+    try:
+        return _TEMPLATES[kind]
+    except KeyError:
+        raise ValueError(f"unknown script template {kind!r}") from None
+
+
+def _check_hash(pubkey_hash) -> None:
+    if len(pubkey_hash) != 20:
+        raise ValueError("public key hash must be 20 bytes")
+
+
+def p2pkh_script_pubkey(pubkey_hash: bytes) -> bytes:
+    """
+    Build a P2PKH scriptPubKey.
+
+    Parameters:
+        pubkey_hash (bytes): 20-byte hash160 of the public key
+
+    Returns:
+        bytes: The scriptPubKey, including its length prefix
+    """
+    _check_hash(pubkey_hash)
+    return b'\x19\x76\xa9\x14' + bytes(pubkey_hash) + b'\x88\xac'
+
+
+def p2wpkh_script_pubkey(pubkey_hash: bytes) -> bytes:
+    """
+    Build a P2WPKH scriptPubKey.
+
+    Parameters:
+        pubkey_hash (bytes): 20-byte hash160 of the public key
+
+    Returns:
+        bytes: The scriptPubKey, including its length prefix
+    """
+    _check_hash(pubkey_hash)
+    return b'\x16\x00\x14' + bytes(pubkey_hash)
+
+
+def script_pubkeys(pubkey_hashes, kind: str = P2PKH) -> list:
+    """
+    Build scriptPubKeys for many key hashes.
+
+    Parameters:
+        pubkey_hashes: Iterable of 20-byte key hashes
+        kind (str): `P2PKH` or `P2WPKH`
+
+    Returns:
+        list: Length-prefixed scriptPubKeys
+    """
+    prefix, suffix = _template(kind)
+    scripts = []
+    for pubkey_hash in pubkey_hashes:
+        _check_hash(pubkey_hash)
+        scripts.append(prefix + bytes(pubkey_hash) + suffix)
+    return scripts
+
+
+def build_outputs(amounts, pubkey_hashes, kind: str = P2PKH) -> list:
+    """
+    Build serialized outputs paying amounts to key hashes.
+
+    Parameters:
+        amounts: Iterable of amounts in satoshis
+        pubkey_hashes: Iterable of 20-byte key hashes, one per amount
+        kind (str): `P2PKH` or `P2WPKH`
+
+    Returns:
+        list: Serialized outputs, as from `create_output`
+    """
+    prefix, suffix = _template(kind)
+    pack = _OUTPUT_STRUCTS[kind].pack
+    amounts = list(amounts)
+    pubkey_hashes = list(pubkey_hashes)
+    if len(amounts) != len(pubkey_hashes):
+        raise ValueError("need one key hash per amount")
+    outputs = []
+    append = outputs.append
+    for amount, pubkey_hash in zip(amounts, pubkey_hashes):
+        # struct pads or truncates "20s" silently, so check the length here
+        _check_hash(pubkey_hash)
+        append(pack(amount, prefix, pubkey_hash, suffix))
+    return outputs
+
+
+def outputs_from_pubkeys(amounts, pubkeys, kind: str = P2PKH) -> list:
+    """
+    Build serialized outputs paying amounts to public keys' hashes.
+
+    Parameters:
+        amounts: Iterable of amounts in satoshis
+        pubkeys: Iterable of serialized public keys, one per amount
+        kind (str): `P2PKH` or `P2WPKH`
+
+    Returns:
+        list: Serialized outputs, as from `create_output`
+    """
+    return build_outputs(amounts, hash160_many(pubkeys), kind)
+
+
+def classify_script(script) -> tuple:
+    """
+    Identify a standard scriptPubKey and extract its hash without copying.
+
+    Parameters:
+        script: Locking script without length prefix (bytes or memoryview)
+
+    Returns:
+        tuple: (template, hash) where hash is a memoryview into `script`, the
+            x-only key for P2TR; (None, None) for any other script
+    """
+    size = len(script)
+    if size == 22:
+        if script[0] == 0x00 and script[1] == 0x14:
+            return P2WPKH, memoryview(script)[2:]
+    elif size == 25:
+        if (script[0] == 0x76 and script[1] == 0xa9 and script[2] == 0x14 and
+                script[23] == 0x88 and script[24] == 0xac):
+            return P2PKH, memoryview(script)[3:23]
+    elif size == 23:
+        if script[0] == 0xa9 and script[1] == 0x14 and script[22] == 0x87:
+            return P2SH, memoryview(script)[2:22]
+    elif size == 34:
+        if script[1] == 0x20:
+            if script[0] == 0x00:
+                return P2WSH, memoryview(script)[2:]
+            if script[0] == 0x51:
+                return P2TR, memoryview(script)[2:]
+    return None, None
@@ -0,0 +1,201 @@
+"""
+Transaction serialization helpers from Exercises 1 and 5.
+
+Inputs, outputs and witness stacks are passed around as already serialized
+bytes, exactly like in the exercises. As there, `script_pubkey` and
+`script_code` arguments carry their own length prefix.
+"""
+
+from .address import address_to_script_pubkey
+from .compactsize import read_varint, varint
+
+
+def int_to_little_endian(value: int, length: int) -> bytes:
+    """
+    Convert an integer to little-endian bytes.
+
+    Parameters:
+        value (int): The integer value to convert
+        length (int): The number of bytes to use
+
+    Returns:
+        bytes: The little-endian encoded bytes
+    """
+    return value.to_bytes(length, 'little')
+
+
+def little_endian_to_int(data: bytes) -> int:
+    """
+    Convert little-endian bytes to an integer.
+
+    Parameters:
+        data (bytes): The little-endian encoded bytes
+
+    Returns:
+        int: The decoded integer
+    """
+    return int.from_bytes(data, 'little')
+
+
+def create_input(txid: str, vout: int, script_sig: bytes = b'', sequence: bytes = b'\xff\xff\xff\xff') -> bytes:
+    """
+    Create a transaction input.
+
+    Parameters:
+        txid (str): The transaction ID (hex string)
+        vout (int): The output index
+        script_sig (bytes): The unlocking script (default empty)
+        sequence (bytes): The sequence number (default 0xffffffff)
+
+    Returns:
+        bytes: The serialized transaction input
+    """
+    return (
+        bytes.fromhex(txid)[::-1] + vout.to_bytes(4, 'little') +
+        varint(len(script_sig)) + script_sig + sequence
+    )
+
+
+def create_output(amount: int, script_pubkey: bytes) -> bytes:
+    """
+    Create a transaction output.
+
+    Parameters:
+        amount (int): The output amount in satoshis
+        script_pubkey (bytes): The locking script, including its length
+            prefix, or an address (str) to pay to
+
+    Returns:
+        bytes: The serialized transaction output
+    """
+    if isinstance(script_pubkey, str):
+        script_pubkey = address_to_script_pubkey(script_pubkey)
+    return amount.to_bytes(8, 'little') + script_pubkey
+
+
+class TransactionSerializer:
+    """
+    Serializes a transaction with a single allocation.
+
+    The exact size is known up front from the component lengths, so the
+    transaction can be produced with one join or written in place into a
+    caller-supplied buffer, e.g. to pack many transactions into one region.
+    """
+
+    def __init__(self, version: int, inputs: list, outputs: list,
+                 witnesses: list = None, locktime: int = 0, segwit: bool = None):
+        """
+        Parameters:
+            version (int): Transaction version
+            inputs (list): List of serialized inputs
+            outputs (list): List of serialized outputs
+            witnesses (list): List of serialized witness stacks, one per input
+            locktime (int): Transaction locktime
+            segwit (bool): Whether to add the marker and flag (default: when
+                witnesses are given)
+        """
+        if segwit is None:
+            segwit = witnesses is not None
+        if witnesses is not None and len(witnesses) != len(inputs):
+            raise ValueError("need one witness stack per input")
+        if segwit and witnesses is None:
+            witnesses = []
+        self.segwit = segwit
+        self.parts = [version.to_bytes(4, 'little')]
+        if segwit:
+            self.parts.append(b'\x00\x01')
+        self.parts.append(varint(len(inputs)))
+        self.parts.extend(inputs)
+        self.parts.append(varint(len(outputs)))
+        self.parts.extend(outputs)
+        if witnesses:
+            self.parts.extend(witnesses)
+        self.parts.append(locktime.to_bytes(4, 'little'))
+        self.size = sum(len(part) for part in self.parts)
+
+    def to_bytes(self) -> bytes:
+        """Return the serialized transaction."""
+        return b''.join(self.parts)
+
+    def to_bytearray(self) -> bytearray:
+        """Return the serialized transaction in a preallocated bytearray."""
+        buffer = bytearray(self.size)
+        self.write_into(buffer, 0)
+        return buffer
+
+    def write_into(self, buffer, offset: int = 0) -> int:
+        """
+        Write the transaction into a writable buffer.
+
+        Parameters:
+            buffer: bytearray, writable mmap or memoryview with enough room
+            offset (int): Position to start writing at
+
+        Returns:
+            int: Offset just past the written transaction
+        """
+        view = buffer if isinstance(buffer, memoryview) else memoryview(buffer)
+        if offset + self.size > len(view):
+            raise ValueError("buffer too small for transaction")
+        for part in self.parts:
+            end = offset + len(part)
+            view[offset:end] = part
+            offset = end
+        return offset
+
+
+def pack_transactions(serializers: list) -> tuple:
+    """
+    Write many transactions back to back into one preallocated bytearray.
+
+    Parameters:
+        serializers (list): List of `TransactionSerializer` objects
+
+    Returns:
+        tuple: (bytearray holding all transactions, list of start offsets)
+    """
+    buffer = bytearray(sum(serializer.size for serializer in serializers))
+    offsets = []
+    offset = 0
+    for serializer in serializers:
+        offsets.append(offset)
+        offset = serializer.write_into(buffer, offset)
+    return buffer, offsets
+
+
+def create_basic_tx(version: int, inputs: list, outputs: list, locktime: int, segwit: bool = True) -> bytes:
+    """
+    Create a basic Bitcoin transaction without witness data.
+
+    Parameters:
+        version (int): Transaction version
+        inputs (list): List of serialized inputs
+        outputs (list): List of serialized outputs
+        locktime (int): Transaction locktime
+        segwit (bool): Whether to add the SegWit marker and flag
+
+    Returns:
+        bytes: The serialized transaction
+    """
+    return TransactionSerializer(version, inputs, outputs, None, locktime, segwit).to_bytes()
+
+
+def assemble_transaction(version: int,
+                         inputs: list,
+                         outputs: list,
+                         witnesses: list,
+                         locktime: int) -> bytes:
+    """
+    Assemble a complete SegWit transaction.
+
+    Parameters:
+        version (int): Transaction version
+        inputs (list): List of serialized inputs
+        outputs (list): List of serialized outputs
+        witnesses (list): List of serialized witness stacks, one per input
+        locktime (int): Transaction locktime
+
+    Returns:
+        bytes: The serialized transaction
+    """
+    return TransactionSerializer(version, inputs, outputs, witnesses, locktime, True).to_bytes()
@@ -0,0 +1,152 @@
+"""
+Bounded cache of signatures that already verified, in the style of Bitcoin
+Core's signature cache.
+
+Entries are salted SHA256 hashes of (digest, pubkey, signature), so the cache
+holds no usable signature data and an attacker cannot predict which entries
+collide or get evicted. The digest has a fixed 32 bytes and the pubkey is
+length-prefixed, so bytes cannot move between fields without changing the
+entry. When the memory budget is full a random entry is
+evicted to make room. Only successful verifications are cached.
+"""
+
+import hashlib
+import os
+import random
+import threading
+from typing import NamedTuple
+
+from .compactsize import varint
+
+# Approximate heap cost of one entry: a 32-byte bytes object, its slot
+# number and dictionary item, and its list slot (~157 bytes measured with
+# tracemalloc)
+ENTRY_COST = 160
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+class SignatureCacheStats(NamedTuple):
+    """Counters describing cache effectiveness."""
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class SignatureCache:
+    """
+    Thread-safe set of verified (pubkey, digest, signature) entries.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, salt: bytes = None):
+        """
+        Parameters:
+            max_bytes (int): Memory budget for cached entries
+            salt (bytes): Secret salt for entry hashes (default: random)
+        """
+        if max_bytes < ENTRY_COST:
+            raise ValueError(f"max_bytes must be at least {ENTRY_COST}")
+        self.max_entries = max_bytes // ENTRY_COST
+        self._salted = hashlib.sha256(salt if salt is not None else os.urandom(32))
+        # entry -> index of its slot; slots of erased entries are reused first
+        self._entries = {}
+        self._slots = []
+        self._free = []
+        self._random = random.Random()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def entry(self, pubkey, digest, sig) -> bytes:
+        """
+        Compute the salted cache entry for a signature check.
+
+        Parameters:
+            pubkey: The public key
+            digest: The 32-byte signed digest
+            sig: The signature
+
+        Returns:
+            bytes: 32-byte cache entry
+        """
+        if len(digest) != 32:
+            raise ValueError("digest must be 32 bytes")
+        state = self._salted.copy()
+        state.update(digest)
+        state.update(varint(len(pubkey)))
+        state.update(pubkey)
+        state.update(sig)
+        return state.digest()
+
+    def contains(self, entry: bytes, erase: bool = False) -> bool:
+        """
+        Look up an entry, counting the hit or miss.
+
+        Parameters:
+            entry (bytes): Entry from `entry()`
+            erase (bool): Remove the entry on a hit, e.g. once a block that
+                spends it is connected and it will not be needed again
+
+        Returns:
+            bool: True if the signature was verified before
+        """
+        with self._lock:
+            if entry not in self._entries:
+                self.misses += 1
+                return False
+            self.hits += 1
+            if erase:
+                self._free.append(self._entries.pop(entry))
+            return True
+
+    def add(self, entry: bytes) -> None:
+        """
+        Insert an entry, evicting a random one if the cache is full.
+
+        Parameters:
+            entry (bytes): Entry from `entry()`
+        """
+        with self._lock:
+            if entry in self._entries:
+                return
+            if self._free:
+                index = self._free.pop()
+                self._slots[index] = entry
+            elif len(self._slots) < self.max_entries:
+                index = len(self._slots)
+                self._slots.append(entry)
+            else:
+                index = self._random.randrange(len(self._slots))
+                del self._entries[self._slots[index]]
+                self.evictions += 1
+                self._slots[index] = entry
+            self._entries[entry] = index
+
+    def stats(self) -> SignatureCacheStats:
+        """Return a snapshot of the cache counters."""
+        with self._lock:
+            return SignatureCacheStats(self.hits, self.misses, self.evictions, len(self._entries))
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._slots.clear()
+            self._free.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+signature_cache = SignatureCache()
@@ -0,0 +1,291 @@
+"""
+BIP143 and legacy signature digests computed once per transaction.
+
+`get_transaction_digest` from Exercise 2 re-hashes every outpoint, sequence
+and output for each input it signs, so signing N inputs costs O(N^2) hashing.
+`SighashContext` hashes those shared regions once and hands out per-input
+digests that only cover the input-specific fields.
+
+`LegacySighashContext` does the same for pre-SegWit inputs such as P2PKH
+spends, serializing the shared parts of the transaction once.
+"""
+
+import hashlib
+
+from .compactsize import varint
+from .hashing import dsha256
+
+SIGHASH_ALL = 0x01
+SIGHASH_NONE = 0x02
+SIGHASH_SINGLE = 0x03
+SIGHASH_ANYONECANPAY = 0x80
+
+ZERO_HASH = b'\x00' * 32
+
+
+class SighashContext:
+    """
+    Per-transaction BIP143 digest cache.
+
+    The context is built from the same serialized inputs and outputs that are
+    passed to `assemble_transaction`. hashPrevouts, hashSequence and
+    hashOutputs are computed on first use and reused for every input.
+    """
+
+    def __init__(self, version: int, inputs: list, outputs: list, locktime: int):
+        """
+        Parameters:
+            version (int): Transaction version
+            inputs (list): List of serialized inputs
+            outputs (list): List of serialized outputs
+            locktime (int): Transaction locktime
+        """
+        self.version = version.to_bytes(4, 'little')
+        self.locktime = locktime.to_bytes(4, 'little')
+        self.outpoints = [tx_in[:36] for tx_in in inputs]
+        self.sequences = [tx_in[-4:] for tx_in in inputs]
+        self.outputs = list(outputs)
+        self._hash_prevouts = None
+        self._hash_sequence = None
+        self._hash_outputs = None
+        self._all_prefix = None
+
+    @property
+    def hash_prevouts(self) -> bytes:
+        """dsha256 of all outpoints, computed once."""
+        if self._hash_prevouts is None:
+            self._hash_prevouts = dsha256(b''.join(self.outpoints))
+        return self._hash_prevouts
+
+    @property
+    def hash_sequence(self) -> bytes:
+        """dsha256 of all input sequences, computed once."""
+        if self._hash_sequence is None:
+            self._hash_sequence = dsha256(b''.join(self.sequences))
+        return self._hash_sequence
+
+    @property
+    def hash_outputs(self) -> bytes:
+        """dsha256 of all outputs, computed once."""
+        if self._hash_outputs is None:
+            self._hash_outputs = dsha256(b''.join(self.outputs))
+        return self._hash_outputs
+
+    def _prefix_state(self, sighash: int):
+        """Return a SHA256 state holding version, hashPrevouts and hashSequence."""
+        base_type = sighash & 0x1f
+        anyone_can_pay = sighash & SIGHASH_ANYONECANPAY
+
+        if not anyone_can_pay and base_type not in (SIGHASH_SINGLE, SIGHASH_NONE):
+            # The SIGHASH_ALL prefix is shared by every input; hash it once
+            # and hand out copies of the running state.
+            if self._all_prefix is None:
+                self._all_prefix = hashlib.sha256(
+                    self.version + self.hash_prevouts + self.hash_sequence
+                )
+            return self._all_prefix.copy()
+
+        # NONE, SINGLE and ANYONECANPAY never commit to the other sequences
+        hash_prevouts = ZERO_HASH if anyone_can_pay else self.hash_prevouts
+        return hashlib.sha256(self.version + hash_prevouts + ZERO_HASH)
+
+    def _outputs_hash(self, index: int, sighash: int) -> bytes:
+        """Return hashOutputs for the given input index and sighash type."""
+        base_type = sighash & 0x1f
+        if base_type not in (SIGHASH_SINGLE, SIGHASH_NONE):
+            return self.hash_outputs
+        if base_type == SIGHASH_SINGLE and index < len(self.outputs):
+            return dsha256(self.outputs[index])
+        return ZERO_HASH
+
+    def digest(self, index: int, script_code: bytes, amount: int,
+               sighash: int = SIGHASH_ALL) -> bytes:
+        """
+        Compute the BIP143 digest for one input.
+
+        Parameters:
+            index (int): Index of the input being signed
+            script_code (bytes): The script code for signing (length-prefixed)
+            amount (int): The amount being spent in satoshis
+            sighash (int): Signature hash type
+
+        Returns:
+            bytes: The transaction digest to be signed
+        """
+        if not 0 <= index < len(self.outpoints):
+            raise IndexError(f"input index {index} out of range")
+
+        state = self._prefix_state(sighash)
+        state.update(self.outpoints[index])
+        state.update(script_code)
+        state.update(amount.to_bytes(8, 'little'))
+        state.update(self.sequences[index])
+        state.update(self._outputs_hash(index, sighash))
+        state.update(self.locktime)
+        state.update(sighash.to_bytes(4, 'little'))
+        return hashlib.sha256(state.digest()).digest()
+
+    def digests(self, script_codes: list, amounts: list,
+                sighash: int = SIGHASH_ALL) -> list:
+        """
+        Compute the BIP143 digest for every input in order.
+
+        Parameters:
+            script_codes (list): Script code for each input
+            amounts (list): Amount spent by each input in satoshis
+            sighash (int): Signature hash type used for every input
+
+        Returns:
+            list: One digest per input
+        """
+        if len(script_codes) != len(self.outpoints) or len(amounts) != len(self.outpoints):
+            raise ValueError("need one script code and amount per input")
+        return [
+            self.digest(index, script_code, amount, sighash)
+            for index, (script_code, amount) in enumerate(zip(script_codes, amounts))
+        ]
+
+
+ONE_HASH = b'\x01' + b'\x00' * 31
+
+# Outputs before the signed one under SIGHASH_SINGLE: value -1, empty script
+NULL_OUTPUT = b'\xff' * 8 + b'\x00'
+
+# Serialized size of an input with an empty scriptSig: outpoint + 0x00 + sequence
+BLANK_INPUT_SIZE = 36 + 1 + 4
+
+
+class LegacySighashContext:
+    """
+    Per-transaction cache for legacy (pre-SegWit) signature digests.
+
+    The legacy algorithm hashes a copy of the whole transaction in which every
+    other input's scriptSig is blanked, so each digest covers O(N) bytes and
+    signing every input is inherently quadratic in hashed data. What this
+    context avoids is the re-serialization: the blanked inputs and the
+    outputs are serialized once into shared buffers, digests hash zero-copy
+    slices of them, and SHA256 states are checkpointed every
+    `CHECKPOINT_INTERVAL` inputs so the part before the signed input is not
+    re-hashed from the start.
+
+    `script_code` is the length-prefixed subscript being signed, as for
+    `SighashContext`; for P2PKH that is the previous output's scriptPubKey.
+    OP_CODESEPARATOR and signature removal (FindAndDelete) are left to the
+    caller since standard P2PKH scripts contain neither.
+    """
+
+    CHECKPOINT_INTERVAL = 64
+
+    def __init__(self, version: int, inputs: list, outputs: list, locktime: int):
+        """
+        Parameters:
+            version (int): Transaction version
+            inputs (list): List of serialized inputs
+            outputs (list): List of serialized outputs
+            locktime (int): Transaction locktime
+        """
+        self.version = version.to_bytes(4, 'little')
+        self.locktime = locktime.to_bytes(4, 'little')
+        self.outpoints = [tx_in[:36] for tx_in in inputs]
+        self.sequences = [tx_in[-4:] for tx_in in inputs]
+        self.outputs = list(outputs)
+        self._outputs_all = None
+        self._blank = {}
+        self._checkpoints = {}
+
+    @property
+    def outputs_all(self) -> bytes:
+        """Output count and all outputs, serialized once."""
+        if self._outputs_all is None:
+            self._outputs_all = varint(len(self.outputs)) + b''.join(self.outputs)
+        return self._outputs_all
+
+    def _blank_inputs(self, zero_sequences: bool) -> memoryview:
+        """All inputs with blank scriptSigs (and zeroed sequences for NONE/SINGLE)."""
+        blob = self._blank.get(zero_sequences)
+        if blob is None:
+            blob = memoryview(b''.join(
+                outpoint + b'\x00' + (b'\x00' * 4 if zero_sequences else sequence)
+                for outpoint, sequence in zip(self.outpoints, self.sequences)
+            ))
+            self._blank[zero_sequences] = blob
+        return blob
+
+    def _prefix_state(self, index: int, zero_sequences: bool):
+        """SHA256 state covering everything serialized before input `index`."""
+        blob = self._blank_inputs(zero_sequences)
+        checkpoints = self._checkpoints.setdefault(zero_sequences, [])
+        if not checkpoints:
+            checkpoints.append(hashlib.sha256(self.version + varint(len(self.outpoints))))
+
+        wanted = index // self.CHECKPOINT_INTERVAL
+        while len(checkpoints) <= wanted:
+            start = (len(checkpoints) - 1) * self.CHECKPOINT_INTERVAL * BLANK_INPUT_SIZE
+            end = start + self.CHECKPOINT_INTERVAL * BLANK_INPUT_SIZE
+            state = checkpoints[-1].copy()
+            state.update(blob[start:end])
+            checkpoints.append(state)
+
+        state = checkpoints[wanted].copy()
+        start = wanted * self.CHECKPOINT_INTERVAL * BLANK_INPUT_SIZE
+        state.update(blob[start:index * BLANK_INPUT_SIZE])
+        return state
+
+    def _outputs_part(self, index: int, base_type: int) -> bytes:
+        """Serialized output count and outputs for the given sighash type."""
+        if base_type == SIGHASH_NONE:
+            return b'\x00'
+        if base_type == SIGHASH_SINGLE:
+            return varint(index + 1) + NULL_OUTPUT * index + self.outputs[index]
+        return self.outputs_all
+
+    def digest(self, index: int, script_code: bytes, sighash: int = SIGHASH_ALL) -> bytes:
+        """
+        Compute the legacy signature digest for one input.
+
+        Parameters:
+            index (int): Index of the input being signed
+            script_code (bytes): The script code for signing (length-prefixed)
+            sighash (int): Signature hash type
+
+        Returns:
+            bytes: The transaction digest to be signed
+        """
+        if not 0 <= index < len(self.outpoints):
+            raise IndexError(f"input index {index} out of range")
+        base_type = sighash & 0x1f
+        if base_type == SIGHASH_SINGLE and index >= len(self.outputs):
+            # Consensus quirk: SINGLE without a matching output signs the value 1
+            return ONE_HASH
+
+        if sighash & SIGHASH_ANYONECANPAY:
+            state = hashlib.sha256(self.version + b'\x01')
+        else:
+            zero_sequences = base_type in (SIGHASH_NONE, SIGHASH_SINGLE)
+            state = self._prefix_state(index, zero_sequences)
+        state.update(self.outpoints[index])
+        state.update(script_code)
+        state.update(self.sequences[index])
+        if not sighash & SIGHASH_ANYONECANPAY:
+            blob = self._blank_inputs(zero_sequences)
+            state.update(blob[(index + 1) * BLANK_INPUT_SIZE:])
+        state.update(self._outputs_part(index, base_type))
+        state.update(self.locktime)
+        state.update(sighash.to_bytes(4, 'little'))
+        return hashlib.sha256(state.digest()).digest()
+
+    def digests(self, script_codes: list, sighash: int = SIGHASH_ALL) -> list:
+        """
+        Compute the legacy digest for every input in order.
+
+        Parameters:
+            script_codes (list): Script code for each input
+            sighash (int): Signature hash type used for every input
+
+        Returns:
+            list: One digest per input
+        """
+        if len(script_codes) != len(self.outpoints):
+            raise ValueError("need one script code per input")
+        return [self.digest(index, script_code, sighash)
+                for index, script_code in enumerate(script_codes)]
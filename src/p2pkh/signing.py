@@ -0,0 +1,120 @@
+"""
+ECDSA signing over secp256k1, matching the `sign` function of Exercises 3 and 4.
+
+The actual ECDSA implementation comes from `p2pkh.backend`, which imports
+the fastest installed backend on first use.
+"""
+
+from .backend import get_backend
+from .compactsize import varint
+from .hashing import hash160
+from .keycache import KeyCache, KeyMaterial
+from .secp256k1 import N
+
+SIGHASH_ALL_BYTE = b'\x01'
+
+
+def _check_private_key(private_key: bytes) -> None:
+    if len(private_key) != 32:
+        raise ValueError("private key must be 32 bytes")
+    if not 1 <= int.from_bytes(private_key, 'big') < N:
+        raise ValueError("private key out of range")
+
+
+def _check_digest(digest: bytes) -> None:
+    if len(digest) != 32:
+        raise ValueError("digest must be 32 bytes")
+
+
+def sign(private_key: bytes, digest: bytes) -> bytes:
+    """
+    Sign a transaction digest with a private key.
+
+    The nonce is derived deterministically (RFC6979), S is normalized to the
+    lower half of the curve order (BIP62) and the signature is DER encoded
+    with the SIGHASH_ALL byte appended.
+
+    Parameters:
+        private_key (bytes): The private key to sign with
+        digest (bytes): The transaction digest to sign
+
+    Returns:
+        bytes: The DER-encoded signature with SIGHASH_ALL appended
+
+    Raises:
+        ValueError: If the key is not a valid secp256k1 private key or the
+            digest is not 32 bytes
+    """
+    _check_private_key(private_key)
+    _check_digest(digest)
+    return get_backend().sign(private_key, digest) + SIGHASH_ALL_BYTE
+
+
+def _sign_with_key(signing_key, digest: bytes) -> bytes:
+    """Sign a digest with a signing key prepared by the active backend."""
+    _check_digest(digest)
+    return get_backend().sign_prepared(signing_key, digest) + SIGHASH_ALL_BYTE
+
+
+def get_pub_from_priv(private_key: bytes) -> bytes:
+    """
+    Derive a compressed public key from a private key.
+
+    Without a native backend this uses the precomputed generator table from
+    `p2pkh.secp256k1`, which is built on the first call in each process.
+
+    Parameters:
+        private_key (bytes): The private key
+
+    Returns:
+        bytes: The compressed public key
+    """
+    _check_private_key(private_key)
+    return get_backend().pubkey(private_key)
+
+
+def derive_key_material(private_key: bytes) -> KeyMaterial:
+    """
+    Derive the public key, its hash160 and the signing key for a private key.
+
+    Parameters:
+        private_key (bytes): The private key
+
+    Returns:
+        KeyMaterial: The derived key material
+    """
+    pubkey = get_pub_from_priv(private_key)
+    return KeyMaterial(pubkey, hash160(pubkey), get_backend().prepare(private_key))
+
+
+key_cache = KeyCache(derive_key_material)
+
+
+def clear_key_cache() -> None:
+    """Drop all key material cached by `get_p2wpkh_witness`."""
+    key_cache.clear()
+
+
+def get_p2wpkh_witness(private_key: bytes, digest: bytes, cache: KeyCache = None) -> bytes:
+    """
+    Create a P2WPKH witness stack.
+
+    Key material is looked up in `cache` (the module-level `key_cache` by
+    default), so signing many inputs with one key derives it only once.
+
+    Parameters:
+        private_key (bytes): The private key to sign with
+        digest (bytes): The transaction digest to sign
+        cache (KeyCache): Key material cache to use
+
+    Returns:
+        bytes: The serialized witness stack
+    """
+    if cache is None:
+        cache = key_cache
+    material = cache.get(private_key)
+    signature = _sign_with_key(material.signing_key, digest)
+    return (
+        varint(2) + varint(len(signature)) + signature +
+        varint(len(material.pubkey)) + material.pubkey
+    )
@@ -0,0 +1,197 @@
+"""
+Streaming transaction writer for transactions too large to build in memory.
+
+`assemble_transaction` needs every input, output and witness stack in a
+list. `TransactionStreamWriter` instead takes iterables (generators
+included), writes each component to a sink as soon as it is produced and
+feeds it to running SHA256 states, so the txid and wtxid are known when the
+last byte is written and peak memory does not grow with the transaction.
+
+Counts are written before the components they count. When a count is given,
+or the iterable has a `len()`, components are streamed straight through and
+the count is checked at the end. Otherwise they are spooled to a temporary
+file (in memory up to `SPOOL_MEMORY` bytes) while being counted, then copied
+out behind the count. Back-patching the count in place is not an option:
+compact sizes must be minimally encoded, so the width of the count is not
+known until the components have been counted.
+"""
+
+import hashlib
+import tempfile
+from typing import NamedTuple
+
+from .compactsize import varint
+
+SPOOL_MEMORY = 1024 * 1024
+COPY_CHUNK = 64 * 1024
+
+
+class StreamResult(NamedTuple):
+    """Identifiers and size of a streamed transaction."""
+    txid: str
+    wtxid: str
+    size: int
+
+
+class TransactionStreamWriter:
+    """
+    Writes a transaction to a sink component by component.
+
+    Call `write_inputs`, `write_outputs`, `write_witnesses` (SegWit only)
+    and `finish`, in that order.
+    """
+
+    def __init__(self, sink, version: int, locktime: int = 0, segwit: bool = True):
+        """
+        Parameters:
+            sink: Object with a `write(bytes)` method (file, socket file, ...)
+            version (int): Transaction version
+            locktime (int): Transaction locktime
+            segwit (bool): Whether to write the marker, flag and witnesses
+        """
+        self.sink = sink
+        self.segwit = segwit
+        self.locktime = locktime.to_bytes(4, 'little')
+        self.size = 0
+        self.input_count = None
+        self._txid_state = hashlib.sha256()
+        self._wtxid_state = hashlib.sha256() if segwit else None
+        self._stage = 'inputs'
+
+        header = version.to_bytes(4, 'little')
+        self._emit(header, witness=False)
+        if segwit:
+            self._emit(b'\x00\x01', witness=True)
+
+    def _emit(self, data, witness: bool) -> None:
+        """Write to the sink and hash; witness data is left out of the txid."""
+        self.sink.write(data)
+        self.size += len(data)
+        if not witness:
+            self._txid_state.update(data)
+        if self._wtxid_state is not None:
+            self._wtxid_state.update(data)
+
+    def _advance(self, current: str, following: str) -> None:
+        if self._stage != current:
+            raise ValueError(f"cannot write {current} now; expected {self._stage}")
+        self._stage = following
+
+    def _write_counted(self, items, count: int, witness: bool) -> int:
+        """Write a count followed by its components."""
+        if count is None and hasattr(items, '__len__'):
+            count = len(items)
+        if count is None:
+            return self._write_spooled(items, witness)
+
+        self._emit(varint(count), witness)
+        written = 0
+        for item in items:
+            self._emit(item, witness)
+            written += 1
+        if written != count:
+            raise ValueError(f"expected {count} components, got {written}")
+        return count
+
+    def _write_spooled(self, items, witness: bool) -> int:
+        """Count components through a spool file, then copy them out."""
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY) as spool:
+            count = 0
+            for item in items:
+                spool.write(item)
+                count += 1
+            self._emit(varint(count), witness)
+            spool.seek(0)
+            while True:
+                chunk = spool.read(COPY_CHUNK)
+                if not chunk:
+                    break
+                self._emit(chunk, witness)
+        return count
+
+    def write_inputs(self, inputs, count: int = None) -> int:
+        """
+        Write the inputs.
+
+        Parameters:
+            inputs: Iterable of serialized inputs
+            count (int): Number of inputs, if known in advance
+
+        Returns:
+            int: Number of inputs written
+        """
+        self._advance('inputs', 'outputs')
+        self.input_count = self._write_counted(inputs, count, witness=False)
+        return self.input_count
+
+    def write_outputs(self, outputs, count: int = None) -> int:
+        """
+        Write the outputs.
+
+        Parameters:
+            outputs: Iterable of serialized outputs
+            count (int): Number of outputs, if known in advance
+
+        Returns:
+            int: Number of outputs written
+        """
+        self._advance('outputs', 'witnesses' if self.segwit else 'locktime')
+        return self._write_counted(outputs, count, witness=False)
+
+    def write_witnesses(self, witnesses) -> None:
+        """
+        Write one serialized witness stack per input.
+
+        Parameters:
+            witnesses: Iterable of serialized witness stacks
+        """
+        self._advance('witnesses', 'locktime')
+        written = 0
+        for stack in witnesses:
+            self._emit(stack, witness=True)
+            written += 1
+        if written != self.input_count:
+            raise ValueError(f"expected {self.input_count} witness stacks, got {written}")
+
+    def finish(self) -> StreamResult:
+        """
+        Write the locktime.
+
+        Returns:
+            StreamResult: txid, wtxid and size of the written transaction
+        """
+        self._advance('locktime', 'done')
+        self._emit(self.locktime, witness=False)
+        txid = hashlib.sha256(self._txid_state.digest()).digest()[::-1].hex()
+        if self._wtxid_state is None:
+            return StreamResult(txid, txid, self.size)
+        wtxid = hashlib.sha256(self._wtxid_state.digest()).digest()[::-1].hex()
+        return StreamResult(txid, wtxid, self.size)
+
+
+def stream_transaction(sink, version: int, inputs, outputs, witnesses=None,
+                       locktime: int = 0, input_count: int = None,
+                       output_count: int = None) -> StreamResult:
+    """
+    Write a transaction from iterables, like a streaming `assemble_transaction`.
+
+    Parameters:
+        sink: Object with a `write(bytes)` method
+        version (int): Transaction version
+        inputs: Iterable of serialized inputs
+        outputs: Iterable of serialized outputs
+        witnesses: Iterable of serialized witness stacks, one per input
+            (None for a transaction without marker and flag)
+        locktime (int): Transaction locktime
+        input_count (int): Number of inputs, if known in advance
+        output_count (int): Number of outputs, if known in advance
+
+    Returns:
+        StreamResult: txid, wtxid and size of the written transaction
+    """
+    writer = TransactionStreamWriter(sink, version, locktime, segwit=witnesses is not None)
+    writer.write_inputs(inputs, input_count)
+    writer.write_outputs(outputs, output_count)
+    if witnesses is not None:
+        writer.write_witnesses(witnesses)
+    return writer.finish()
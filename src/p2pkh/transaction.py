@@ -0,0 +1,348 @@
+"""
+Compact transaction object model.
+
+The exercises pass transactions around as raw bytes, so anything that needs
+a txid has to re-serialize and re-hash. `Transaction` keeps the parsed
+fields in `__slots__` objects and caches txid, wtxid, size and weight after
+the first computation.
+
+Inputs, outputs and witnesses are immutable value objects. A transaction is
+changed only through its own setters and methods, each of which drops the
+cached values, so the caches can never go stale.
+"""
+
+from .compactsize import read_varint, varint
+from .decode import decode_transaction
+from .hashing import dsha256
+from .serialize import TransactionSerializer
+from .weight import WITNESS_SCALE_FACTOR
+
+
+class _Frozen:
+    """Base for immutable `__slots__` value objects."""
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_bytes() == other.to_bytes()
+
+    def __hash__(self):
+        return hash(self.to_bytes())
+
+
+class TxIn(_Frozen):
+    """
+    A transaction input.
+    """
+    __slots__ = ('prev_txid', 'vout', 'script_sig', 'sequence')
+
+    def __init__(self, prev_txid: bytes, vout: int, script_sig: bytes = b'',
+                 sequence: int = 0xffffffff):
+        """
+        Parameters:
+            prev_txid (bytes): Spent transaction ID in little-endian byte order
+            vout (int): Spent output index
+            script_sig (bytes): The unlocking script, without length prefix
+            sequence (int): The sequence number
+        """
+        object.__setattr__(self, 'prev_txid', bytes(prev_txid))
+        object.__setattr__(self, 'vout', vout)
+        object.__setattr__(self, 'script_sig', bytes(script_sig))
+        object.__setattr__(self, 'sequence', sequence)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'TxIn':
+        """Parse an input serialized by `create_input`."""
+        script_len, offset = read_varint(data, 36)
+        end = offset + script_len
+        return cls(data[:32], int.from_bytes(data[32:36], 'little'), data[offset:end],
+                   int.from_bytes(data[end:end + 4], 'little'))
+
+    @property
+    def outpoint(self) -> bytes:
+        """The 36-byte outpoint (txid in little-endian + vout)."""
+        return self.prev_txid + self.vout.to_bytes(4, 'little')
+
+    def to_bytes(self) -> bytes:
+        """Serialize the input, as `create_input` does."""
+        return (
+            self.prev_txid + self.vout.to_bytes(4, 'little') +
+            varint(len(self.script_sig)) + self.script_sig +
+            self.sequence.to_bytes(4, 'little')
+        )
+
+
+class TxOut(_Frozen):
+    """
+    A transaction output.
+    """
+    __slots__ = ('amount', 'script')
+
+    def __init__(self, amount: int, script: bytes):
+        """
+        Parameters:
+            amount (int): The output amount in satoshis
+            script (bytes): The locking script, without length prefix
+        """
+        object.__setattr__(self, 'amount', amount)
+        object.__setattr__(self, 'script', bytes(script))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'TxOut':
+        """Parse an output serialized by `create_output`."""
+        script_len, offset = read_varint(data, 8)
+        return cls(int.from_bytes(data[:8], 'little'), data[offset:offset + script_len])
+
+    def to_bytes(self) -> bytes:
+        """Serialize the output, as `create_output` does."""
+        return self.amount.to_bytes(8, 'little') + varint(len(self.script)) + self.script
+
+
+class Witness(_Frozen):
+    """
+    The witness stack of one input.
+    """
+    __slots__ = ('items',)
+
+    def __init__(self, items=()):
+        """
+        Parameters:
+            items: Witness stack items, without length prefixes
+        """
+        object.__setattr__(self, 'items', tuple(bytes(item) for item in items))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Witness':
+        """Parse a serialized witness stack."""
+        count, offset = read_varint(data, 0)
+        items = []
+        for _ in range(count):
+            length, offset = read_varint(data, offset)
+            items.append(data[offset:offset + length])
+            offset += length
+        return cls(items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the stack, as `get_p2wpkh_witness` does."""
+        return varint(len(self.items)) + b''.join(
+            varint(len(item)) + item for item in self.items
+        )
+
+
+class Transaction:
+    """
+    A transaction with lazily cached identifiers and sizes.
+    """
+    __slots__ = ('_version', '_inputs', '_outputs', '_witnesses', '_locktime',
+                 '_txid', '_wtxid', '_size', '_base_size')
+
+    def __init__(self, version: int = 2, inputs=(), outputs=(), witnesses=None,
+                 locktime: int = 0):
+        """
+        Parameters:
+            version (int): Transaction version
+            inputs: `TxIn` objects
+            outputs: `TxOut` objects
+            witnesses: `Witness` objects, one per input (default: empty)
+            locktime (int): Transaction locktime
+        """
+        inputs = tuple(inputs)
+        if witnesses is None:
+            witnesses = (Witness(),) * len(inputs)
+        witnesses = tuple(witnesses)
+        if len(witnesses) != len(inputs):
+            raise ValueError("need one witness stack per input")
+        self._version = version
+        self._inputs = inputs
+        self._outputs = tuple(outputs)
+        self._witnesses = witnesses
+        self._locktime = locktime
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        """Drop every cached value after a change."""
+        self._txid = None
+        self._wtxid = None
+        self._size = None
+        self._base_size = None
+
+    @classmethod
+    def from_bytes(cls, data) -> 'Transaction':
+        """Parse a serialized transaction."""
+        view, end = decode_transaction(data)
+        if end != len(data):
+            raise ValueError("trailing data after transaction")
+        inputs = view.inputs
+        return cls(
+            view.version,
+            [TxIn(i.outpoint[:32], i.vout, i.script_sig,
+                  int.from_bytes(i.sequence, 'little')) for i in inputs],
+            [TxOut(o.amount, o.script) for o in view.outputs],
+            [Witness(view.witness(index)) for index in range(len(inputs))],
+            view.locktime,
+        )
+
+    # Mutation, always through methods that invalidate the caches
+
+    @property
+    def version(self) -> int:
+        """Transaction version."""
+        return self._version
+
+    @version.setter
+    def version(self, value: int) -> None:
+        self._version = value
+        self._invalidate()
+
+    @property
+    def locktime(self) -> int:
+        """Transaction locktime."""
+        return self._locktime
+
+    @locktime.setter
+    def locktime(self, value: int) -> None:
+        self._locktime = value
+        self._invalidate()
+
+    @property
+    def inputs(self) -> tuple:
+        """The transaction's `TxIn` objects."""
+        return self._inputs
+
+    @property
+    def outputs(self) -> tuple:
+        """The transaction's `TxOut` objects."""
+        return self._outputs
+
+    @property
+    def witnesses(self) -> tuple:
+        """The transaction's `Witness` objects, one per input."""
+        return self._witnesses
+
+    def add_input(self, tx_in: TxIn, witness: Witness = None) -> None:
+        """Append an input and its witness."""
+        self._inputs += (tx_in,)
+        self._witnesses += (witness or Witness(),)
+        self._invalidate()
+
+    def remove_input(self, index: int) -> None:
+        """Remove an input and its witness."""
+        inputs = list(self._inputs)
+        witnesses = list(self._witnesses)
+        del inputs[index], witnesses[index]
+        self._inputs = tuple(inputs)
+        self._witnesses = tuple(witnesses)
+        self._invalidate()
+
+    def set_input(self, index: int, tx_in: TxIn) -> None:
+        """Replace an input."""
+        inputs = list(self._inputs)
+        inputs[index] = tx_in
+        self._inputs = tuple(inputs)
+        self._invalidate()
+
+    def set_witness(self, index: int, witness: Witness) -> None:
+        """Replace the witness of an input."""
+        witnesses = list(self._witnesses)
+        witnesses[index] = witness
+        self._witnesses = tuple(witnesses)
+        self._invalidate()
+
+    def add_output(self, tx_out: TxOut) -> None:
+        """Append an output."""
+        self._outputs += (tx_out,)
+        self._invalidate()
+
+    def remove_output(self, index: int) -> None:
+        """Remove an output."""
+        outputs = list(self._outputs)
+        del outputs[index]
+        self._outputs = tuple(outputs)
+        self._invalidate()
+
+    def set_output(self, index: int, tx_out: TxOut) -> None:
+        """Replace an output."""
+        outputs = list(self._outputs)
+        outputs[index] = tx_out
+        self._outputs = tuple(outputs)
+        self._invalidate()
+
+    # Serialization and cached derived values
+
+    @property
+    def has_witness(self) -> bool:
+        """Whether any input carries witness data."""
+        return any(witness.items for witness in self._witnesses)
+
+    def _serializer(self, with_witness: bool) -> TransactionSerializer:
+        witnesses = None
+        if with_witness:
+            witnesses = [witness.to_bytes() for witness in self._witnesses]
+        return TransactionSerializer(
+            self._version,
+            [tx_in.to_bytes() for tx_in in self._inputs],
+            [tx_out.to_bytes() for tx_out in self._outputs],
+            witnesses,
+            self._locktime,
+        )
+
+    def serialize(self) -> bytes:
+        """Serialize with witness data when there is any (BIP144)."""
+        return self._serializer(self.has_witness).to_bytes()
+
+    def serialize_base(self) -> bytes:
+        """Serialize without witness data, as hashed for the txid."""
+        return self._serializer(False).to_bytes()
+
+    @property
+    def txid(self) -> str:
+        """Transaction ID as hex, cached."""
+        if self._txid is None:
+            base = self.serialize_base()
+            self._base_size = len(base)
+            self._txid = dsha256(base)[::-1].hex()
+        return self._txid
+
+    @property
+    def wtxid(self) -> str:
+        """Witness transaction ID as hex, cached."""
+        if self._wtxid is None:
+            if not self.has_witness:
+                self._wtxid = self.txid
+            else:
+                full = self.serialize()
+                self._size = len(full)
+                self._wtxid = dsha256(full)[::-1].hex()
+        return self._wtxid
+
+    @property
+    def size(self) -> int:
+        """Serialized size in bytes including witness data, cached."""
+        if self._size is None:
+            self._size = self._serializer(self.has_witness).size
+        return self._size
+
+    @property
+    def base_size(self) -> int:
+        """Serialized size in bytes without witness data, cached."""
+        if self._base_size is None:
+            self._base_size = self._serializer(False).size
+        return self._base_size
+
+    @property
+    def weight(self) -> int:
+        """Transaction weight (BIP141)."""
+        return self.base_size * (WITNESS_SCALE_FACTOR - 1) + self.size
+
+    @property
+    def vsize(self) -> int:
+        """Virtual size in vbytes, rounded up."""
+        return -(-self.weight // WITNESS_SCALE_FACTOR)
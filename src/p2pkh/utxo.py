@@ -0,0 +1,406 @@
+"""
+Memory-mapped UTXO store keyed by outpoint.
+
+`get_transaction_digest` and the sighash contexts need the amount and script
+code of every output an input spends. `UtxoStore` keeps those outputs in a
+single file that is an open-addressing hash table of fixed-width slots:
+
+    header (64 bytes) | slot 0 | slot 1 | ...
+
+    slot: state (1) | outpoint (36) | amount (8) | script length (1) | script
+
+The slot for an outpoint is found by probing linearly from a keyed BLAKE2b
+hash of it, so a lookup touches one or two pages of the mapping and opening
+a store reads only its header. Spent slots become tombstones; the table is
+rebuilt at twice the size when live entries and tombstones pass
+`MAX_LOAD`: the new table is written to a temporary file, fsynced, and
+renamed over the store, so a crash leaves either the old or the new table.
+
+`apply` adds and spends a batch atomically: the whole batch is checked
+first, the previous contents of every slot it touches are written to an
+undo journal and fsynced, and only then is the mapping modified. A store
+opened after a crash mid-batch is rolled back from the journal.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+from typing import NamedTuple
+
+from .compactsize import varint
+from .script import P2WPKH, classify_script, p2pkh_script_pubkey
+
+MAGIC = b'UTXO'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sBxxxQQQH14x16s')
+HEADER_SIZE = 64
+
+OUTPOINT_SIZE = 36
+DEFAULT_SCRIPT_SIZE = 34
+DEFAULT_SLOTS = 1024
+MAX_LOAD = 0.7
+
+EMPTY = 0
+USED = 1
+DELETED = 2
+
+
+class UtxoEntry(NamedTuple):
+    """An unspent output."""
+    amount: int
+    script: bytes
+
+    @property
+    def script_pubkey(self) -> bytes:
+        """The locking script including its length prefix."""
+        return varint(len(self.script)) + self.script
+
+    @property
+    def script_code(self) -> bytes:
+        """
+        The script code a spending input signs (length-prefixed): the P2PKH
+        script for a P2WPKH output, the scriptPubKey itself otherwise.
+        """
+        template, pubkey_hash = classify_script(self.script)
+        if template == P2WPKH:
+            return p2pkh_script_pubkey(pubkey_hash)
+        return self.script_pubkey
+
+    @property
+    def output(self) -> bytes:
+        """The output serialized as by `create_output`."""
+        return self.amount.to_bytes(8, 'little') + self.script_pubkey
+
+
+def _outpoint(item) -> bytes:
+    """The 36-byte outpoint of an outpoint or a serialized input."""
+    if len(item) < OUTPOINT_SIZE:
+        raise ValueError("outpoint must be 36 bytes")
+    return bytes(item[:OUTPOINT_SIZE])
+
+
+class UtxoStore:
+    """
+    A file-backed outpoint -> (amount, script) table.
+
+    Outpoints may be given as the 36-byte outpoint itself or as a whole
+    serialized input (`create_input` output), whose first 36 bytes are used.
+    """
+
+    def __init__(self, path: str, slots: int = DEFAULT_SLOTS,
+                 script_size: int = DEFAULT_SCRIPT_SIZE):
+        """
+        Parameters:
+            path (str): Store file, created if missing
+            slots (int): Initial slot count for a new store
+            script_size (int): Largest script a new store can hold
+        """
+        self.path = path
+        self.journal_path = path + '.journal'
+        if not os.path.exists(path):
+            _create(path, slots, script_size, os.urandom(16))
+        self._open()
+        if os.path.exists(self.journal_path):
+            self._recover()
+
+    def _open(self) -> None:
+        self._file = open(self.path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, version, slots, used, deleted, script_size, salt = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._close_map()
+            raise ValueError(f"{self.path} is not a UTXO store")
+        self.slots = slots
+        self.used = used
+        self.deleted = deleted
+        self.script_size = script_size
+        self.slot_size = 1 + OUTPOINT_SIZE + 8 + 1 + script_size
+        self._salt = salt
+        if len(self._map) != HEADER_SIZE + slots * self.slot_size:
+            self._close_map()
+            raise ValueError(f"{self.path} has the wrong size")
+
+    def _close_map(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> 'UtxoStore':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.used
+
+    def __contains__(self, outpoint) -> bool:
+        return self._find(_outpoint(outpoint))[0] is not None
+
+    def close(self) -> None:
+        """Flush and close the store."""
+        self._map.flush()
+        self._close_map()
+
+    def _header(self) -> bytes:
+        return HEADER.pack(MAGIC, FORMAT_VERSION, self.slots, self.used, self.deleted,
+                           self.script_size, self._salt)
+
+    def _home(self, outpoint: bytes) -> int:
+        digest = hashlib.blake2b(outpoint, digest_size=8, key=self._salt).digest()
+        return int.from_bytes(digest, 'little') % self.slots
+
+    def _find(self, outpoint: bytes, home: int = None) -> tuple:
+        """
+        Probe for an outpoint.
+
+        Returns:
+            tuple: (slot holding it or None, first free slot on the probe path)
+        """
+        buf = self._map
+        size = self.slot_size
+        slot = self._home(outpoint) if home is None else home
+        free = None
+        for _ in range(self.slots):
+            start = HEADER_SIZE + slot * size
+            state = buf[start]
+            if state == EMPTY:
+                return None, slot if free is None else free
+            if state == DELETED:
+                if free is None:
+                    free = slot
+            elif buf[start + 1:start + 1 + OUTPOINT_SIZE] == outpoint:
+                return slot, free
+            slot = (slot + 1) % self.slots
+        return None, free
+
+    def _read(self, slot: int) -> UtxoEntry:
+        start = HEADER_SIZE + slot * self.slot_size + 1 + OUTPOINT_SIZE
+        buf = self._map
+        amount = int.from_bytes(buf[start:start + 8], 'little')
+        length = buf[start + 8]
+        return UtxoEntry(amount, buf[start + 9:start + 9 + length])
+
+    def _slot_bytes(self, outpoint: bytes, amount: int, script: bytes) -> bytes:
+        return (bytes([USED]) + outpoint + amount.to_bytes(8, 'little') +
+                bytes([len(script)]) + script.ljust(self.script_size, b'\x00'))
+
+    def get(self, outpoint) -> UtxoEntry:
+        """
+        Look up an unspent output.
+
+        Parameters:
+            outpoint: Outpoint or serialized input
+
+        Returns:
+            UtxoEntry: The output, or None if it is not in the store
+        """
+        slot, _ = self._find(_outpoint(outpoint))
+        return None if slot is None else self._read(slot)
+
+    def get_many(self, outpoints) -> list:
+        """
+        Look up many outputs, e.g. everything a transaction's inputs spend.
+
+        Probes are issued in slot order so the mapping is walked forward.
+
+        Parameters:
+            outpoints: Iterable of outpoints or serialized inputs
+
+        Returns:
+            list: One `UtxoEntry` (or None) per outpoint, in input order
+        """
+        keys = [_outpoint(item) for item in outpoints]
+        homes = [self._home(key) for key in keys]
+        results = [None] * len(keys)
+        for i in sorted(range(len(keys)), key=homes.__getitem__):
+            slot, _ = self._find(keys[i], homes[i])
+            if slot is not None:
+                results[i] = self._read(slot)
+        return results
+
+    def apply(self, add=(), spend=()) -> list:
+        """
+        Atomically add and spend outputs.
+
+        Adds are applied before spends, so a batch may spend an output it
+        adds (a transaction spending one earlier in the same block). If any
+        add or spend is invalid nothing is changed.
+
+        Parameters:
+            add: Iterable of (outpoint, amount, script) with script given
+                without a length prefix
+            spend: Iterable of outpoints or serialized inputs
+
+        Returns:
+            list: The `UtxoEntry` removed by each spend
+        """
+        add = [(_outpoint(outpoint), amount, bytes(script)) for outpoint, amount, script in add]
+        spend = [_outpoint(item) for item in spend]
+
+        live = {}
+        for outpoint, amount, script in add:
+            if len(script) > self.script_size:
+                raise ValueError(f"script longer than {self.script_size} bytes")
+            if not 0 <= amount < 1 << 64:
+                raise ValueError("amount out of range")
+            if outpoint in live or outpoint in self:
+                raise ValueError(f"output {outpoint.hex()} already exists")
+            live[outpoint] = UtxoEntry(amount, script)
+        spent = []
+        seen = set()
+        for outpoint in spend:
+            if outpoint in seen:
+                raise ValueError(f"output {outpoint.hex()} spent twice")
+            seen.add(outpoint)
+            entry = live.pop(outpoint, None)
+            if entry is None:
+                entry = self.get(outpoint)
+                if entry is None:
+                    raise ValueError(f"output {outpoint.hex()} not found")
+            spent.append(entry)
+
+        if self.used + self.deleted + len(live) > self.slots * MAX_LOAD:
+            self._resize(max(self.slots * 2, int((self.used + len(live)) / MAX_LOAD) + 1))
+
+        # Net effect of the batch: outputs added and spent in it cancel out
+        added = set(outpoint for outpoint, _, _ in add)
+        writes = []
+        for outpoint in spend:
+            if outpoint not in added:
+                slot, _ = self._find(outpoint)
+                writes.append((slot, None))
+        self._write_batch(writes, live)
+        return spent
+
+    def add_many(self, outputs) -> None:
+        """Atomically add (outpoint, amount, script) entries."""
+        self.apply(add=outputs)
+
+    def spend_many(self, outpoints) -> list:
+        """Atomically remove outputs, returning their entries."""
+        return self.apply(spend=outpoints)
+
+    def _write_batch(self, removals: list, additions: dict) -> None:
+        """Journal the touched slots, then apply removals and additions."""
+        buf = self._map
+        size = self.slot_size
+        used, deleted = self.used, self.deleted
+
+        # Plan every slot write against a scratch copy of the touched slots so
+        # additions can reuse slots freed earlier in the same batch.
+        planned = {}
+        for slot, _ in removals:
+            planned[slot] = bytes([DELETED]) + bytes(size - 1)
+            used -= 1
+            deleted += 1
+        for outpoint, entry in additions.items():
+            slot = self._probe_free(outpoint, planned)
+            start = HEADER_SIZE + slot * size
+            previous = planned.get(slot, buf[start:start + 1])[0]
+            if previous == DELETED:
+                deleted -= 1
+            planned[slot] = self._slot_bytes(outpoint, entry.amount, entry.script)
+            used += 1
+
+        with open(self.journal_path, 'wb') as journal:
+            body = bytearray(self._header())
+            for slot in planned:
+                start = HEADER_SIZE + slot * size
+                body += slot.to_bytes(8, 'little') + buf[start:start + size]
+            journal.write(body + hashlib.sha256(body).digest())
+            journal.flush()
+            os.fsync(journal.fileno())
+
+        for slot, data in planned.items():
+            start = HEADER_SIZE + slot * size
+            buf[start:start + size] = data
+        self.used, self.deleted = used, deleted
+        buf[:HEADER_SIZE] = self._header()
+        buf.flush()
+        os.remove(self.journal_path)
+
+    def _probe_free(self, outpoint: bytes, planned: dict) -> int:
+        """First free slot for `outpoint`, seeing writes planned in this batch."""
+        buf = self._map
+        slot = self._home(outpoint)
+        for _ in range(self.slots):
+            data = planned.get(slot)
+            state = data[0] if data is not None else buf[HEADER_SIZE + slot * self.slot_size]
+            if state != USED:
+                return slot
+            slot = (slot + 1) % self.slots
+        raise ValueError("UTXO store is full")
+
+    def _recover(self) -> None:
+        """Roll back a batch interrupted by a crash."""
+        with open(self.journal_path, 'rb') as journal:
+            data = journal.read()
+        body, checksum = data[:-32], data[-32:]
+        if len(data) >= HEADER_SIZE + 32 and hashlib.sha256(body).digest() == checksum:
+            buf = self._map
+            size = self.slot_size
+            for offset in range(HEADER_SIZE, len(body), 8 + size):
+                slot = int.from_bytes(body[offset:offset + 8], 'little')
+                start = HEADER_SIZE + slot * size
+                buf[start:start + size] = body[offset + 8:offset + 8 + size]
+            buf[:HEADER_SIZE] = body[:HEADER_SIZE]
+            buf.flush()
+            self._close_map()
+            self._open()
+        # An incomplete journal means the store was never modified
+        os.remove(self.journal_path)
+
+    def _resize(self, slots: int) -> None:
+        """
+        Rebuild the table with `slots` slots, dropping tombstones.
+
+        The store file is only replaced once the new table is on disk, and
+        the rename itself is made durable by syncing the directory.
+        """
+        tmp_path = f"{self.path}.tmp{os.getpid()}"
+        _create(tmp_path, slots, self.script_size, self._salt)
+        new = UtxoStore.__new__(UtxoStore)
+        new.path = tmp_path
+        new._open()
+        buf = self._map
+        size = self.slot_size
+        for slot in range(self.slots):
+            start = HEADER_SIZE + slot * size
+            if buf[start] == USED:
+                outpoint = bytes(buf[start + 1:start + 1 + OUTPOINT_SIZE])
+                target = new._probe_free(outpoint, {})
+                target_start = HEADER_SIZE + target * size
+                new._map[target_start:target_start + size] = buf[start:start + size]
+        new.used = self.used
+        new._map[:HEADER_SIZE] = new._header()
+        new._map.flush()
+        os.fsync(new._file.fileno())
+        new.close()
+        self.close()
+        os.replace(tmp_path, self.path)
+        _fsync_directory(self.path)
+        self._open()
+
+
+def _fsync_directory(path: str) -> None:
+    """Make a rename or creation in the directory of `path` durable."""
+    if os.name != 'posix':
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _create(path: str, slots: int, script_size: int, salt: bytes) -> None:
+    """Write an empty store."""
+    if slots < 1:
+        raise ValueError("slots must be positive")
+    if not 0 < script_size <= 255:
+        raise ValueError("script_size must be between 1 and 255")
+    slot_size = 1 + OUTPOINT_SIZE + 8 + 1 + script_size
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, slots, 0, 0, script_size, salt))
+        f.truncate(HEADER_SIZE + slots * slot_size)
@@ -0,0 +1,231 @@
+"""
+ECDSA signature verification, the counterpart of `sign`.
+
+Signatures are taken exactly as `sign` produces them: strict DER (BIP66)
+followed by one sighash byte. Parsing reads integers straight out of the
+signature buffer, so memoryview slices of a larger transaction can be
+verified without copying them first.
+"""
+
+from typing import NamedTuple
+
+from .batch import DEFAULT_CHUNK_SIZE, BatchResult, run_chunked
+from .compactsize import read_varint
+from .secp256k1 import N, P, decompress, get_generator_table, jacobian_add, multiply_jacobian
+from .sigcache import SignatureCache, signature_cache
+from .sighash import SIGHASH_ALL, SIGHASH_ANYONECANPAY, SIGHASH_NONE, SIGHASH_SINGLE
+
+HALF_N = N // 2
+
+
+class ParsedSignature(NamedTuple):
+    """A decoded signature."""
+    r: int
+    s: int
+    sighash: int
+
+
+def is_valid_signature_encoding(sig) -> bool:
+    """
+    Check strict DER encoding of a signature with trailing sighash byte (BIP66).
+
+    Parameters:
+        sig: bytes or memoryview holding DER signature + sighash byte
+
+    Returns:
+        bool: True if the encoding is valid
+    """
+    length = len(sig)
+    if length < 9 or length > 73:
+        return False
+    if sig[0] != 0x30 or sig[1] != length - 3:
+        return False
+    len_r = sig[3]
+    if 5 + len_r >= length:
+        return False
+    len_s = sig[5 + len_r]
+    if len_r + len_s + 7 != length:
+        return False
+    if sig[2] != 0x02 or len_r == 0 or sig[4] & 0x80:
+        return False
+    if len_r > 1 and sig[4] == 0 and not sig[5] & 0x80:
+        return False
+    if sig[len_r + 4] != 0x02 or len_s == 0 or sig[len_r + 6] & 0x80:
+        return False
+    if len_s > 1 and sig[len_r + 6] == 0 and not sig[len_r + 7] & 0x80:
+        return False
+    return True
+
+
+def parse_signature(sig, require_low_s: bool = True) -> ParsedSignature:
+    """
+    Parse a DER signature with trailing sighash byte.
+
+    Parameters:
+        sig: bytes or memoryview holding DER signature + sighash byte
+        require_low_s (bool): Reject S values above N/2 (BIP62/BIP146)
+
+    Returns:
+        ParsedSignature: r, s and the sighash type
+
+    Raises:
+        ValueError: If the encoding, values or sighash type are invalid
+    """
+    if not is_valid_signature_encoding(sig):
+        raise ValueError("signature is not strict DER")
+    view = sig if isinstance(sig, memoryview) else memoryview(sig)
+    len_r = view[3]
+    r = int.from_bytes(view[4:4 + len_r], 'big')
+    s = int.from_bytes(view[6 + len_r:len(view) - 1], 'big')
+    if not 0 < r < N or not 0 < s < N:
+        raise ValueError("signature values out of range")
+    if require_low_s and s > HALF_N:
+        raise ValueError("signature S value is not low")
+    sighash = view[-1]
+    if sighash & ~SIGHASH_ANYONECANPAY not in (SIGHASH_ALL, SIGHASH_NONE, SIGHASH_SINGLE):
+        raise ValueError("undefined sighash type")
+    return ParsedSignature(r, s, sighash)
+
+
+def verify(pubkey, digest, sig, require_low_s: bool = True) -> bool:
+    """
+    Verify a signature over a transaction digest.
+
+    Parameters:
+        pubkey: Compressed or uncompressed public key
+        digest: The 32-byte digest that was signed
+        sig: DER signature with the sighash byte appended
+        require_low_s (bool): Reject S values above N/2
+
+    Returns:
+        bool: True if the signature is valid for the key and digest
+    """
+    try:
+        r, s, _ = parse_signature(sig, require_low_s)
+        point = decompress(pubkey)
+    except ValueError:
+        return False
+    if len(digest) != 32:
+        return False
+
+    z = int.from_bytes(digest, 'big') % N
+    s_inv = pow(s, -1, N)
+    u1 = z * s_inv % N
+    u2 = r * s_inv % N
+    x, _, zc = jacobian_add(
+        get_generator_table().multiply_jacobian(u1),
+        multiply_jacobian(u2, point),
+    )
+    if zc == 0:
+        return False
+    # Compare x(R) mod N with r without converting R to affine: x = X / Z^2,
+    # and x mod N == r means x is r or r + N (the latter only below P).
+    zc2 = zc * zc % P
+    if x == r * zc2 % P:
+        return True
+    return r + N < P and x == (r + N) * zc2 % P
+
+
+def verify_cached(pubkey, digest, sig, cache: SignatureCache = None) -> bool:
+    """
+    Verify a signature, consulting and filling a signature cache.
+
+    Parameters:
+        pubkey: Compressed or uncompressed public key
+        digest: The 32-byte digest that was signed
+        sig: DER signature with the sighash byte appended
+        cache (SignatureCache): Cache to use (default: the shared
+            `signature_cache`)
+
+    Returns:
+        bool: True if the signature is valid for the key and digest
+    """
+    if len(digest) != 32:
+        return False
+    if cache is None:
+        cache = signature_cache
+    entry = cache.entry(pubkey, digest, sig)
+    if cache.contains(entry):
+        return True
+    if not verify(pubkey, digest, sig):
+        return False
+    cache.add(entry)
+    return True
+
+
+def parse_p2wpkh_witness(witness) -> tuple:
+    """
+    Split a serialized P2WPKH witness stack into its two items.
+
+    Parameters:
+        witness: Serialized stack as produced by `get_p2wpkh_witness`
+
+    Returns:
+        tuple: (signature, pubkey) as memoryview slices of the witness
+    """
+    view = witness if isinstance(witness, memoryview) else memoryview(witness)
+    count, offset = read_varint(view, 0)
+    if count != 2:
+        raise ValueError("P2WPKH witness must have exactly 2 items")
+    sig_len, offset = read_varint(view, offset)
+    sig = view[offset:offset + sig_len]
+    offset += sig_len
+    pubkey_len, offset = read_varint(view, offset)
+    pubkey = view[offset:offset + pubkey_len]
+    if len(sig) != sig_len or len(pubkey) != pubkey_len or offset + pubkey_len != len(view):
+        raise ValueError("malformed P2WPKH witness")
+    return sig, pubkey
+
+
+def verify_p2wpkh_witness(witness, digest, cache: SignatureCache = None) -> bool:
+    """
+    Verify the signature inside a P2WPKH witness stack against a digest.
+
+    Parameters:
+        witness: Serialized stack as produced by `get_p2wpkh_witness`
+        digest: The 32-byte digest that was signed
+        cache (SignatureCache): Cache to use (default: the shared one)
+
+    Returns:
+        bool: True if the witness signature is valid
+    """
+    try:
+        sig, pubkey = parse_p2wpkh_witness(witness)
+    except ValueError:
+        return False
+    return verify_cached(pubkey, digest, sig, cache)
+
+
+def verify_chunk(chunk: list) -> list:
+    """
+    Verify a chunk of signatures in the current process.
+
+    This is the unit of work `verify_batch` hands to pool workers; callers
+    running their own pool can submit it directly.
+
+    Parameters:
+        chunk (list): List of (pubkey, digest, signature) tuples
+
+    Returns:
+        list: One bool per item, in order
+    """
+    return [verify(pubkey, digest, sig) for pubkey, digest, sig in chunk]
+
+
+def verify_batch(items: list, processes: int = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> BatchResult:
+    """
+    Verify many signatures, spreading the work over a process pool.
+
+    Parameters:
+        items (list): List of (pubkey, digest, signature) tuples
+        processes (int): Worker processes (default: number of CPUs)
+        chunk_size (int): Items handed to a worker at a time
+
+    Returns:
+        BatchResult: One bool per item in input order, with the batch's
+            elapsed time (latency) and throughput
+    """
+    # Views cannot cross process boundaries; plain bytes can
+    items = [tuple(bytes(field) for field in item) for item in items]
+    return run_chunked(verify_chunk, items, processes, chunk_size)
@@ -0,0 +1,144 @@
+"""
+Transaction size, weight and vsize without serialization.
+
+Fee estimation only needs the lengths of the serialized inputs, outputs and
+witness stacks, not the transaction itself. `TxWeight` keeps running totals
+of those lengths and the input/output counts, so adding or removing one
+component updates every figure in O(1).
+
+Sizes follow BIP141: base size excludes the marker, flag and witness data;
+weight is base size * 3 + total size; vsize is weight / 4 rounded up.
+"""
+
+from .compactsize import varint_size
+
+WITNESS_SCALE_FACTOR = 4
+
+# version + locktime
+FIXED_SIZE = 8
+MARKER_FLAG_SIZE = 2
+
+
+def _length(item) -> int:
+    """Length of a serialized component, or the component itself if an int."""
+    return item if isinstance(item, int) else len(item)
+
+
+class TxWeight:
+    """
+    Running size and weight totals for a transaction under construction.
+
+    Components can be given as serialized bytes (as produced by
+    `create_input`, `create_output` and `get_p2wpkh_witness`) or directly as
+    their serialized lengths.
+    """
+    __slots__ = ('segwit', 'input_count', 'output_count',
+                 'inputs_size', 'outputs_size', 'witnesses_size')
+
+    def __init__(self, inputs=(), outputs=(), witnesses=None, segwit: bool = None):
+        """
+        Parameters:
+            inputs: Serialized inputs or their lengths
+            outputs: Serialized outputs or their lengths
+            witnesses: Serialized witness stacks or their lengths, one per input
+            segwit (bool): Whether the marker and flag are serialized (default:
+                when witnesses are given, as in `assemble_transaction`)
+        """
+        self.segwit = witnesses is not None if segwit is None else segwit
+        self.input_count = 0
+        self.output_count = 0
+        self.inputs_size = 0
+        self.outputs_size = 0
+        self.witnesses_size = 0
+        for tx_in in inputs:
+            self.input_count += 1
+            self.inputs_size += _length(tx_in)
+        for tx_out in outputs:
+            self.output_count += 1
+            self.outputs_size += _length(tx_out)
+        if witnesses is not None:
+            witnesses = list(witnesses)
+            if len(witnesses) != self.input_count:
+                raise ValueError("need one witness stack per input")
+            for witness in witnesses:
+                self.witnesses_size += _length(witness)
+        elif self.segwit:
+            # Every input without witness data still carries an empty stack
+            self.witnesses_size = self.input_count
+
+    def add_input(self, tx_in, witness=b'\x00') -> None:
+        """Account for one more input and its witness stack."""
+        self.input_count += 1
+        self.inputs_size += _length(tx_in)
+        self.witnesses_size += _length(witness)
+
+    def remove_input(self, tx_in, witness=b'\x00') -> None:
+        """Stop accounting for an input and its witness stack."""
+        if self.input_count == 0:
+            raise ValueError("no inputs to remove")
+        self.input_count -= 1
+        self.inputs_size -= _length(tx_in)
+        self.witnesses_size -= _length(witness)
+
+    def replace_witness(self, old, new) -> None:
+        """Swap one witness stack for another, e.g. a placeholder for a signature."""
+        self.witnesses_size += _length(new) - _length(old)
+
+    def add_output(self, tx_out) -> None:
+        """Account for one more output."""
+        self.output_count += 1
+        self.outputs_size += _length(tx_out)
+
+    def remove_output(self, tx_out) -> None:
+        """Stop accounting for an output."""
+        if self.output_count == 0:
+            raise ValueError("no outputs to remove")
+        self.output_count -= 1
+        self.outputs_size -= _length(tx_out)
+
+    @property
+    def base_size(self) -> int:
+        """Size without marker, flag and witness data."""
+        return (
+            FIXED_SIZE +
+            varint_size(self.input_count) + self.inputs_size +
+            varint_size(self.output_count) + self.outputs_size
+        )
+
+    @property
+    def witness_size(self) -> int:
+        """Size of the marker, flag and witness stacks."""
+        if not self.segwit:
+            return 0
+        return MARKER_FLAG_SIZE + self.witnesses_size
+
+    @property
+    def size(self) -> int:
+        """Total serialized size."""
+        return self.base_size + self.witness_size
+
+    @property
+    def weight(self) -> int:
+        """Transaction weight."""
+        return self.base_size * WITNESS_SCALE_FACTOR + self.witness_size
+
+    @property
+    def vsize(self) -> int:
+        """Virtual size in vbytes, rounded up."""
+        return -(-self.weight // WITNESS_SCALE_FACTOR)
+
+
+def transaction_weight(inputs, outputs, witnesses=None) -> TxWeight:
+    """
+    Compute size figures for the transaction `assemble_transaction` would build.
+
+    Parameters:
+        inputs: Serialized inputs or their lengths
+        outputs: Serialized outputs or their lengths
+        witnesses: Serialized witness stacks or their lengths (None for a
+            transaction without marker and flag)
+
+    Returns:
+        TxWeight: Base size, witness size, weight and vsize
+    """
+    return TxWeight(inputs, outputs, witnesses)
@@ -0,0 +1,112 @@
+import random
+import unittest
+from p2pkh.address import (
+    MAINNET, REGTEST, TESTNET, address_to_script, addresses_to_scripts, b58check_decode,
+    b58check_encode, b58decode, b58encode, decode_segwit_address, script_to_address,
+    scripts_to_addresses
+)
+from p2pkh.decode import decode_transaction
+from p2pkh.serialize import create_basic_tx, create_input, create_output
+
+# BIP173 / BIP350 valid addresses and their scriptPubKeys
+SEGWIT_VECTORS = [
+    ("BC1QW508D6QEJXTDG4Y5R3ZARVARY0C5XW7KV8F3T4", "0014751e76e8199196d454941c45d1b3a323f1433bd6"),
+    ("tb1qrp33g0q5c5txsp9arysrx4k6zdkfs4nce4xj0gdcccefvpysxf3q0sl5k7",
+     "00201863143c14c5166804bd19203356da136c985678cd4d27a1b8c6329604903262"),
+    ("bc1pw508d6qejxtdg4y5r3zarvary0c5xw7kw508d6qejxtdg4y5r3zarvary0c5xw7kt5nd6y",
+     "5128751e76e8199196d454941c45d1b3a323f1433bd6751e76e8199196d454941c45d1b3a323f1433bd6"),
+    ("BC1SW50QGDZ25J", "6002751e"),
+    ("bc1zw508d6qejxtdg4y5r3zarvaryvaxxpcs", "5210751e76e8199196d454941c45d1b3a323"),
+    ("tb1pqqqqp399et2xygdj5xreqhjjvcmzhxw4aywxecjdzew6hylgvsesf3hn0c",
+     "5120000000c4a5cad46221b2a187905e5266362b99d5e91c6ce24d165dab93e86433"),
+]
+
+
+class TestAddress(unittest.TestCase):
+
+    def test_base58_vectors(self):
+        """Test base58 encoding against reference vectors"""
+        vectors = [
+            (b"", ""),
+            (b"\x61", "2g"),
+            (b"\x62\x62\x62", "a3gV"),
+            (b"Hello World!", "2NEpo7TZRRrLZSi2U"),
+            (b"\x00\x00\x00\x28\x7f\xb4\xcd", "111233QC4"),
+            (bytes(10), "1" * 10),
+        ]
+        for data, text in vectors:
+            self.assertEqual(b58encode(data), text)
+            self.assertEqual(b58decode(text), data)
+        with self.assertRaises(ValueError):
+            b58decode("0OIl")
+
+    def test_long_base58_round_trip(self):
+        """Test the recursive split used for long inputs"""
+        rng = random.Random(5)
+        for size in (1, 31, 200, 191, 2000, 5000):
+            # A non-zero first payload byte keeps the reference below exact
+            data = b'\x00\x00\x01' + rng.randbytes(size)
+            text = b58encode(data)
+            digits = b58encode(data[2:])
+            # Reference: one digit at a time
+            n = int.from_bytes(data[2:], 'big')
+            expected = ''
+            while n:
+                n, digit = divmod(n, 58)
+                expected = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"[digit] + expected
+            self.assertEqual(digits, expected)
+            self.assertEqual(b58decode(text), data)
+
+    def test_base58check(self):
+        """Test Base58Check with the genesis block coinbase address"""
+        payload = b58check_decode("1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa")
+        self.assertEqual(payload.hex(), "0062e907b15cbf27d5425399ebf6f0fb50ebb88f18")
+        self.assertEqual(b58check_encode(payload), "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa")
+        with self.assertRaises(ValueError):
+            b58check_decode("1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNb")
+
+    def test_segwit_vectors(self):
+        """Test bech32 and bech32m addresses from BIP173 and BIP350"""
+        for address, script in SEGWIT_VECTORS:
+            self.assertEqual(address_to_script(address).hex(), script)
+            network = MAINNET if address.lower().startswith("bc") else TESTNET
+            self.assertEqual(script_to_address(bytes.fromhex(script), network), address.lower())
+
+    def test_invalid_segwit_addresses(self):
+        """Test rejection of bad checksums, variants and program lengths"""
+        invalid = [
+            "tc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vq5zuyut",  # unknown hrp
+            "bc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vqh2y7hd",  # bech32 for v1
+            "BC1S0XLXVLHEMJA6C4DQV22UAPCTQUPFHLXM9H8Z3K2E72Q4K9HCZ7VQ54WELL",  # bech32 for v16
+            "bc1zw508d6qejxtdg4y5r3zarvaryvaxxpcz",  # bad checksum
+            "BC1QR508D6QEJXTDG4Y5R3ZARVARYV98GJ9P",  # v0 program of 16 bytes
+            "bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3T4",  # mixed case
+        ]
+        for address in invalid:
+            with self.assertRaises(ValueError, msg=address):
+                address_to_script(address)
+        with self.assertRaises(ValueError):
+            decode_segwit_address("tb", SEGWIT_VECTORS[0][0])
+
+    def test_base58_scripts(self):
+        """Test P2PKH and P2SH scripts on mainnet and regtest"""
+        p2pkh = bytes.fromhex("76a91462e907b15cbf27d5425399ebf6f0fb50ebb88f1888ac")
+        p2sh = bytes.fromhex("a914" + "11" * 20 + "87")
+        self.assertEqual(script_to_address(p2pkh), "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa")
+        for network in (MAINNET, REGTEST):
+            addresses = scripts_to_addresses([p2pkh, p2sh], network)
+            self.assertEqual(addresses_to_scripts(addresses, network), [p2pkh, p2sh])
+        self.assertIsNone(script_to_address(bytes.fromhex("6a0401020304")))
+
+    def test_create_output_and_decoder(self):
+        """Test paying to an address and reading it back from a decoded output"""
+        address = "bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t4"
+        output = create_output(5000, address)
+        self.assertEqual(output.hex(), "8813000000000000160014751e76e8199196d454941c45d1b3a323f1433bd6")
+        tx = create_basic_tx(1, [create_input("11" * 32, 0)], [output], 0, segwit=False)
+        view, _ = decode_transaction(tx)
+        self.assertEqual(view.outputs[0].address(), address)
+        self.assertEqual(view.outputs[0].address(REGTEST)[:5], "bcrt1")
+
+if __name__ == '__main__':
+    unittest.main()
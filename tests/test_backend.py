@@ -0,0 +1,65 @@
+import unittest
+from p2pkh import backend
+from p2pkh.backend import available_backends, get_backend, load_backend, set_backend, startup_benchmark
+from p2pkh.signing import clear_key_cache, get_p2wpkh_witness, get_pub_from_priv, sign
+
+PRIVKEY = bytes.fromhex("619c335025c7f4012e556c2a58b2506e30b8511b53ade95ea316fd8c3286feb9")
+PUBKEY = bytes.fromhex("025476c2e83188368da1ff3e292e7acafcdb3566bb0ad253f62fc70f07aeee6357")
+DIGEST = bytes.fromhex("c37af31116d1b27caf68aae9e3ac82f1477929014d5b917657d0eb49478cb670")
+SIGNATURE = bytes.fromhex(
+    "304402203609e17b84f6a7d30c80bfa610b5b4542f32a8a0d5447a12fb1366d7f01cc44a"
+    "0220573a954c4518331561406f90300e8f3358f51928d43c212a8caed02de67eebee01"
+)
+
+
+class TestBackend(unittest.TestCase):
+
+    def tearDown(self):
+        backend._backend = None
+        clear_key_cache()
+
+    def test_backends_agree(self):
+        """Test every available backend against the BIP143 signature"""
+        names = available_backends()
+        self.assertIn('python', names)
+        for name in names:
+            selected = load_backend(name)
+            self.assertEqual(selected.pubkey(PRIVKEY), PUBKEY)
+            self.assertEqual(selected.sign(PRIVKEY, DIGEST) + b'\x01', SIGNATURE)
+            for i in range(1, 20):
+                key = i.to_bytes(32, 'big')
+                digest = bytes([i]) * 32
+                self.assertEqual(selected.sign(key, digest), load_backend('python').sign(key, digest))
+
+    def test_selection(self):
+        """Test lazy selection and switching the active backend"""
+        backend._backend = None
+        self.assertEqual(get_backend().name, available_backends()[0])
+        set_backend('python')
+        self.assertEqual(sign(PRIVKEY, DIGEST), SIGNATURE)
+        self.assertEqual(get_pub_from_priv(PRIVKEY), PUBKEY)
+        self.assertTrue(get_p2wpkh_witness(PRIVKEY, DIGEST).endswith(PUBKEY))
+        with self.assertRaises(ValueError):
+            set_backend('openssl')
+
+    def test_switch_with_cached_keys(self):
+        """Test switching backends drops key material prepared by the old one"""
+        names = available_backends()
+        witness = None
+        for name in names + names[:1]:
+            set_backend(name)
+            current = get_p2wpkh_witness(PRIVKEY, DIGEST)
+            self.assertTrue(current.endswith(PUBKEY))
+            if witness is not None:
+                self.assertEqual(current, witness)
+            witness = current
+
+    def test_startup_benchmark(self):
+        """Test that the startup benchmark reports timings from a child process"""
+        stats = startup_benchmark('python')
+        self.assertEqual(stats.backend, 'python')
+        self.assertGreater(stats.import_time, 0)
+        self.assertGreater(stats.first_sign, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import hashlib
+import unittest
+from p2pkh.batch import chunked, sign_batch
+from p2pkh.signing import sign
+
+
+def make_pairs(count):
+    """Deterministic (private_key, digest) pairs"""
+    return [
+        (hashlib.sha256(b'key%d' % i).digest(), hashlib.sha256(b'msg%d' % i).digest())
+        for i in range(count)
+    ]
+
+
+class TestBatchSigning(unittest.TestCase):
+
+    def test_matches_single_calls(self):
+        """Test batch output equals per-call signing, in order"""
+        pairs = make_pairs(10)
+        expected = [sign(key, digest) for key, digest in pairs]
+
+        serial = sign_batch(pairs, processes=1, chunk_size=3)
+        self.assertEqual(serial.results, expected)
+
+        parallel = sign_batch(pairs, processes=2, chunk_size=3)
+        self.assertEqual(parallel.results, expected)
+        self.assertEqual(parallel.stats.count, 10)
+        self.assertEqual(parallel.stats.processes, 2)
+        self.assertGreater(parallel.stats.per_second, 0)
+
+    def test_chunking_and_validation(self):
+        """Test chunk boundaries and input validation"""
+        self.assertEqual(chunked([1, 2, 3, 4, 5], 2), [[1, 2], [3, 4], [5]])
+        self.assertEqual(sign_batch([]).results, [])
+        with self.assertRaises(ValueError):
+            sign_batch([(b'\x01' * 31, b'\x00' * 32)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+from p2pkh.blockfile import MAINNET_MAGIC, REGTEST_MAGIC, BlockFile, count_transactions, scan_block_files
+from p2pkh.hashing import dsha256
+from p2pkh.serialize import assemble_transaction, create_input, create_output, varint
+
+
+def make_block(height, tx_count):
+    """Serialize a block with `tx_count` small transactions"""
+    header = (
+        (2).to_bytes(4, 'little') + bytes([height]) * 32 + b'\xab' * 32 +
+        (1600000000 + height).to_bytes(4, 'little') +
+        (0x1d00ffff).to_bytes(4, 'little') + (height * 7).to_bytes(4, 'little')
+    )
+    txs = [
+        assemble_transaction(
+            1, [create_input("%02x" % height * 32, i)],
+            [create_output(1000 + i, bytes.fromhex("160014") + bytes(20))],
+            [b'\x01\x03abc'], 0
+        )
+        for i in range(tx_count)
+    ]
+    return header + varint(tx_count) + b''.join(txs)
+
+
+def frame(block, magic=MAINNET_MAGIC):
+    return magic + len(block).to_bytes(4, 'little') + block
+
+
+def write_blocks(path, blocks, padding=64):
+    with open(path, 'wb') as f:
+        f.write(b''.join(frame(block) for block in blocks) + b'\x00' * padding)
+
+
+def block_hash(block):
+    """Module-level (picklable) scan function"""
+    return block.hash
+
+
+class TestBlockFile(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.blocks = [make_block(h, h % 4 + 1) for h in range(12)]
+        self.path = os.path.join(self.tmp.name, 'blk00000.dat')
+        write_blocks(self.path, self.blocks)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_iterate_blocks(self):
+        """Test walking framing, headers and transactions"""
+        with BlockFile(self.path) as block_file:
+            views = list(block_file)
+            self.assertEqual(len(views), 12)
+            block = views[3]
+            self.assertEqual(block.hash, dsha256(self.blocks[3][:80])[::-1].hex())
+            self.assertEqual((block.version, block.timestamp, block.nonce), (2, 1600000003, 21))
+            self.assertEqual(block.bits, 0x1d00ffff)
+            self.assertEqual(block.prev_block, "03" * 32)
+
+            txs = list(block.transactions())
+            self.assertEqual(len(txs), block.tx_count)
+            self.assertEqual(txs[-1].outputs[0].amount, 1000 + block.tx_count - 1)
+            self.assertEqual(len(block_file.block_offsets()), 12)
+            del views, block, txs
+
+        with self.assertRaises(ValueError):
+            with BlockFile(self.path, REGTEST_MAGIC) as block_file:
+                list(block_file)
+
+    def test_transactions_confined_to_block(self):
+        """Test transaction parsing stops at the block's declared size"""
+        block = self.blocks[2]
+        self.assertEqual(block[80], 3)
+        tx_size = (len(block) - 81) // 3
+        # One transaction short: the last one would be read from the next block
+        short = block[:-tx_size]
+        # One transaction extra is trailing data
+        long_block = block + block[81:81 + tx_size]
+        path = os.path.join(self.tmp.name, 'blk00001.dat')
+        write_blocks(path, [short, self.blocks[3], long_block])
+        with BlockFile(path) as block_file:
+            views = list(block_file)
+            with self.assertRaisesRegex(ValueError, "truncated"):
+                list(views[0].transactions())
+            self.assertEqual(len(list(views[1].transactions())), views[1].tx_count)
+            with self.assertRaisesRegex(ValueError, "trailing"):
+                list(views[2].transactions())
+            del views
+
+    def test_scan_serial_and_parallel(self):
+        """Test pool mode returns the same results in file order"""
+        serial = scan_block_files([self.path], block_hash)
+        parallel = scan_block_files([self.path, self.path], block_hash, processes=3)
+        self.assertEqual(parallel.results, serial.results * 2)
+        self.assertEqual(serial.stats.blocks, 12)
+
+        counts = scan_block_files([self.path], count_transactions)
+        self.assertEqual(sum(counts.results), counts.stats.transactions)
+        self.assertEqual(counts.stats.bytes, sum(len(block) for block in self.blocks))
+        self.assertGreater(counts.stats.mb_per_second, 0)
+        self.assertGreater(counts.stats.tx_per_second, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import math
+import random
+import time
+import unittest
+from p2pkh.coinselect import CoinSelector, input_weight, output_weight, select_coins
+from p2pkh.script import P2PKH, P2TR, P2WPKH
+from p2pkh.serialize import create_output
+from p2pkh.utxo import UtxoEntry
+from p2pkh.weight import transaction_weight
+
+P2WPKH_SCRIPT = bytes.fromhex("0014") + bytes(20)
+P2PKH_SCRIPT = bytes.fromhex("76a914") + bytes(20) + bytes.fromhex("88ac")
+P2TR_SCRIPT = bytes.fromhex("5120") + b'\x22' * 32
+P2SH_SCRIPT = bytes.fromhex("a914") + bytes(20) + bytes.fromhex("87")
+P2WSH_SCRIPT = bytes.fromhex("0020") + bytes(32)
+PAYMENT_SCRIPT = bytes.fromhex("160014") + b'\x11' * 20
+
+
+def wallet(amounts, script=P2WPKH_SCRIPT):
+    return [((i + 1).to_bytes(32, 'big') + bytes(4), UtxoEntry(amount, script))
+            for i, amount in enumerate(amounts)]
+
+
+def check_fee(test, selection, outputs, feerate):
+    """The selection's fee covers its size and the amounts balance"""
+    payment = sum(int.from_bytes(output[:8], 'little') for output in outputs)
+    test.assertEqual(selection.input_value, payment + selection.fee + selection.change)
+    test.assertGreaterEqual(selection.fee, math.ceil(feerate * selection.weight.vsize))
+
+
+class TestCoinSelect(unittest.TestCase):
+
+    def test_weights_match_serialized_sizes(self):
+        """Test template weights against TxWeight of real component sizes"""
+        tx_in = bytes(36) + b'\x00' + bytes(4)
+        witness = bytes([2, 72]) + bytes(72) + bytes([33]) + bytes(33)
+        one = transaction_weight([tx_in], [create_output(1, PAYMENT_SCRIPT)], [witness])
+        two = transaction_weight([tx_in] * 2, [create_output(1, PAYMENT_SCRIPT)], [witness] * 2)
+        self.assertEqual(two.weight - one.weight, input_weight(P2WPKH))
+        self.assertEqual(output_weight(P2WPKH), 4 * len(create_output(1, PAYMENT_SCRIPT)))
+        self.assertEqual(input_weight(P2PKH), 4 * 148 + 1)
+        self.assertEqual(input_weight(P2TR) / 4, 57.5)
+        with self.assertRaises(ValueError):
+            input_weight('p2sh')
+
+    def test_branch_and_bound_exact(self):
+        """Test a changeless match is found among many candidates"""
+        feerate = 2
+        input_fee = math.ceil(feerate * input_weight(P2WPKH) / 4)
+        selector = CoinSelector(wallet([100000 * (i + 1) + input_fee for i in range(20)]), feerate)
+        # The fixed part costs less than 100 sat, so 700000 of effective value
+        # lands within the cost of change above the target
+        outputs = [create_output(700000 - 100, PAYMENT_SCRIPT)]
+        selection = selector.select(outputs)
+        self.assertEqual(selection.algorithm, 'bnb')
+        self.assertEqual(selection.change, 0)
+        self.assertEqual(selection.input_value - input_fee * len(selection.inputs), 700000)
+        self.assertLess(selection.fee - math.ceil(feerate * selection.weight.vsize), selector.cost_of_change)
+        check_fee(self, selection, outputs, feerate)
+
+    def test_knapsack_with_change(self):
+        """Test the fallback adds change when no changeless set exists"""
+        outputs = [create_output(250000, PAYMENT_SCRIPT)]
+        selection = select_coins(wallet([1000000, 2000000, 5000000]), outputs, 5, seed=1)
+        self.assertEqual(selection.algorithm, 'knapsack')
+        self.assertEqual(len(selection.inputs), 1)
+        self.assertEqual(selection.inputs[0][1].amount, 1000000)
+        self.assertGreater(selection.change, 0)
+        self.assertEqual(selection.weight.output_count, 2)
+        check_fee(self, selection, outputs, 5)
+
+        # Mixed templates: every candidate's size is charged
+        utxos = wallet([30000] * 10) + wallet([40000] * 10, P2PKH_SCRIPT)
+        selection = select_coins(utxos, outputs, 3, seed=2)
+        check_fee(self, selection, outputs, 3)
+
+    def test_insufficient_funds_and_dust(self):
+        """Test unspendable candidates are dropped and shortfalls raise"""
+        selector = CoinSelector(wallet([100, 50000]), 10)
+        self.assertEqual(len(selector), 1)
+        with self.assertRaises(ValueError):
+            selector.select([create_output(60000, PAYMENT_SCRIPT)])
+        selector = CoinSelector([(bytes(36), UtxoEntry(1000, b'\x6a'))], 1)
+        self.assertEqual((len(selector), selector.skipped), (0, 1))
+        with self.assertRaises(ValueError):
+            selector.select([create_output(500, PAYMENT_SCRIPT)])
+
+    def test_mixed_wallet(self):
+        """Test P2TR coins are spent and unknown templates are skipped"""
+        utxos = (wallet([20000] * 3) + wallet([30000] * 3, P2PKH_SCRIPT) +
+                 wallet([50000] * 3, P2TR_SCRIPT) + wallet([10 ** 8], P2SH_SCRIPT) +
+                 wallet([10 ** 8], P2WSH_SCRIPT) + wallet([10 ** 8], b'\x6a'))
+        selector = CoinSelector(utxos, 2)
+        self.assertEqual((len(selector), selector.skipped), (9, 3))
+        self.assertIn(50000 - math.ceil(2 * 57.5), selector.values)
+        # More than the P2PKH and P2WPKH coins hold
+        outputs = [create_output(200000, PAYMENT_SCRIPT)]
+        selection = selector.select(outputs, seed=4)
+        check_fee(self, selection, outputs, 2)
+        self.assertIn(P2TR_SCRIPT, [entry.script for _, entry in selection.inputs])
+        self.assertTrue(all(entry.amount < 10 ** 8 for _, entry in selection.inputs))
+        with self.assertRaises(ValueError):
+            selector.select([create_output(10 ** 8, PAYMENT_SCRIPT)])
+
+    def test_large_wallet(self):
+        """Test selection over many candidates within the time budget"""
+        rng = random.Random(7)
+        utxos = wallet([rng.randrange(1000, 5000000) for _ in range(20000)])
+        selector = CoinSelector(utxos, 4)
+        self.assertEqual(list(selector.values), sorted(selector.values, reverse=True))
+        outputs = [create_output(123456789, PAYMENT_SCRIPT), create_output(5000, PAYMENT_SCRIPT)]
+        start = time.perf_counter()
+        selection = selector.select(outputs, time_budget=0.3, seed=3)
+        self.assertLess(time.perf_counter() - start, 0.3 + 0.05)
+        check_fee(self, selection, outputs, 4)
+        self.assertEqual(len({outpoint for outpoint, _ in selection.inputs}), len(selection.inputs))
+
+        # A knapsack pass over thousands of candidates stops at the deadline
+        # too, rather than between passes
+        start = time.perf_counter()
+        value, chosen = selector._best_subset(0, len(selector), 2 * 10 ** 10, random.Random(1), start + 0.01)
+        self.assertLess(time.perf_counter() - start, 0.01 + 0.05)
+        self.assertGreaterEqual(value, 2 * 10 ** 10)
+        self.assertEqual(value, sum(selector.values[i] for i in chosen))
+
+
+if __name__ == '__main__':
+    unittest.main()
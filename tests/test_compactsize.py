@@ -0,0 +1,46 @@
+import unittest
+from p2pkh.compactsize import (
+    decode_varints, encode_varints, encode_varints_into, read_varint, varint, varint_size
+)
+
+VALUES = [0, 1, 0xfc, 0xfd, 0xffff, 0x10000, 0xffffffff, 0x100000000, 0xffffffffffffffff]
+
+
+class TestCompactSize(unittest.TestCase):
+
+    def test_varint_widths(self):
+        """Test every encoding width against its expected bytes"""
+        self.assertEqual(varint(0xfc), bytes.fromhex("fc"))
+        self.assertEqual(varint(0xfd), bytes.fromhex("fdfd00"))
+        self.assertEqual(varint(0x10000), bytes.fromhex("fe00000100"))
+        self.assertEqual(varint(0x100000000), bytes.fromhex("ff0000000001000000"))
+        for value in VALUES:
+            self.assertEqual(len(varint(value)), varint_size(value))
+            self.assertEqual(read_varint(varint(value)), (value, varint_size(value)))
+        with self.assertRaises(ValueError):
+            varint(-1)
+        with self.assertRaises(ValueError):
+            varint(1 << 64)
+        with self.assertRaises(ValueError):
+            read_varint(b'\xfe\x00\x00')
+
+    def test_bulk_round_trip(self):
+        """Test bulk encoding and decoding with offsets"""
+        encoded = encode_varints(VALUES)
+        self.assertEqual(encoded, b''.join(varint(value) for value in VALUES))
+
+        values, offsets, end = decode_varints(b'\x00' + encoded, len(VALUES), 1)
+        self.assertEqual(values, VALUES)
+        self.assertEqual(offsets[:4], [1, 2, 3, 4])
+        self.assertEqual(end, 1 + len(encoded))
+
+        buffer = bytearray(len(encoded) + 2)
+        self.assertEqual(encode_varints_into(VALUES, buffer, 2), len(buffer))
+        self.assertEqual(bytes(buffer[2:]), encoded)
+        with self.assertRaises(ValueError):
+            encode_varints_into([5, 0xfd], bytearray(2))
+        with self.assertRaises(ValueError):
+            decode_varints(encoded, len(VALUES) + 1)
+
+if __name__ == '__main__':
+    unittest.main()
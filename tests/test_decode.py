@@ -0,0 +1,115 @@
+import unittest
+from p2pkh.decode import decode_transaction, iter_transactions
+from p2pkh.hashing import dsha256
+from p2pkh.serialize import (
+    assemble_transaction, create_basic_tx, create_input, create_output, read_varint, varint
+)
+from p2pkh.weight import transaction_weight
+
+INPUT1 = bytes.fromhex(
+    "fff7f7881a8099afa6940d42d1e7f6362bec38171ea3edf433541db4e4ad969f00000000"
+    "494830450221008b9d1dc26ba6a9cb62127b02742fa9d754cd3bebf337f7a55d114c8e5cdd30be"
+    "022040529b194ba3f9281a99f2b1c0a19c0489bc22ede944ccf4ecbab4cc618ef3ed01eeffffff"
+)
+INPUT2 = bytes.fromhex(
+    "ef51e1b804cc89d182d279655c3aa89e815b1b309fe287d9b2b55d57b90ec68a01000000"
+    "00ffffffff"
+)
+OUTPUT1 = bytes.fromhex("202cb206000000001976a9148280b37df378db99f66f85c95a783a76ac7a6d5988ac")
+OUTPUT2 = bytes.fromhex("9093510d000000001976a9143bde42dbee7e4dbe6a21b2d50ce2f0167faa815988ac")
+WITNESS1 = b'\x00'
+WITNESS2 = bytes.fromhex(
+    "0247304402203609e17b84f6a7d30c80bfa610b5b4542f32a8a0d5447a12fb1366d7f01cc44a"
+    "0220573a954c4518331561406f90300e8f3358f51928d43c212a8caed02de67eebee01"
+    "21025476c2e83188368da1ff3e292e7acafcdb3566bb0ad253f62fc70f07aeee6357"
+)
+
+
+class TestDecodeTransaction(unittest.TestCase):
+
+    def test_round_trip(self):
+        """Test decoding the BIP143 transaction and re-assembling it"""
+        raw = assemble_transaction(1, [INPUT1, INPUT2], [OUTPUT1, OUTPUT2],
+                                   [WITNESS1, WITNESS2], 0x11)
+        tx, end = decode_transaction(raw)
+
+        self.assertEqual(end, len(raw))
+        self.assertTrue(tx.segwit)
+        self.assertEqual((tx.version, tx.locktime, tx.size), (1, 0x11, len(raw)))
+        self.assertEqual(tx.inputs[0].txid,
+                         "9f96ade4b41d5433f4eda31e1738ec2b36f6e7d1420d94a6af99801a88f7f7ff")
+        self.assertEqual(tx.inputs[1].vout, 1)
+        self.assertEqual(bytes(tx.inputs[0].sequence), b'\xee\xff\xff\xff')
+        self.assertEqual(tx.outputs[1].amount, 223450000)
+        self.assertEqual(bytes(tx.outputs[0].script), OUTPUT1[9:])
+        self.assertEqual(tx.witness(0), [])
+        self.assertEqual([len(item) for item in tx.witness(1)], [71, 33])
+
+        # Fields are views into the original buffer, not copies
+        self.assertIsInstance(tx.inputs[0].script_sig, memoryview)
+        self.assertIs(tx.inputs[0].script_sig.obj, raw)
+
+        rebuilt = assemble_transaction(
+            tx.version,
+            [bytes(i.raw) for i in tx.inputs],
+            [bytes(o.raw) for o in tx.outputs],
+            [bytes(w) for w in tx.witnesses],
+            tx.locktime,
+        )
+        self.assertEqual(rebuilt, raw)
+
+        stripped = create_basic_tx(1, [INPUT1, INPUT2], [OUTPUT1, OUTPUT2], 0x11, segwit=False)
+        self.assertEqual(tx.txid, dsha256(stripped)[::-1].hex())
+        self.assertEqual(tx.wtxid, dsha256(raw)[::-1].hex())
+
+        legacy, _ = decode_transaction(stripped)
+        self.assertFalse(legacy.segwit)
+        self.assertEqual(legacy.txid, tx.txid)
+
+        weight = transaction_weight([INPUT1, INPUT2], [OUTPUT1, OUTPUT2], [WITNESS1, WITNESS2])
+        self.assertEqual((tx.base_size, tx.weight, tx.vsize), (weight.base_size, weight.weight, weight.vsize))
+        self.assertEqual((legacy.base_size, legacy.weight), (len(stripped), 4 * len(stripped)))
+
+    def test_varint_widths(self):
+        """Test every varint width decodes, including inside a transaction"""
+        for value in (0, 0xfc, 0xfd, 0xffff, 0x10000, 0xffffffff, 0x100000000):
+            encoded = b'\xaa' + varint(value)
+            self.assertEqual(read_varint(encoded, 1), (value, len(encoded)))
+        with self.assertRaises(ValueError):
+            read_varint(b'\xfd\x01')
+
+        big_script = b'\x51' * 300
+        huge_script = b'\x6a' * 70000
+        tx_in = create_input("11" * 32, 7, big_script)
+        tx_out = create_output(5, varint(len(huge_script)) + huge_script)
+        raw = assemble_transaction(2, [tx_in], [tx_out], [b'\x01\x02\xab\xcd'], 0)
+        tx, _ = decode_transaction(raw)
+        self.assertEqual(bytes(tx.inputs[0].script_sig), big_script)
+        self.assertEqual(len(tx.outputs[0].script), 70000)
+        self.assertEqual([bytes(item) for item in tx.witness(0)], [b'\xab\xcd'])
+
+    def test_stream_and_truncation(self):
+        """Test back-to-back decoding and truncated input"""
+        raw = assemble_transaction(1, [INPUT2], [OUTPUT1], [WITNESS1], 0)
+        txs = list(iter_transactions(raw * 3))
+        self.assertEqual(len(txs), 3)
+        self.assertEqual(txs[2].txid, txs[0].txid)
+        with self.assertRaises(ValueError):
+            decode_transaction(raw[:-1])
+
+    def test_truncated_witness(self):
+        """Test witness items longer than the data raise instead of coming back short"""
+        raw = bytearray(assemble_transaction(1, [INPUT2], [OUTPUT1], [WITNESS2], 0))
+        position = raw.index(WITNESS2)
+        # Claim the signature item runs past the end of the transaction
+        overlong = bytes(raw[:position + 1]) + b'\xfd\xff\x00' + bytes(raw[position + 2:])
+        with self.assertRaisesRegex(ValueError, "witness item"):
+            decode_transaction(overlong)
+
+        tx, _ = decode_transaction(raw)
+        raw[position + 1] += 40  # the signature now overlaps the key and locktime
+        with self.assertRaisesRegex(ValueError, "witness item"):
+            tx.witness(0)
+
+if __name__ == '__main__':
+    unittest.main()
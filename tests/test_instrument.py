@@ -0,0 +1,117 @@
+import io
+import json
+import threading
+import unittest
+import p2pkh
+from p2pkh import hashing, instrument, serialize, sighash, signing
+from p2pkh.instrument import Instrumentation, profile
+from p2pkh.serialize import create_input, create_output
+from p2pkh.sighash import SighashContext
+
+PRIVATE_KEY = bytes.fromhex("619c335025c7f4012e556c2a58b2506e30b8511b53ade95ea316fd8c3286feb9")
+SCRIPT_CODE = bytes.fromhex("1976a9141d0f172a0ecb48aee1be1f2687d2963ae33f71a188ac")
+WITNESS = bytes.fromhex("02" + "03aabbcc" + "02ddee")
+
+
+class TestInstrument(unittest.TestCase):
+
+    def test_disabled_leaves_functions_untouched(self):
+        """Test enable replaces every reference and disable restores the originals"""
+        original_dsha256 = hashing.dsha256
+        original_digest = SighashContext.__dict__['digest']
+        with profile():
+            self.assertIsNot(hashing.dsha256, original_dsha256)
+            self.assertIs(sighash.dsha256, hashing.dsha256)
+            self.assertIs(p2pkh.dsha256, hashing.dsha256)
+            self.assertIs(p2pkh.sign, signing.sign)
+        self.assertIs(hashing.dsha256, original_dsha256)
+        self.assertIs(sighash.dsha256, original_dsha256)
+        self.assertIs(p2pkh.dsha256, original_dsha256)
+        self.assertIs(SighashContext.__dict__['digest'], original_digest)
+
+    def test_records_calls_and_bytes(self):
+        """Test counts, bytes and latencies of a small signing job"""
+        inputs = [create_input("%064x" % (i + 1), 0) for i in range(3)]
+        outputs = [create_output(1000, SCRIPT_CODE)]
+        with profile() as stats:
+            context = SighashContext(1, inputs, outputs, 0)
+            digests = [context.digest(i, SCRIPT_CODE, 5000) for i in range(3)]
+            signatures = [signing.sign(PRIVATE_KEY, digest) for digest in digests]
+            signing.get_pub_from_priv(PRIVATE_KEY)
+            # Through the module: names imported before enable() keep the original
+            tx = serialize.assemble_transaction(1, inputs, outputs, [WITNESS] * 3, 0)
+            hashing.dsha256(tx)
+
+        # Calls after the block are not recorded
+        signing.sign(PRIVATE_KEY, digests[0])
+
+        functions = stats.snapshot()['functions']
+        self.assertEqual(functions['get_transaction_digest']['calls'], 3)
+        self.assertEqual(functions['get_transaction_digest']['bytes'], 3 * (156 + len(SCRIPT_CODE)))
+        self.assertEqual(functions['sign']['calls'], 3)
+        self.assertEqual(functions['sign']['bytes'], 3 * 32)
+        self.assertEqual(functions['get_pub_from_priv']['calls'], 1)
+        self.assertEqual(functions['assemble_transaction']['bytes'], len(tx))
+        # hashPrevouts, hashSequence and hashOutputs, then the transaction
+        self.assertEqual(functions['dsha256']['calls'], 4)
+        self.assertEqual(functions['dsha256']['bytes'], 3 * 36 + 3 * 4 + len(outputs[0]) + len(tx))
+        for counters in functions.values():
+            self.assertGreater(counters['total_seconds'], 0)
+            self.assertLessEqual(counters['p50_seconds'], counters['p99_seconds'])
+            self.assertLessEqual(counters['p99_seconds'], counters['max_seconds'])
+        self.assertEqual(len(signatures), 3)
+
+    def test_reservoir_and_json(self):
+        """Test the sample reservoir stays bounded and snapshots serialize to JSON"""
+        session = Instrumentation(targets=['dsha256'], max_samples=16, allocations=False)
+        with session:
+            for i in range(100):
+                hashing.dsha256(bytes(i))
+        counters = session.stats['dsha256']
+        self.assertEqual(counters.calls, 100)
+        self.assertEqual(counters.bytes, sum(range(100)))
+        self.assertEqual(len(counters.samples), 16)
+        self.assertEqual(counters.allocated_blocks, 0)
+
+        buffer = io.StringIO()
+        session.dump(buffer)
+        loaded = json.loads(buffer.getvalue())
+        self.assertFalse(loaded['enabled'])
+        self.assertEqual(list(loaded['functions']), ['dsha256'])
+        self.assertEqual(loaded['functions']['dsha256']['calls'], 100)
+
+    def test_witness_signing_and_threads(self):
+        """Test cached-key witness signatures count as signs, from several threads"""
+        digest = bytes(range(32))
+        signing.clear_key_cache()
+        with profile(['sign', 'dsha256']) as session:
+            signing.get_p2wpkh_witness(PRIVATE_KEY, digest)
+            signing.get_p2wpkh_witness(PRIVATE_KEY, digest)
+            signing.sign(PRIVATE_KEY, digest)
+
+            def work():
+                for i in range(500):
+                    hashing.dsha256(bytes(i % 7))
+
+            threads = [threading.Thread(target=work) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertFalse(hasattr(signing._sign_with_key, '__wrapped__'))
+        self.assertEqual(session.stats['sign'].calls, 3)
+        self.assertEqual(session.stats['sign'].bytes, 3 * 32)
+        self.assertEqual(session.stats['dsha256'].calls, 2000)
+        self.assertEqual(len(session.stats['dsha256'].samples), 2000)
+
+    def test_single_active_instance(self):
+        """Test a second instance cannot be enabled and bad targets are rejected"""
+        with profile():
+            with self.assertRaises(ValueError):
+                instrument.instrumentation.enable()
+        with self.assertRaises(ValueError):
+            Instrumentation(targets=['nope'])
+
+
+if __name__ == '__main__':
+    unittest.main()
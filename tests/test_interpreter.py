@@ -0,0 +1,153 @@
+import unittest
+from p2pkh.compactsize import varint
+from p2pkh.hashing import hash160
+from p2pkh.interpreter import (
+    ScriptError, TransactionValidator, cast_to_bool, eval_script, validate_transaction
+)
+from p2pkh.serialize import assemble_transaction, create_input, create_output
+from p2pkh.sigcache import SignatureCache
+from p2pkh.sighash import LegacySighashContext, SighashContext
+from p2pkh.signing import get_p2wpkh_witness, get_pub_from_priv, sign
+
+# BIP143 native P2WPKH example: a P2PK input and a P2WPKH input
+SIGNED_TX = bytes.fromhex(
+    "01000000000102fff7f7881a8099afa6940d42d1e7f6362bec38171ea3edf433541db4e4ad969f"
+    "00000000494830450221008b9d1dc26ba6a9cb62127b02742fa9d754cd3bebf337f7a55d114c8e"
+    "5cdd30be022040529b194ba3f9281a99f2b1c0a19c0489bc22ede944ccf4ecbab4cc618ef3ed01"
+    "eeffffffef51e1b804cc89d182d279655c3aa89e815b1b309fe287d9b2b55d57b90ec68a010000"
+    "0000ffffffff02202cb206000000001976a9148280b37df378db99f66f85c95a783a76ac7a6d59"
+    "88ac9093510d000000001976a9143bde42dbee7e4dbe6a21b2d50ce2f0167faa815988ac000247"
+    "304402203609e17b84f6a7d30c80bfa610b5b4542f32a8a0d5447a12fb1366d7f01cc44a022057"
+    "3a954c4518331561406f90300e8f3358f51928d43c212a8caed02de67eebee0121025476c2e831"
+    "88368da1ff3e292e7acafcdb3566bb0ad253f62fc70f07aeee635711000000"
+)
+P2PK_OUTPUT = create_output(625000000, bytes.fromhex(
+    "232103c9f4836b9a4f77fc0d81f7bcb01b7f1b35916864b9476c241ce9fc198bd25432ac"))
+P2WPKH_OUTPUT = create_output(600000000, bytes.fromhex("1600141d0f172a0ecb48aee1be1f2687d2963ae33f71a1"))
+
+
+def build_spend(private_keys, segwit, amount=10000):
+    """Build a signed transaction spending one P2PKH or P2WPKH output per key"""
+    pubkeys = [get_pub_from_priv(key) for key in private_keys]
+    p2pkh = [bytes.fromhex("1976a914") + hash160(pubkey) + bytes.fromhex("88ac") for pubkey in pubkeys]
+    spent = [
+        create_output(amount, bytes.fromhex("160014") + hash160(pubkey) if witness else script)
+        for pubkey, script, witness in zip(pubkeys, p2pkh, segwit)
+    ]
+    inputs = [create_input("%064x" % (i + 1), 0) for i in range(len(private_keys))]
+    outputs = [create_output(amount, p2pkh[0])]
+    legacy = LegacySighashContext(1, inputs, outputs, 0)
+    bip143 = SighashContext(1, inputs, outputs, 0)
+    signed, witnesses = [], []
+    for index, (key, pubkey, script) in enumerate(zip(private_keys, pubkeys, p2pkh)):
+        if segwit[index]:
+            signed.append(inputs[index])
+            witnesses.append(get_p2wpkh_witness(key, bip143.digest(index, script, amount)))
+            continue
+        sig = sign(key, legacy.digest(index, script))
+        script_sig = varint(len(sig)) + sig + varint(len(pubkey)) + pubkey
+        signed.append(create_input("%064x" % (index + 1), 0, script_sig))
+        witnesses.append(b'\x00')
+    tx = assemble_transaction(1, signed, outputs, witnesses, 0)
+    return tx, spent
+
+
+class TestInterpreter(unittest.TestCase):
+
+    def test_eval_p2pkh_script(self):
+        """Test the P2PKH template with a checker that accepts one signature"""
+        pubkey = bytes.fromhex("025476c2e83188368da1ff3e292e7acafcdb3566bb0ad253f62fc70f07aeee6357")
+        script = bytes.fromhex("76a914") + hash160(pubkey) + bytes.fromhex("88ac")
+        calls = []
+
+        def checker(sig, key, _, final):
+            calls.append(final)
+            return sig == b'sig'
+
+        self.assertEqual(eval_script([b'sig', pubkey], script, checker), [b'\x01'])
+        self.assertEqual(calls, [True])
+        self.assertEqual(eval_script([b'bad', pubkey], script, checker), [b''])
+        with self.assertRaises(ScriptError):
+            eval_script([b'sig', b'\x02' * 33], script, checker)
+        with self.assertRaises(ScriptError):
+            eval_script([], script, checker)
+
+    def test_cast_to_bool(self):
+        """Test stack element truthiness including negative zero"""
+        self.assertFalse(cast_to_bool(b''))
+        self.assertFalse(cast_to_bool(b'\x00\x00'))
+        self.assertFalse(cast_to_bool(b'\x00\x80'))
+        self.assertTrue(cast_to_bool(b'\x80\x00'))
+        self.assertTrue(cast_to_bool(b'\x01'))
+
+    def test_bip143_transaction(self):
+        """Test the signed BIP143 example with its P2PK and P2WPKH inputs"""
+        validator = TransactionValidator(SIGNED_TX, [P2PK_OUTPUT, P2WPKH_OUTPUT], cache=SignatureCache())
+        deferred = []
+        validator.check_scripts(0, deferred)
+        self.assertEqual(deferred[0].digest.hex(), "63cec688ee06a91e913875356dd4dea2f8e0f2a2659885372da2a37e32c7532e")
+        validator.check_scripts(1, deferred)
+        self.assertEqual(deferred[1].digest.hex(), "c37af31116d1b27caf68aae9e3ac82f1477929014d5b917657d0eb49478cb670")
+        result = validator.validate()
+        self.assertTrue(result.valid, result.error)
+
+    def test_wrong_amount_fails(self):
+        """Test that a P2WPKH input fails when the spent amount differs"""
+        spent = [P2PK_OUTPUT, create_output(600000001, P2WPKH_OUTPUT[8:])]
+        result = validate_transaction(SIGNED_TX, spent, cache=SignatureCache())
+        self.assertEqual((result.valid, result.failed_input), (False, 1))
+
+    def test_mixed_inputs(self):
+        """Test a transaction mixing P2PKH and P2WPKH inputs"""
+        keys = [(i + 1).to_bytes(32, 'big') for i in range(4)]
+        tx, spent = build_spend(keys, [False, True, False, True])
+        self.assertTrue(validate_transaction(tx, spent, cache=SignatureCache()).valid)
+
+        # BIP143 digests commit to the spent amount
+        spent[1] = create_output(10001, spent[1][8:])
+        result = validate_transaction(tx, spent, cache=SignatureCache())
+        self.assertEqual((result.valid, result.failed_input), (False, 1))
+
+    def test_p2pkh_inputs_in_parallel(self):
+        """Test legacy P2PKH spends through the process pool with early failure"""
+        keys = [(i + 1).to_bytes(32, 'big') for i in range(10)]
+        tx, spent = build_spend(keys, [False] * len(keys))
+        cache = SignatureCache()
+        self.assertTrue(validate_transaction(tx, spent, processes=2, cache=cache).valid)
+        self.assertEqual(len(cache), 10)
+
+        # Spending with the wrong key fails the hash check without any signature work
+        spent[3] = spent[4]
+        result = TransactionValidator(tx, spent, cache=SignatureCache()).validate()
+        self.assertEqual((result.valid, result.failed_input), (False, 3))
+
+    def test_unsupported_templates_rejected(self):
+        """Test P2SH and witness program spends fail instead of running as bare scripts"""
+        false_script = b'\x00'
+        probes = [
+            # P2SH whose redeem script is OP_FALSE: the hash check alone passes
+            (bytes.fromhex("a914") + hash160(false_script) + bytes.fromhex("87"), b'\x01' + false_script),
+            (bytes.fromhex("0020") + bytes(32), b''),
+            (bytes.fromhex("5120") + bytes(32), b''),
+            (bytes.fromhex("6002") + bytes(2), b''),
+        ]
+        for script_pubkey, script_sig in probes:
+            tx = assemble_transaction(1, [create_input("%064x" % 1, 0, script_sig)],
+                                      [create_output(1000, P2WPKH_OUTPUT[8:])], [b'\x00'], 0)
+            spent = [create_output(2000, varint(len(script_pubkey)) + script_pubkey)]
+            result = validate_transaction(tx, spent, cache=SignatureCache())
+            self.assertEqual((result.valid, result.failed_input), (False, 0), script_pubkey.hex())
+            self.assertIn("not supported", result.error)
+
+    def test_bad_signature_fails(self):
+        """Test that a corrupted signature is reported for its input"""
+        keys = [(i + 1).to_bytes(32, 'big') for i in range(9)]
+        tx, spent = build_spend(keys, [False] * len(keys))
+        # Flip a byte inside the last signature's s value
+        position = tx.rfind(bytes.fromhex("0121")) - 2
+        tampered = tx[:position] + bytes([tx[position] ^ 1]) + tx[position + 1:]
+        result = validate_transaction(tampered, spent, processes=2, cache=SignatureCache())
+        self.assertEqual((result.valid, result.failed_input), (False, 8))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from p2pkh.hashing import hash160
+from p2pkh.keycache import ENTRY_COST, KeyCache
+from p2pkh.signing import derive_key_material, get_p2wpkh_witness
+
+PRIVKEY = bytes.fromhex('619c335025c7f4012e556c2a58b2506e30b8511b53ade95ea316fd8c3286feb9')
+COMMITMENT = bytes.fromhex('c37af31116d1b27caf68aae9e3ac82f1477929014d5b917657d0eb49478cb670')
+
+
+class TestKeyCache(unittest.TestCase):
+
+    def test_p2wpkh_witness(self):
+        """Test cached witness creation against BIP143 test vector"""
+        cache = KeyCache(derive_key_material)
+        expected_witness = (
+            b'\x02' + b'\x47' +
+            bytes.fromhex(
+                '304402203609e17b84f6a7d30c80bfa610b5b4542f32a8a0d5447a12fb1366d7f01cc44a' +
+                '0220573a954c4518331561406f90300e8f3358f51928d43c212a8caed02de67eebee01'
+            ) +
+            b'\x21' +
+            bytes.fromhex('025476c2e83188368da1ff3e292e7acafcdb3566bb0ad253f62fc70f07aeee6357')
+        )
+        self.assertEqual(get_p2wpkh_witness(PRIVKEY, COMMITMENT, cache), expected_witness)
+        self.assertEqual(get_p2wpkh_witness(PRIVKEY, COMMITMENT, cache), expected_witness)
+
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.size), (1, 1, 1))
+        self.assertEqual(stats.hit_rate, 0.5)
+
+        material = cache.get(PRIVKEY)
+        self.assertEqual(material.pubkey_hash, hash160(material.pubkey))
+
+    def test_lru_eviction_and_clear(self):
+        """Test the memory budget evicts least recently used keys"""
+        cache = KeyCache(lambda key: key[::-1], max_bytes=2 * ENTRY_COST)
+        cache.get(b'a')
+        cache.get(b'b')
+        cache.get(b'a')          # b is now least recently used
+        cache.get(b'c')
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats().evictions, 1)
+
+        cache.get(b'a')
+        self.assertEqual(cache.stats().hits, 2)
+        cache.get(b'b')
+        self.assertEqual(cache.stats().misses, 4)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats().hits, 0)
+
+        with self.assertRaises(ValueError):
+            KeyCache(lambda key: key, max_bytes=1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+from p2pkh.decode import decode_transaction
+from p2pkh.mempool import ENTRY_OVERHEAD, INPUT_OVERHEAD, Mempool
+from p2pkh.serialize import assemble_transaction, create_input, create_output
+
+SCRIPT = bytes.fromhex("160014") + bytes(20)
+WITNESS = b'\x01\x03abc'
+
+
+def make_tx(spends, outputs=1):
+    """Serialize a transaction spending (txid, vout) pairs; returns (raw, txid)"""
+    raw = assemble_transaction(
+        2, [create_input(txid, vout) for txid, vout in spends],
+        [create_output(1000 + i, SCRIPT) for i in range(outputs)],
+        [WITNESS] * len(spends), 0
+    )
+    return raw, decode_transaction(raw)[0].txid
+
+
+def funding(i):
+    return "%064x" % (i + 1)
+
+
+class TestMempool(unittest.TestCase):
+
+    def test_add_and_indexes(self):
+        """Test txid lookup, outpoint index and conflict detection"""
+        pool = Mempool()
+        raw, txid = make_tx([(funding(0), 0), (funding(1), 3)])
+        self.assertTrue(pool.add(raw, 500))
+        self.assertTrue(pool.add(raw, 500))
+        self.assertIn(txid, pool)
+        self.assertEqual(len(pool), 1)
+        self.assertEqual(pool.get(txid), raw)
+        self.assertEqual(pool.spender((funding(1), 3)), txid)
+        self.assertEqual(pool.spender(create_input(funding(0), 0)[:36]), txid)
+        self.assertIsNone(pool.spender((funding(1), 0)))
+
+        double_spend, _ = make_tx([(funding(1), 3)], outputs=2)
+        self.assertEqual(pool.conflicts(double_spend), {txid})
+        with self.assertRaises(ValueError):
+            pool.add(double_spend, 10000)
+
+        entry = pool.entry(txid)
+        self.assertEqual(entry.vsize, decode_transaction(raw)[0].vsize)
+        self.assertEqual(pool.usage, len(raw) + ENTRY_OVERHEAD + 2 * INPUT_OVERHEAD)
+
+    def test_evicts_lowest_feerate_with_descendants(self):
+        """Test the budget evicts the cheapest transaction and its children"""
+        parent, parent_txid = make_tx([(funding(0), 0)], outputs=2)
+        child, child_txid = make_tx([(parent_txid, 1)])
+        rich, rich_txid = make_tx([(funding(1), 0)])
+        cost = len(parent) + ENTRY_OVERHEAD + INPUT_OVERHEAD
+
+        pool = Mempool(max_bytes=4 * cost)
+        pool.add(parent, 100)
+        pool.add(child, 5000)
+        pool.add(rich, 1000)
+        self.assertEqual(len(pool), 3)
+
+        others = [make_tx([(funding(10 + i), 0)]) for i in range(3)]
+        for raw, _ in others:
+            pool.add(raw, 400)
+        # The parent had the lowest feerate; its child goes with it
+        self.assertNotIn(parent_txid, pool)
+        self.assertNotIn(child_txid, pool)
+        self.assertIsNone(pool.spender((parent_txid, 1)))
+        self.assertIn(rich_txid, pool)
+        self.assertLessEqual(pool.usage, pool.max_bytes)
+
+        # A transaction paying less than everything else is refused
+        cheap, cheap_txid = make_tx([(funding(20), 0)])
+        self.assertFalse(pool.add(cheap, 1))
+        self.assertNotIn(cheap_txid, pool)
+
+        stats = pool.stats()
+        self.assertEqual(stats.added, 7)
+        self.assertEqual(stats.evicted, 3)
+        self.assertEqual(stats.count, 4)
+        self.assertAlmostEqual(stats.eviction_rate, 3 / 7)
+        self.assertEqual(stats.usage, pool.usage)
+
+    def test_remove(self):
+        """Test removing mined and replaced transactions"""
+        pool = Mempool()
+        parent, parent_txid = make_tx([(funding(0), 0)])
+        child, child_txid = make_tx([(parent_txid, 0)])
+        other, other_txid = make_tx([(funding(1), 0)])
+        for raw in (parent, child, other):
+            pool.add(raw, 1000)
+
+        self.assertEqual(pool.remove_block([other_txid, funding(9)]), 1)
+        self.assertEqual(pool.remove(parent_txid, descendants=True), [parent_txid, child_txid])
+        self.assertEqual(pool.remove(parent_txid), [])
+        self.assertEqual(len(pool), 0)
+        self.assertEqual(pool.usage, 0)
+        self.assertEqual(pool.stats().removed, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import unittest
+from p2pkh import merkle
+from p2pkh.blockfile import BlockView
+from p2pkh.decode import decode_transaction
+from p2pkh.hashing import dsha256
+from p2pkh.instrument import profile
+from p2pkh.merkle import (
+    MerkleTree,
+    block_merkle_tree,
+    merkle_root,
+    pack_hashes,
+    verify_proof,
+    witness_commitment,
+    witness_commitment_script_pubkey,
+)
+from p2pkh.serialize import assemble_transaction, create_input, create_output, varint
+
+# Block 100000
+BLOCK_100000_TXIDS = [
+    "8c14f0db3df150123e6f3dbbf30f8b955a8249b62ac1d1ff16284aefa3d06d87",
+    "fff2525b8931402dd09222c50775608f75787bd2b87e56995a7bdd30f79702c4",
+    "6359f0868171b1d194cbee1af2f16ea598ae8fad666d9b012c8ed2b79a236ec4",
+    "e9a66845e05d5abc0ad04ec80f774a7e585c6e8db975962d069a522137b80c1d",
+]
+BLOCK_100000_ROOT = "f3e94742aca4b5ef85488dc37c06c3282295ffec960994b2c0d5ac2a25a95766"
+
+
+def naive_root(leaves):
+    """Level-by-level root over a list of hashes"""
+    level = list(leaves)
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        level = [dsha256(level[i] + level[i + 1]) for i in range(0, len(level), 2)]
+    return level[0]
+
+
+def leaves(count):
+    return [dsha256(i.to_bytes(4, 'little')) for i in range(count)]
+
+
+class TestMerkle(unittest.TestCase):
+
+    def test_block_100000(self):
+        """Test the root of a mainnet block from its txids"""
+        tree = MerkleTree.from_txids(BLOCK_100000_TXIDS)
+        self.assertEqual(tree.root_hex, BLOCK_100000_ROOT)
+        self.assertEqual(pack_hashes(BLOCK_100000_TXIDS)[32:64], bytes.fromhex(BLOCK_100000_TXIDS[1])[::-1])
+
+    def test_roots_and_proofs(self):
+        """Test roots and every proof against a naive tree for even and odd sizes"""
+        for count in (1, 2, 3, 5, 8, 13):
+            hashes = leaves(count)
+            tree = MerkleTree(b''.join(hashes))
+            self.assertEqual(tree.root, naive_root(hashes))
+            self.assertEqual(merkle_root(hashes), tree.root)
+            for index, proof in enumerate(tree.proofs(range(count))):
+                self.assertTrue(verify_proof(hashes[index], index, proof, tree.root))
+
+        tree = MerkleTree(leaves(6))
+        proof = tree.proof(4)
+        self.assertFalse(verify_proof(tree.leaf(3), 4, proof, tree.root))
+        with self.assertRaises(IndexError):
+            tree.proof(6)
+        with self.assertRaises(ValueError):
+            MerkleTree(b'')
+        with self.assertRaises(ValueError):
+            merkle_root(bytes(33))
+
+    def test_mutated(self):
+        """Test duplicated trailing transactions are detected"""
+        hashes = leaves(3)
+        duplicated = MerkleTree(hashes + hashes[-1:])
+        self.assertEqual(duplicated.root, MerkleTree(hashes).root)
+        self.assertTrue(duplicated.mutated)
+        self.assertFalse(MerkleTree(hashes).mutated)
+
+    def test_witness_commitment(self):
+        """Test the witness tree zeroes the coinbase and the commitment script"""
+        wtxids = [h[::-1].hex() for h in leaves(4)]
+        tree = MerkleTree.from_wtxids(wtxids)
+        self.assertEqual(tree.leaf(0), bytes(32))
+        self.assertEqual(tree.root, naive_root([bytes(32)] + leaves(4)[1:]))
+
+        reserved = b'\x07' * 32
+        commitment = witness_commitment(tree.root, reserved)
+        self.assertEqual(commitment, dsha256(tree.root + reserved))
+        script = witness_commitment_script_pubkey(commitment)
+        self.assertEqual(script[:7], bytes.fromhex('266a24aa21a9ed'))
+        self.assertEqual(len(script), 39)
+
+    def test_block_tree_cache(self):
+        """Test block trees match the header's root and are reused"""
+        txs = [
+            assemble_transaction(1, [create_input("%064x" % (i + 1), 0)],
+                                 [create_output(1000 + i, bytes.fromhex("160014") + bytes(20))],
+                                 [b'\x01\x03abc'], 0)
+            for i in range(5)
+        ]
+        txids = [decode_transaction(tx)[0].txid for tx in txs]
+        header = (2).to_bytes(4, 'little') + bytes(32) + MerkleTree.from_txids(txids).root + bytes(12)
+        raw = header + varint(len(txs)) + b''.join(txs)
+        block = BlockView(memoryview(raw), 0, len(raw))
+
+        merkle._block_trees.clear()
+        tree = block_merkle_tree(block)
+        self.assertEqual(tree.root_hex, block.merkle_root)
+        self.assertIs(block_merkle_tree(block), tree)
+        witness_tree = block_merkle_tree(block, witness=True)
+        self.assertIsNot(witness_tree, tree)
+        self.assertEqual(witness_tree.leaf(0), bytes(32))
+        self.assertNotEqual(witness_tree.root, tree.root)
+
+        # CVE-2012-2459: repeating the odd last transaction keeps the header
+        mutated_raw = header + varint(len(txs) + 1) + b''.join(txs) + txs[-1]
+        mutated = BlockView(memoryview(mutated_raw), 0, len(mutated_raw))
+        self.assertEqual(mutated.hash, block.hash)
+        mutated_tree = block_merkle_tree(mutated)
+        self.assertIsNot(mutated_tree, tree)
+        self.assertEqual(len(mutated_tree), 6)
+        self.assertEqual(mutated_tree.root, tree.root)
+        self.assertTrue(mutated_tree.mutated)
+        self.assertFalse(block_merkle_tree(block).mutated)
+
+    def test_instrumented_hashing(self):
+        """Test Merkle hashing is visible to the instrumentation"""
+        hashes = leaves(5)
+        with profile(['dsha256']) as session:
+            merkle_root(hashes)
+            witness_commitment(bytes(32))
+        self.assertEqual(session.stats['dsha256'].calls, 3 + 2 + 1 + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
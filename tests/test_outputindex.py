@@ -0,0 +1,52 @@
+import random
+import unittest
+from p2pkh.decode import decode_transaction
+from p2pkh.outputindex import OutputIndex, RECORD_SIZE
+from p2pkh.script import P2PKH, P2TR, P2WPKH, p2pkh_script_pubkey, p2wpkh_script_pubkey
+from p2pkh.serialize import create_basic_tx, create_input, create_output
+
+
+class TestOutputIndex(unittest.TestCase):
+
+    def test_bulk_insert_and_lookup(self):
+        """Test lookups across several merged batches against a dict"""
+        index = OutputIndex()
+        rng = random.Random(4)
+        hashes = [rng.randbytes(20) for _ in range(50)]
+        expected = {}
+        for batch in range(3):
+            entries = []
+            for i in range(300):
+                script_hash = hashes[(i * 7 + batch) % len(hashes)]
+                template = P2PKH if i % 2 else P2WPKH
+                txid = rng.randbytes(32).hex()
+                entries.append((template, script_hash, txid, i))
+                expected.setdefault((template, script_hash), []).append((txid, i))
+            index.add_many(entries)
+            self.assertEqual(len(index), 300 * (batch + 1))
+            for (template, script_hash), outputs in expected.items():
+                self.assertEqual(index.lookup(template, script_hash), sorted(outputs))
+        self.assertEqual(index.nbytes, 900 * RECORD_SIZE)
+        self.assertEqual(index.lookup(P2TR, bytes(32)), [])
+        with self.assertRaises(ValueError):
+            index.add('p2pk', bytes(20), "00" * 32, 0)
+
+    def test_index_transactions(self):
+        """Test indexing decoded transactions and looking up by script"""
+        key_hash = bytes.fromhex("7190d1c4125c199ee43f25d206eecea970a0bf6c")
+        outputs = [
+            create_output(1000, p2pkh_script_pubkey(key_hash)),
+            create_output(0, bytes.fromhex("066a0401020304")),
+            create_output(2000, p2wpkh_script_pubkey(key_hash)),
+            create_output(3000, p2wpkh_script_pubkey(key_hash)),
+        ]
+        tx = create_basic_tx(1, [create_input("11" * 32, 0)], outputs, 0, segwit=False)
+        view, _ = decode_transaction(tx)
+        index = OutputIndex()
+        self.assertEqual(index.add_transactions([view]), 3)
+        self.assertEqual(index.lookup_script(view.outputs[2].script), [(view.txid, 2), (view.txid, 3)])
+        self.assertEqual(index.lookup(P2PKH, key_hash), [(view.txid, 0)])
+        self.assertEqual(index.lookup_script(view.outputs[1].script), [])
+
+if __name__ == '__main__':
+    unittest.main()
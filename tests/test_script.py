@@ -0,0 +1,86 @@
+import random
+import unittest
+from unittest import mock
+from p2pkh import hashing
+from p2pkh.hashing import hash160, hash160_many, ripemd160
+from p2pkh.script import (
+    P2PKH, P2SH, P2TR, P2WPKH, P2WSH, build_outputs, classify_script, outputs_from_pubkeys, p2pkh_script_pubkey,
+    p2wpkh_script_pubkey, script_pubkeys
+)
+from p2pkh.serialize import create_output
+
+PUBKEY = bytes.fromhex("025476c2e83188368da1ff3e292e7acafcdb3566bb0ad253f62fc70f07aeee6357")
+PUBKEY_HASH = bytes.fromhex("1d0f172a0ecb48aee1be1f2687d2963ae33f71a1")
+
+
+class TestScript(unittest.TestCase):
+
+    def test_ripemd160_vectors(self):
+        """Test the pure Python RIPEMD160 against the published test vectors"""
+        vectors = {
+            b"": "9c1185a5c5e9fc54612808977ee8f548b2258d31",
+            b"abc": "8eb208f7e05d987a9b044a8e98c6b087f15a0bfc",
+            b"message digest": "5d0689ef49d2fae572b881b123a85ffa21595f36",
+            b"abcdbcdecdefdefgefghfghighijhijkijkljklmklmnlmnomnopnopq":
+                "12a053384a9c0c88e405a06c27dcf49ada62eb2b",
+        }
+        for data, expected in vectors.items():
+            self.assertEqual(ripemd160(data).hex(), expected)
+
+    def test_hash160_fallback(self):
+        """Test hash160 without hashlib's ripemd160"""
+        rng = random.Random(1)
+        pubkeys = [rng.randbytes(33) for _ in range(5)]
+        expected = hash160_many(pubkeys)
+        with mock.patch.object(hashing, '_RIPEMD160', None):
+            self.assertEqual(hash160(PUBKEY), PUBKEY_HASH)
+            self.assertEqual(hash160_many(pubkeys), expected)
+
+    def test_script_pubkeys(self):
+        """Test P2PKH and P2WPKH templates"""
+        self.assertEqual(p2pkh_script_pubkey(PUBKEY_HASH).hex(),
+                         "1976a9141d0f172a0ecb48aee1be1f2687d2963ae33f71a188ac")
+        self.assertEqual(p2wpkh_script_pubkey(PUBKEY_HASH).hex(),
+                         "1600141d0f172a0ecb48aee1be1f2687d2963ae33f71a1")
+        self.assertEqual(script_pubkeys([PUBKEY_HASH] * 2, P2WPKH), [p2wpkh_script_pubkey(PUBKEY_HASH)] * 2)
+        with self.assertRaises(ValueError):
+            p2pkh_script_pubkey(PUBKEY_HASH[:19])
+        with self.assertRaises(ValueError):
+            script_pubkeys([PUBKEY_HASH], 'p2tr')
+
+    def test_build_outputs(self):
+        """Test bulk outputs against create_output"""
+        rng = random.Random(2)
+        pubkeys = [PUBKEY] + [rng.randbytes(33) for _ in range(20)]
+        amounts = list(range(1000, 1021))
+        for kind, template in ((P2PKH, p2pkh_script_pubkey), (P2WPKH, p2wpkh_script_pubkey)):
+            expected = [create_output(amount, template(hash160(pubkey)))
+                        for amount, pubkey in zip(amounts, pubkeys)]
+            self.assertEqual(outputs_from_pubkeys(amounts, pubkeys, kind), expected)
+        with self.assertRaises(ValueError):
+            build_outputs([1, 2], [PUBKEY_HASH])
+        with self.assertRaises(ValueError):
+            build_outputs([1], [PUBKEY_HASH + b'\x00'])
+
+    def test_classify_script(self):
+        """Test template detection and zero-copy hash extraction"""
+        h20, h32 = bytes(range(20)), bytes(range(32))
+        cases = [
+            ("76a914" + h20.hex() + "88ac", P2PKH, h20),
+            ("0014" + h20.hex(), P2WPKH, h20),
+            ("a914" + h20.hex() + "87", P2SH, h20),
+            ("0020" + h32.hex(), P2WSH, h32),
+            ("5120" + h32.hex(), P2TR, h32),
+        ]
+        for script_hex, template, expected in cases:
+            buffer = bytearray(bytes.fromhex(script_hex))
+            kind, script_hash = classify_script(memoryview(buffer))
+            self.assertEqual((kind, bytes(script_hash)), (template, expected))
+            # The hash is a view of the caller's buffer, not a copy
+            buffer[-3] ^= 0xff
+            self.assertNotEqual(bytes(script_hash), expected)
+        for script_hex in ("6a0401020304", "76a914" + h20.hex() + "88ad", "5220" + h32.hex(), ""):
+            self.assertEqual(classify_script(bytes.fromhex(script_hex)), (None, None))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from p2pkh import secp256k1
+from p2pkh.secp256k1 import FixedBaseTable, G, N, compress, decompress, get_generator_table, scalar_multiply
+from p2pkh.signing import get_pub_from_priv
+
+
+class TestFixedBaseTable(unittest.TestCase):
+
+    def test_get_pub_from_priv(self):
+        """Test public key derivation against BIP143 test vector"""
+        privkey = bytes.fromhex('619c335025c7f4012e556c2a58b2506e30b8511b53ade95ea316fd8c3286feb9')
+        expected_pubkey = bytes.fromhex('025476c2e83188368da1ff3e292e7acafcdb3566bb0ad253f62fc70f07aeee6357')
+        self.assertEqual(get_pub_from_priv(privkey), expected_pubkey,
+                         "Public key does not match expected value")
+
+    def test_table_matches_double_and_add(self):
+        """Test table multiplication against plain double-and-add"""
+        table = get_generator_table()
+        for scalar in (1, 2, 255, 256, 0xdeadbeef << 100, N - 1, N // 3):
+            self.assertEqual(table.multiply(scalar), scalar_multiply(scalar, G))
+        self.assertEqual(decompress(compress(table.multiply(12345))), table.multiply(12345))
+        with self.assertRaises(ValueError):
+            table.multiply(0)
+        with self.assertRaises(ValueError):
+            table.multiply(N)
+
+    def test_persist_table(self):
+        """Test tables survive a save/load round trip and reject corruption"""
+        table = get_generator_table()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'g.table')
+            table.save(path)
+            loaded = FixedBaseTable.load(path)
+            self.assertEqual(loaded.multiply(N - 2), table.multiply(N - 2))
+
+            data = bytearray(table.to_bytes())
+            data[100] ^= 1
+            with self.assertRaises(ValueError):
+                FixedBaseTable.from_bytes(bytes(data))
+
+            # A point moved off the curve is rejected even with a fixed-up checksum
+            body = bytearray(table.to_bytes()[8:-32])
+            body[64 * 300 + 63] ^= 1
+            with self.assertRaisesRegex(ValueError, "curve"):
+                FixedBaseTable.from_bytes(secp256k1.TABLE_MAGIC + bytes(body) + hashlib.sha256(body).digest())
+
+    def test_get_generator_table_from_path(self):
+        """Test the shared table is written to and read from the given path"""
+        saved = secp256k1._generator_table
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'g.table')
+                secp256k1._generator_table = None
+                built = get_generator_table(path)
+                self.assertTrue(os.path.exists(path))
+
+                secp256k1._generator_table = None
+                loaded = get_generator_table(path)
+                self.assertIsNot(loaded, built)
+                self.assertEqual(loaded.rows[-1][-1], built.rows[-1][-1])
+
+                # Asking the already built table for a new path writes it there
+                other = os.path.join(tmp, 'other.table')
+                self.assertIs(get_generator_table(other), loaded)
+                self.assertEqual(FixedBaseTable.load(other).rows, loaded.rows)
+                os.remove(other)
+                get_generator_table(other)
+                self.assertTrue(os.path.exists(other))
+
+                # ... and replaces an invalid file
+                invalid = os.path.join(tmp, 'invalid.table')
+                with open(invalid, 'wb') as f:
+                    f.write(b'garbage')
+                get_generator_table(invalid)
+                self.assertEqual(FixedBaseTable.load(invalid).rows, loaded.rows)
+        finally:
+            secp256k1._generator_table = saved
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+from p2pkh.serialize import (
+    TransactionSerializer, assemble_transaction, create_basic_tx, create_input,
+    create_output, pack_transactions
+)
+
+INPUT1 = create_input("9f96ade4b41d5433f4eda31e1738ec2b36f6e7d1420d94a6af99801a88f7f7ff", 0,
+                      sequence=b'\xee\xff\xff\xff')
+INPUT2 = create_input("8ac60eb9575db5b2d987e29f301b5b819ea83a5c6579d282d189cc04b8e151ef", 1)
+OUTPUT1 = create_output(112340000, bytes.fromhex("1976a9148280b37df378db99f66f85c95a783a76ac7a6d5988ac"))
+OUTPUT2 = create_output(223450000, bytes.fromhex("1976a9143bde42dbee7e4dbe6a21b2d50ce2f0167faa815988ac"))
+
+
+class TestTransactionSerializer(unittest.TestCase):
+
+    def test_basic_transaction(self):
+        """Test creating a basic transaction against the Exercise 1 vector"""
+        tx = create_basic_tx(1, [INPUT1, INPUT2], [OUTPUT1, OUTPUT2], 0x11, segwit=False)
+        expected = bytes.fromhex(
+            "0100000002fff7f7881a8099afa6940d42d1e7f6362bec38171ea3edf433541db4e4ad969f"
+            "0000000000eeffffffef51e1b804cc89d182d279655c3aa89e815b1b309fe287d9b2b55d57"
+            "b90ec68a0100000000ffffffff02202cb206000000001976a9148280b37df378db99f66f85"
+            "c95a783a76ac7a6d5988ac9093510d000000001976a9143bde42dbee7e4dbe6a21b2d50ce"
+            "2f0167faa815988ac11000000"
+        )
+        self.assertEqual(tx, expected, "Transaction does not match expected output")
+
+    def test_write_into(self):
+        """Test in-place writes match assemble_transaction and pack tightly"""
+        witnesses = [b'\x00', b'\x01\x02\xab\xcd']
+        expected = assemble_transaction(2, [INPUT1, INPUT2], [OUTPUT1], witnesses, 5)
+        serializer = TransactionSerializer(2, [INPUT1, INPUT2], [OUTPUT1], witnesses, 5)
+        self.assertEqual(serializer.size, len(expected))
+        self.assertEqual(serializer.to_bytearray(), expected)
+
+        buffer = bytearray(b'\xee' * (serializer.size + 10))
+        end = serializer.write_into(buffer, 3)
+        self.assertEqual(end, 3 + serializer.size)
+        self.assertEqual(bytes(buffer[3:end]), expected)
+        self.assertEqual(buffer[:3] + buffer[end:], b'\xee' * 10)
+        with self.assertRaises(ValueError):
+            serializer.write_into(bytearray(serializer.size - 1))
+
+        legacy = TransactionSerializer(1, [INPUT1], [OUTPUT1, OUTPUT2], locktime=0)
+        packed, offsets = pack_transactions([serializer, legacy])
+        self.assertEqual(offsets, [0, serializer.size])
+        self.assertEqual(bytes(packed[offsets[1]:]), legacy.to_bytes())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import threading
+import unittest
+from p2pkh.sigcache import ENTRY_COST, SignatureCache
+from p2pkh.signing import get_p2wpkh_witness
+from p2pkh.verify import verify_cached, verify_p2wpkh_witness
+
+PRIVKEY = bytes.fromhex('619c335025c7f4012e556c2a58b2506e30b8511b53ade95ea316fd8c3286feb9')
+PUBKEY = bytes.fromhex('025476c2e83188368da1ff3e292e7acafcdb3566bb0ad253f62fc70f07aeee6357')
+COMMITMENT = bytes.fromhex('c37af31116d1b27caf68aae9e3ac82f1477929014d5b917657d0eb49478cb670')
+
+
+class TestSignatureCache(unittest.TestCase):
+
+    def test_cached_verification(self):
+        """Test only valid signatures are cached and repeats are hits"""
+        cache = SignatureCache()
+        witness = get_p2wpkh_witness(PRIVKEY, COMMITMENT)
+        self.assertTrue(verify_p2wpkh_witness(witness, COMMITMENT, cache))
+        self.assertTrue(verify_p2wpkh_witness(witness, COMMITMENT, cache))
+        self.assertFalse(verify_p2wpkh_witness(witness, bytes(32), cache))
+        self.assertFalse(verify_p2wpkh_witness(witness, bytes(32), cache))
+        self.assertFalse(verify_p2wpkh_witness(witness[:-1], COMMITMENT, cache))
+
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.size), (1, 3, 1))
+        self.assertEqual(stats.hit_rate, 0.25)
+
+        sig = witness[2:2 + witness[1]]
+        entry = cache.entry(PUBKEY, COMMITMENT, sig)
+        self.assertTrue(cache.contains(entry, erase=True))
+        self.assertFalse(cache.contains(entry))
+        self.assertTrue(verify_cached(PUBKEY, COMMITMENT, sig, cache))
+
+        # Entries depend on the secret salt
+        self.assertNotEqual(SignatureCache(salt=b'a').entry(PUBKEY, COMMITMENT, sig),
+                            SignatureCache(salt=b'b').entry(PUBKEY, COMMITMENT, sig))
+
+    def test_entry_field_boundaries(self):
+        """Test bytes shifted between fields do not hit a cached entry"""
+        cache = SignatureCache()
+        witness = get_p2wpkh_witness(PRIVKEY, COMMITMENT)
+        sig = witness[2:2 + witness[1]]
+        self.assertTrue(verify_cached(PUBKEY, COMMITMENT, sig, cache))
+        self.assertFalse(verify_cached(PUBKEY, COMMITMENT[:31], COMMITMENT[31:] + sig, cache))
+        self.assertFalse(verify_cached(PUBKEY + COMMITMENT[:1], COMMITMENT[1:] + sig[:1], sig[1:], cache))
+        self.assertNotEqual(cache.entry(PUBKEY[:-1], COMMITMENT, PUBKEY[-1:] + sig),
+                            cache.entry(PUBKEY, COMMITMENT, sig))
+        with self.assertRaises(ValueError):
+            cache.entry(PUBKEY, COMMITMENT[:31], sig)
+        self.assertEqual(len(cache), 1)
+
+    def test_erase_frees_slot(self):
+        """Test an erased entry's slot is reused rather than left stale"""
+        cache = SignatureCache(max_bytes=4 * ENTRY_COST)
+        entries = [i.to_bytes(32, 'big') for i in range(4)]
+        for entry in entries:
+            cache.add(entry)
+        self.assertTrue(cache.contains(entries[0], erase=True))
+        cache.add(entries[0])
+        self.assertEqual(cache.stats().evictions, 0)
+        # Every slot holds a live entry, so each eviction drops exactly one
+        for i in range(4, 40):
+            cache.add(i.to_bytes(32, 'big'))
+            self.assertEqual(len(cache), 4)
+        self.assertEqual(cache.stats().evictions, 36)
+
+    def test_bounded_and_thread_safe(self):
+        """Test the memory budget under concurrent inserts"""
+        cache = SignatureCache(max_bytes=100 * ENTRY_COST)
+
+        def insert(start):
+            for i in range(start, start + 500):
+                cache.add(i.to_bytes(32, 'big'))
+
+        threads = [threading.Thread(target=insert, args=(n * 500,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(cache), 100)
+        self.assertEqual(cache.stats().evictions, 2000 - 100)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from p2pkh.hashing import dsha256
+from p2pkh.sighash import (
+    SighashContext, SIGHASH_ALL, SIGHASH_NONE, SIGHASH_SINGLE, SIGHASH_ANYONECANPAY
+)
+
+# BIP143 native P2WPKH example (same vector as Exercise 2)
+INPUTS = [
+    bytes.fromhex(
+        "fff7f7881a8099afa6940d42d1e7f6362bec38171ea3edf433541db4e4ad969f"
+        "00000000" "00" "eeffffff"
+    ),
+    bytes.fromhex(
+        "ef51e1b804cc89d182d279655c3aa89e815b1b309fe287d9b2b55d57b90ec68a"
+        "01000000" "00" "ffffffff"
+    ),
+]
+OUTPUTS = [
+    bytes.fromhex("202cb206000000001976a9148280b37df378db99f66f85c95a783a76ac7a6d5988ac"),
+    bytes.fromhex("9093510d000000001976a9143bde42dbee7e4dbe6a21b2d50ce2f0167faa815988ac"),
+]
+SCRIPT_CODE = bytes.fromhex("1976a9141d0f172a0ecb48aee1be1f2687d2963ae33f71a188ac")
+
+
+def reference_digest(index, script_code, amount, sighash):
+    """Straightforward BIP143 digest that re-hashes everything per call"""
+    base_type = sighash & 0x1f
+    anyone_can_pay = sighash & SIGHASH_ANYONECANPAY
+    zero = b'\x00' * 32
+    hash_prevouts = zero if anyone_can_pay else dsha256(b''.join(i[:36] for i in INPUTS))
+    hash_sequence = zero
+    if not anyone_can_pay and base_type not in (SIGHASH_SINGLE, SIGHASH_NONE):
+        hash_sequence = dsha256(b''.join(i[-4:] for i in INPUTS))
+    if base_type not in (SIGHASH_SINGLE, SIGHASH_NONE):
+        hash_outputs = dsha256(b''.join(OUTPUTS))
+    elif base_type == SIGHASH_SINGLE and index < len(OUTPUTS):
+        hash_outputs = dsha256(OUTPUTS[index])
+    else:
+        hash_outputs = zero
+    return dsha256(
+        (1).to_bytes(4, 'little') + hash_prevouts + hash_sequence +
+        INPUTS[index][:36] + script_code + amount.to_bytes(8, 'little') +
+        INPUTS[index][-4:] + hash_outputs + (0x11).to_bytes(4, 'little') +
+        sighash.to_bytes(4, 'little')
+    )
+
+
+class TestSighashContext(unittest.TestCase):
+
+    def test_bip143_vector(self):
+        """Test the cached digest matches the BIP143 test vector"""
+        ctx = SighashContext(version=1, inputs=INPUTS, outputs=OUTPUTS, locktime=0x11)
+        digest = ctx.digest(1, SCRIPT_CODE, 6 * 100000000)
+        expected = bytes.fromhex('c37af31116d1b27caf68aae9e3ac82f1477929014d5b917657d0eb49478cb670')
+        self.assertEqual(digest, expected, "Transaction digest incorrect")
+
+        # Repeated calls reuse the cached state and must not drift
+        self.assertEqual(ctx.digest(1, SCRIPT_CODE, 6 * 100000000), expected)
+
+    def test_sighash_types(self):
+        """Test every sighash type against a non-cached implementation"""
+        ctx = SighashContext(version=1, inputs=INPUTS, outputs=OUTPUTS, locktime=0x11)
+        for sighash in (SIGHASH_ALL, SIGHASH_NONE, SIGHASH_SINGLE):
+            for flags in (sighash, sighash | SIGHASH_ANYONECANPAY):
+                for index in range(len(INPUTS)):
+                    self.assertEqual(
+                        ctx.digest(index, SCRIPT_CODE, 1000, flags),
+                        reference_digest(index, SCRIPT_CODE, 1000, flags),
+                        f"Digest mismatch for input {index} sighash {flags:#x}"
+                    )
+
+    def test_digests_for_all_inputs(self):
+        """Test bulk digests line up with per-input digests"""
+        ctx = SighashContext(version=1, inputs=INPUTS, outputs=OUTPUTS, locktime=0x11)
+        digests = ctx.digests([SCRIPT_CODE, SCRIPT_CODE], [625000000, 600000000])
+        self.assertEqual(digests[1], ctx.digest(1, SCRIPT_CODE, 600000000))
+        self.assertEqual(len(digests), 2)
+
+        with self.assertRaises(ValueError):
+            ctx.digests([SCRIPT_CODE], [1])
+        with self.assertRaises(IndexError):
+            ctx.digest(2, SCRIPT_CODE, 1)
+
+if __name__ == '__main__':
+    unittest.main()
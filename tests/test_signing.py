@@ -0,0 +1,46 @@
+import hashlib
+import unittest
+from p2pkh.secp256k1 import N
+from p2pkh.signing import get_p2wpkh_witness, get_pub_from_priv, sign
+from p2pkh.verify import HALF_N, parse_signature, verify
+
+PRIVKEY = bytes.fromhex('619c335025c7f4012e556c2a58b2506e30b8511b53ade95ea316fd8c3286feb9')
+COMMITMENT = bytes.fromhex('c37af31116d1b27caf68aae9e3ac82f1477929014d5b917657d0eb49478cb670')
+
+
+class TestSign(unittest.TestCase):
+
+    def test_signature(self):
+        """Test signature generation against BIP143 test vector"""
+        expected_sig = bytes.fromhex(
+            '304402203609e17b84f6a7d30c80bfa610b5b4542f32a8a0d5447a12fb1366d7f01cc44a' +
+            '0220573a954c4518331561406f90300e8f3358f51928d43c212a8caed02de67eebee01'
+        )
+        self.assertEqual(sign(PRIVKEY, COMMITMENT), expected_sig,
+                         "Signature does not match BIP143 test vector")
+
+    def test_low_s(self):
+        """Test every signature has S in the lower half of the curve order"""
+        for i in range(32):
+            key = hashlib.sha256(b'key%d' % i).digest()
+            digest = hashlib.sha256(b'digest%d' % i).digest()
+            signature = sign(key, digest)
+            self.assertLessEqual(parse_signature(signature, require_low_s=False).s, HALF_N)
+            self.assertTrue(verify(get_pub_from_priv(key), digest, signature))
+
+    def test_invalid_inputs(self):
+        """Test out-of-range keys and wrong-length digests are rejected"""
+        for key in (bytes(32), N.to_bytes(32, 'big'), b'\xff' * 32, PRIVKEY[:31], PRIVKEY + b'\x00'):
+            with self.assertRaises(ValueError):
+                sign(key, COMMITMENT)
+            with self.assertRaises(ValueError):
+                get_pub_from_priv(key)
+        for digest in (COMMITMENT[:31], COMMITMENT + b'\x00', b''):
+            with self.assertRaises(ValueError):
+                sign(PRIVKEY, digest)
+            with self.assertRaises(ValueError):
+                get_p2wpkh_witness(PRIVKEY, digest)
+        self.assertTrue(sign((N - 1).to_bytes(32, 'big'), COMMITMENT))
+
+if __name__ == '__main__':
+    unittest.main()
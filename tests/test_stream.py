@@ -0,0 +1,76 @@
+import io
+import tracemalloc
+import unittest
+from p2pkh.decode import decode_transaction
+from p2pkh.serialize import assemble_transaction, create_basic_tx, create_input, create_output
+from p2pkh.stream import TransactionStreamWriter, stream_transaction
+
+SCRIPT = bytes.fromhex("1976a9141d0f172a0ecb48aee1be1f2687d2963ae33f71a188ac")
+WITNESS = bytes.fromhex("02" + "03aabbcc" + "02ddee")
+
+
+def make_inputs(count):
+    return (create_input("%064x" % (i + 1), i % 5) for i in range(count))
+
+
+def make_outputs(count):
+    return (create_output(1000 + i, SCRIPT) for i in range(count))
+
+
+class NullSink:
+    """Sink that only counts bytes"""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+
+
+class TestStream(unittest.TestCase):
+
+    def test_matches_assemble_transaction(self):
+        """Test streamed bytes, txid and wtxid against assemble_transaction"""
+        # 300 outputs need a three-byte count; generators go through the spool
+        expected = assemble_transaction(2, list(make_inputs(3)), list(make_outputs(300)), [WITNESS] * 3, 7)
+        view, _ = decode_transaction(expected)
+        for counts in ((None, None), (3, 300)):
+            sink = io.BytesIO()
+            result = stream_transaction(sink, 2, make_inputs(3), make_outputs(300), iter([WITNESS] * 3), 7,
+                                        *counts)
+            self.assertEqual(sink.getvalue(), expected)
+            self.assertEqual(result, (view.txid, view.wtxid, len(expected)))
+
+    def test_legacy_transaction(self):
+        """Test a transaction without marker and flag"""
+        expected = create_basic_tx(1, list(make_inputs(2)), list(make_outputs(2)), 0, segwit=False)
+        sink = io.BytesIO()
+        result = stream_transaction(sink, 1, list(make_inputs(2)), make_outputs(2))
+        self.assertEqual(sink.getvalue(), expected)
+        self.assertEqual(result.txid, result.wtxid)
+        self.assertEqual(result.txid, decode_transaction(expected)[0].txid)
+
+    def test_count_and_order_checks(self):
+        """Test rejection of wrong counts and out-of-order writes"""
+        with self.assertRaises(ValueError):
+            stream_transaction(io.BytesIO(), 1, make_inputs(2), make_outputs(2), input_count=3)
+        with self.assertRaises(ValueError):
+            stream_transaction(io.BytesIO(), 1, make_inputs(2), make_outputs(2), [WITNESS])
+        writer = TransactionStreamWriter(io.BytesIO(), 1)
+        with self.assertRaises(ValueError):
+            writer.write_outputs(make_outputs(1))
+
+    def test_flat_memory(self):
+        """Test that peak memory does not grow with the number of outputs"""
+        tracemalloc.start()
+        try:
+            stream_transaction(NullSink(), 2, make_inputs(1), make_outputs(50000), [WITNESS],
+                               output_count=50000)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # The transaction itself is about 2 MB
+        self.assertLess(peak, 256 * 1024)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import sys
+import unittest
+from p2pkh.hashing import dsha256
+from p2pkh.serialize import assemble_transaction, create_basic_tx, create_input, create_output
+from p2pkh.transaction import Transaction, TxIn, TxOut, Witness
+
+INPUT1 = bytes.fromhex(
+    "fff7f7881a8099afa6940d42d1e7f6362bec38171ea3edf433541db4e4ad969f00000000"
+    "494830450221008b9d1dc26ba6a9cb62127b02742fa9d754cd3bebf337f7a55d114c8e5cdd30be"
+    "022040529b194ba3f9281a99f2b1c0a19c0489bc22ede944ccf4ecbab4cc618ef3ed01eeffffff"
+)
+INPUT2 = create_input("8ac60eb9575db5b2d987e29f301b5b819ea83a5c6579d282d189cc04b8e151ef", 1)
+OUTPUT1 = create_output(112340000, bytes.fromhex("1976a9148280b37df378db99f66f85c95a783a76ac7a6d5988ac"))
+OUTPUT2 = create_output(223450000, bytes.fromhex("1976a9143bde42dbee7e4dbe6a21b2d50ce2f0167faa815988ac"))
+WITNESS2 = bytes.fromhex(
+    "0247304402203609e17b84f6a7d30c80bfa610b5b4542f32a8a0d5447a12fb1366d7f01cc44a"
+    "0220573a954c4518331561406f90300e8f3358f51928d43c212a8caed02de67eebee01"
+    "21025476c2e83188368da1ff3e292e7acafcdb3566bb0ad253f62fc70f07aeee6357"
+)
+RAW = assemble_transaction(1, [INPUT1, INPUT2], [OUTPUT1, OUTPUT2], [b'\x00', WITNESS2], 0x11)
+
+
+class TestTransaction(unittest.TestCase):
+
+    def test_round_trip_and_ids(self):
+        """Test parsing, serializing and cached identifiers"""
+        tx = Transaction.from_bytes(RAW)
+        self.assertEqual(tx.serialize(), RAW)
+        self.assertEqual(tx.inputs[0].to_bytes(), INPUT1)
+        self.assertEqual(TxIn.from_bytes(INPUT1), tx.inputs[0])
+        self.assertEqual(TxOut.from_bytes(OUTPUT2), tx.outputs[1])
+        self.assertEqual(Witness.from_bytes(WITNESS2).to_bytes(), WITNESS2)
+
+        base = create_basic_tx(1, [INPUT1, INPUT2], [OUTPUT1, OUTPUT2], 0x11, segwit=False)
+        self.assertEqual(tx.txid, dsha256(base)[::-1].hex())
+        self.assertEqual(tx.wtxid, dsha256(RAW)[::-1].hex())
+        self.assertEqual((tx.size, tx.base_size), (len(RAW), len(base)))
+        self.assertEqual(tx.weight, 3 * len(base) + len(RAW))
+        self.assertEqual(tx.vsize, -(-tx.weight // 4))
+
+    def test_mutation_invalidates_cache(self):
+        """Test every mutation drops the cached identifiers and sizes"""
+        tx = Transaction.from_bytes(RAW)
+        txid, wtxid, size = tx.txid, tx.wtxid, tx.size
+
+        tx.set_witness(1, Witness())
+        self.assertEqual(tx.txid, txid)
+        self.assertNotEqual(tx.wtxid, wtxid)
+        self.assertEqual(tx.wtxid, tx.txid)
+        self.assertFalse(tx.has_witness)
+
+        tx.add_output(TxOut(1000, b'\x6a'))
+        self.assertNotEqual(tx.txid, txid)
+        self.assertEqual(tx.size, tx.base_size)
+        tx.remove_output(2)
+        tx.set_witness(1, Witness.from_bytes(WITNESS2))
+        self.assertEqual((tx.txid, tx.wtxid, tx.size), (txid, wtxid, size))
+
+        tx.locktime = 0
+        self.assertNotEqual(tx.txid, txid)
+
+        with self.assertRaises(AttributeError):
+            tx.inputs[0].vout = 5
+        with self.assertRaises(ValueError):
+            Transaction(1, [TxIn(b'\x00' * 32, 0)], [], [])
+
+    def test_compact_layout(self):
+        """Test objects have no per-instance dict"""
+        tx = Transaction.from_bytes(RAW)
+        for obj in (tx, tx.inputs[0], tx.outputs[0], tx.witnesses[0]):
+            self.assertFalse(hasattr(obj, '__dict__'))
+        self.assertLess(sys.getsizeof(tx.outputs[0]), sys.getsizeof({'amount': 1, 'script': b''}))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from p2pkh.serialize import create_input
+from p2pkh.utxo import UtxoStore
+
+P2WPKH_SCRIPT = bytes.fromhex("00141d0f172a0ecb48aee1be1f2687d2963ae33f71a1")
+P2PKH_SCRIPT = bytes.fromhex("76a9141d0f172a0ecb48aee1be1f2687d2963ae33f71a188ac")
+
+
+def outpoint(i: int) -> bytes:
+    return create_input("%064x" % (i + 1), i % 4)[:36]
+
+
+class TestUtxoStore(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "utxo.dat")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_add_lookup_spend(self):
+        """Test batched adds, lookups and spends across a resize and reopen"""
+        with UtxoStore(self.path, slots=16) as store:
+            store.add_many((outpoint(i), 1000 + i, P2WPKH_SCRIPT) for i in range(100))
+            self.assertEqual(len(store), 100)
+            self.assertGreaterEqual(store.slots, 143)
+            spent = store.spend_many([outpoint(i) for i in range(0, 100, 2)])
+            self.assertEqual([entry.amount for entry in spent], list(range(1000, 1100, 2)))
+
+        with UtxoStore(self.path) as store:
+            self.assertEqual(len(store), 50)
+            # Serialized inputs work as keys too
+            inputs = [create_input("%064x" % (i + 1), i % 4) for i in range(4)]
+            entries = store.get_many(inputs)
+            self.assertEqual([entry and entry.amount for entry in entries], [None, 1001, None, 1003])
+            entry = entries[1]
+            self.assertEqual(entry.script_code.hex(), "1976a914" + P2WPKH_SCRIPT[2:].hex() + "88ac")
+            self.assertEqual(entry.output, (1001).to_bytes(8, 'little') + b'\x16' + P2WPKH_SCRIPT)
+            # Tombstoned slots are reused
+            store.add_many([(outpoint(0), 5, P2PKH_SCRIPT)])
+            self.assertEqual(store.get(outpoint(0)).script_code, b'\x19' + P2PKH_SCRIPT)
+
+    def test_resize_is_durable(self):
+        """Test a resize syncs the new table before renaming it over the store"""
+        events = []
+        real_fsync, real_replace = os.fsync, os.replace
+        with mock.patch('os.fsync', side_effect=lambda fd: (events.append('fsync'), real_fsync(fd))), \
+                mock.patch('os.replace', side_effect=lambda *a: (events.append('replace'), real_replace(*a))):
+            with UtxoStore(self.path, slots=4) as store:
+                store.add_many([(outpoint(0), 1, P2WPKH_SCRIPT)])
+                events.clear()
+                store.add_many((outpoint(i), 1, P2WPKH_SCRIPT) for i in range(1, 10))
+        replace = events.index('replace')
+        self.assertIn('fsync', events[:replace])
+        self.assertIn('fsync', events[replace:])
+        self.assertEqual(sorted(os.listdir(self.dir.name)), ["utxo.dat"])
+
+    def test_batches_are_atomic(self):
+        """Test that an invalid batch leaves the store unchanged"""
+        with UtxoStore(self.path) as store:
+            store.add_many([(outpoint(0), 1, P2PKH_SCRIPT)])
+            for add, spend in (
+                ([(outpoint(1), 1, P2PKH_SCRIPT)], [outpoint(2)]),
+                ([(outpoint(1), 1, P2PKH_SCRIPT)], [outpoint(0), outpoint(0)]),
+                ([(outpoint(0), 1, P2PKH_SCRIPT)], []),
+                ([(outpoint(1), 1, b'\x51' * 40)], []),
+            ):
+                with self.assertRaises(ValueError):
+                    store.apply(add, spend)
+                self.assertIsNone(store.get(outpoint(1)))
+                self.assertIsNotNone(store.get(outpoint(0)))
+
+            # An output created and spent in the same batch never lands
+            spent = store.apply([(outpoint(1), 7, P2PKH_SCRIPT)], [outpoint(1), outpoint(0)])
+            self.assertEqual([entry.amount for entry in spent], [7, 1])
+            self.assertEqual(len(store), 0)
+
+    def test_recover_from_journal(self):
+        """Test that a batch interrupted after journaling is rolled back"""
+        store = UtxoStore(self.path)
+        store.add_many([(outpoint(0), 1, P2PKH_SCRIPT)])
+        # Crash after the slots are written but before the journal is removed
+        with mock.patch('p2pkh.utxo.os.remove', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                store.apply([(outpoint(1), 2, P2PKH_SCRIPT)], [outpoint(0)])
+        self.assertIsNotNone(store.get(outpoint(1)))
+        store.close()
+        self.assertTrue(os.path.exists(self.path + ".journal"))
+
+        with UtxoStore(self.path) as store:
+            self.assertFalse(os.path.exists(self.path + ".journal"))
+            self.assertEqual(len(store), 1)
+            self.assertEqual(store.get(outpoint(0)).amount, 1)
+            self.assertIsNone(store.get(outpoint(1)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import hashlib
+import unittest
+from p2pkh.secp256k1 import N
+from p2pkh.signing import get_pub_from_priv, sign
+from p2pkh.verify import is_valid_signature_encoding, parse_signature, verify, verify_batch, verify_chunk
+
+PRIVKEY = bytes.fromhex('619c335025c7f4012e556c2a58b2506e30b8511b53ade95ea316fd8c3286feb9')
+PUBKEY = bytes.fromhex('025476c2e83188368da1ff3e292e7acafcdb3566bb0ad253f62fc70f07aeee6357')
+COMMITMENT = bytes.fromhex('c37af31116d1b27caf68aae9e3ac82f1477929014d5b917657d0eb49478cb670')
+SIGNATURE = bytes.fromhex(
+    '304402203609e17b84f6a7d30c80bfa610b5b4542f32a8a0d5447a12fb1366d7f01cc44a'
+    '0220573a954c4518331561406f90300e8f3358f51928d43c212a8caed02de67eebee01'
+)
+
+
+def der(r, s, sighash=1):
+    """Encode r and s as DER with a sighash byte"""
+    def integer(value):
+        body = value.to_bytes((value.bit_length() + 8) // 8, 'big')
+        return b'\x02' + bytes([len(body)]) + body
+    body = integer(r) + integer(s)
+    return b'\x30' + bytes([len(body)]) + body + bytes([sighash])
+
+
+class TestVerify(unittest.TestCase):
+
+    def test_bip143_signature(self):
+        """Test verification of the BIP143 signature"""
+        self.assertTrue(verify(PUBKEY, COMMITMENT, SIGNATURE))
+        self.assertTrue(verify(memoryview(PUBKEY), COMMITMENT, memoryview(b'xx' + SIGNATURE)[2:]))
+        self.assertFalse(verify(PUBKEY, bytes(32), SIGNATURE))
+        self.assertFalse(verify(get_pub_from_priv(b'\x01' * 32), COMMITMENT, SIGNATURE))
+        self.assertEqual(parse_signature(SIGNATURE).sighash, 1)
+
+    def test_strict_encoding(self):
+        """Test DER and low-S rules"""
+        r, s, _ = parse_signature(SIGNATURE)
+        self.assertEqual(der(r, s), SIGNATURE)
+
+        high_s = der(r, N - s)
+        self.assertTrue(is_valid_signature_encoding(high_s))
+        self.assertFalse(verify(PUBKEY, COMMITMENT, high_s))
+        self.assertTrue(verify(PUBKEY, COMMITMENT, high_s, require_low_s=False))
+
+        padded_r = SIGNATURE[:1] + bytes([SIGNATURE[1] + 1]) + b'\x02\x21\x00' + SIGNATURE[4:]
+        self.assertFalse(is_valid_signature_encoding(padded_r))
+        self.assertFalse(is_valid_signature_encoding(SIGNATURE[:-2]))
+        self.assertFalse(verify(PUBKEY, COMMITMENT, der(0, s)))
+        with self.assertRaises(ValueError):
+            parse_signature(b'\x30' + SIGNATURE[1:-1])
+
+    def test_sighash_type(self):
+        """Test only defined sighash types are accepted"""
+        for sighash in (1, 2, 3, 0x81, 0x82, 0x83):
+            self.assertEqual(parse_signature(SIGNATURE[:-1] + bytes([sighash])).sighash, sighash)
+        for sighash in (0, 4, 0x80, 0x84, 0x41, 0xff):
+            with self.assertRaises(ValueError):
+                parse_signature(SIGNATURE[:-1] + bytes([sighash]))
+        self.assertFalse(verify(PUBKEY, COMMITMENT, SIGNATURE[:-1] + b'\x00'))
+
+    def test_batch(self):
+        """Test batch verification in order, serial and parallel"""
+        items = []
+        for i in range(6):
+            key = hashlib.sha256(b'key%d' % i).digest()
+            digest = hashlib.sha256(b'msg%d' % i).digest()
+            items.append((get_pub_from_priv(key), digest, sign(key, digest)))
+        items[4] = (items[4][0], items[3][1], items[4][2])
+        expected = [True, True, True, True, False, True]
+
+        self.assertEqual(verify_chunk(items), expected)
+        self.assertEqual(verify_batch(items, processes=1).results, expected)
+        parallel = verify_batch(items, processes=2, chunk_size=2)
+        self.assertEqual(parallel.results, expected)
+        self.assertEqual(parallel.stats.count, 6)
+        self.assertGreater(parallel.stats.per_second, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from p2pkh.serialize import assemble_transaction, create_basic_tx, create_input, create_output
+from p2pkh.transaction import Transaction
+from p2pkh.weight import TxWeight, transaction_weight
+
+INPUTS = [create_input("11" * 32, 0), create_input("22" * 32, 3, b'\x51' * 107)]
+OUTPUTS = [create_output(5000, bytes.fromhex("160014") + bytes(20))]
+WITNESSES = [b'\x00', b'\x02\x47' + bytes(71) + b'\x21' + bytes(33)]
+
+
+class TestTxWeight(unittest.TestCase):
+
+    def test_matches_serialization(self):
+        """Test computed sizes against real serializations"""
+        raw = assemble_transaction(2, INPUTS, OUTPUTS, WITNESSES, 0)
+        base = create_basic_tx(2, INPUTS, OUTPUTS, 0, segwit=False)
+        sizes = transaction_weight(INPUTS, OUTPUTS, WITNESSES)
+        self.assertEqual(sizes.size, len(raw))
+        self.assertEqual(sizes.base_size, len(base))
+        self.assertEqual(sizes.witness_size, len(raw) - len(base))
+        self.assertEqual(sizes.weight, Transaction.from_bytes(raw).weight)
+        self.assertEqual(sizes.vsize, -(-sizes.weight // 4))
+
+        legacy = transaction_weight(INPUTS, OUTPUTS)
+        self.assertEqual(legacy.size, len(base))
+        self.assertEqual(legacy.weight, 4 * len(base))
+
+        lengths = transaction_weight([len(i) for i in INPUTS], [len(OUTPUTS[0])], [1, len(WITNESSES[1])])
+        self.assertEqual(lengths.weight, sizes.weight)
+
+    def test_incremental_updates(self):
+        """Test adding and removing components, across a varint boundary"""
+        sizes = TxWeight(INPUTS, [], WITNESSES)
+        outputs = []
+        for i in range(260):
+            output = create_output(i, b'\x01\x6a')
+            outputs.append(output)
+            sizes.add_output(output)
+        raw = assemble_transaction(2, INPUTS, outputs, WITNESSES, 0)
+        self.assertEqual(sizes.size, len(raw))
+
+        for output in outputs[200:]:
+            sizes.remove_output(output)
+        sizes.replace_witness(WITNESSES[1], b'\x00')
+        sizes.add_input(INPUTS[0], WITNESSES[1])
+        raw = assemble_transaction(2, INPUTS + INPUTS[:1], outputs[:200],
+                                   [b'\x00', b'\x00', WITNESSES[1]], 0)
+        self.assertEqual(sizes.size, len(raw))
+
+        with self.assertRaises(ValueError):
+            TxWeight().remove_output(OUTPUTS[0])
+        with self.assertRaises(ValueError):
+            TxWeight(INPUTS, OUTPUTS, WITNESSES[:1])
+
+if __name__ == '__main__':
+    unittest.main()